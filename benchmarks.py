@@ -0,0 +1,374 @@
+#!/usr/bin/env python
+"""
+Benchmarks for the hot paths of django-multilingual-model, running on an
+in-memory SQLite database with the models used by the tests.
+
+Every benchmark reports its wall time (the best and median of a number of
+runs), the number of queries of a single run and, where `tracemalloc` is
+available, its peak memory use. Results are written as JSON so they can be
+compared between releases::
+
+    python benchmarks.py --output before.json
+    python benchmarks.py --output after.json --compare before.json
+"""
+
+import gc
+import json
+import os
+import platform
+import sys
+import timeit
+
+from optparse import OptionParser
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python < 3.4
+    tracemalloc = None
+
+from django.conf import settings
+
+if not settings.configured and 'DJANGO_SETTINGS_MODULE' not in os.environ:
+    import test_settings
+
+    options = dict(
+        (name, getattr(test_settings, name))
+        for name in dir(test_settings) if name.isupper()
+    )
+    options.setdefault('SECRET_KEY', 'benchmarks')
+
+    settings.configure(**options)
+
+import django
+
+if hasattr(django, 'setup'):
+    # Django >= 1.7
+    django.setup()
+
+from django import forms
+from django.contrib.admin.sites import AdminSite
+from django.db import connection
+from django.forms.models import inlineformset_factory
+from django.test.client import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import translation
+
+from multilingual_model import bulk, cache
+from multilingual_model import settings as multilingual_settings
+from multilingual_model.admin import MultilingualModelAdmin, translated_field
+from multilingual_model.fallbacks import compile_fallback_chains
+from multilingual_model.forms import TranslationFormSet
+from multilingual_model.tests import Book, BookTranslation
+
+
+benchmarks = []
+
+
+def benchmark(name, params=(None, )):
+    """
+    Register a benchmark, which is called with one of `params` and returns
+    the function to time, after setting up its data.
+    """
+
+    def decorator(setup):
+        benchmarks.append((name, params, setup))
+        return setup
+
+    return decorator
+
+
+def create_books(count, languages=('en', )):
+    """ Replace all books by `count` books translated into `languages`. """
+
+    BookTranslation.objects.all().delete()
+    Book.objects.all().delete()
+    cache.local_cache.clear()
+
+    books = [Book(ISBN=isbn) for isbn in range(count)]
+    Book.objects.bulk_create(books)
+
+    translations = []
+    for book in Book.objects.all():
+        for code in languages:
+            translations.append(BookTranslation(
+                parent=book, language_code=code,
+                title=u'Book %d (%s)' % (book.ISBN, code),
+                description=u'Description of book %d.' % book.ISBN
+            ))
+
+    BookTranslation.objects.bulk_create(translations)
+
+    return list(Book.objects.order_by('pk').values_list('pk', flat=True))
+
+
+@benchmark('getattr_cold')
+def getattr_cold(param):
+    """ Translated attributes of fresh objects, fetching translations. """
+
+    create_books(100)
+    books = list(Book.objects.all())
+
+    def run():
+        for book in books:
+            book._clear_translation_cache()
+            book.title_en
+
+    return run
+
+
+@benchmark('getattr_warm')
+def getattr_warm(param):
+    """ Translated attributes of objects with cached translations. """
+
+    create_books(100)
+    books = list(Book.objects.with_translations('en'))
+
+    def run():
+        for book in books:
+            book.title_en
+            book.title
+
+    return run
+
+
+@benchmark('fallback', params=(0, 1, 2, 3))
+def fallback(depth):
+    """ Resolving a translation through `depth` missing languages. """
+
+    create_books(100)
+
+    chain = ['bm-a', 'bm-b', 'bm-c'][:depth]
+    if chain:
+        multilingual_settings.FALLBACKS = {chain[0]: chain[1:] + ['en']}
+        compile_fallback_chains()
+
+    code = chain[0] if chain else 'en'
+    books = list(Book.objects.all())
+
+    def run():
+        for book in books:
+            book._clear_translation_cache()
+            book._language = code
+            book.title
+
+    return run
+
+
+@benchmark('list_rendering', params=(10, 100, 1000))
+def list_rendering(count):
+    """ Listing `count` objects with their translated fields. """
+
+    create_books(count, languages=('en', 'nl'))
+
+    def run():
+        for book in Book.objects.with_translations('en'):
+            book.title
+            book.description
+
+    return run
+
+
+@benchmark('admin_changelist', params=(100, ))
+def admin_changelist(count):
+    """ A page of the admin change list, sorted on a translated field. """
+
+    create_books(count, languages=('en', 'nl'))
+
+    class BookAdmin(MultilingualModelAdmin):
+        list_display = ['ISBN', translated_field('title')]
+
+    model_admin = BookAdmin(Book, AdminSite())
+    request = RequestFactory().get('/')
+
+    def run():
+        books = model_admin.get_queryset(request).order_by('title')[:100]
+
+        for book in books:
+            book.title
+            book.description
+
+    return run
+
+
+@benchmark('formset', params=(1, 10, 50, 200))
+def formset(count):
+    """ Constructing a translation formset offering `count` languages. """
+
+    create_books(1, languages=('en', ))
+    book = Book.objects.get()
+
+    choices = [('', '---------')] + [
+        ('l%d' % index, 'Language %d' % index) for index in range(count)
+    ]
+
+    class TranslationForm(forms.ModelForm):
+        language_code = forms.ChoiceField(choices=choices)
+
+        class Meta:
+            model = BookTranslation
+            fields = ('language_code', 'title', 'description')
+
+    FormSet = inlineformset_factory(
+        Book, BookTranslation, form=TranslationForm,
+        formset=TranslationFormSet, extra=count
+    )
+
+    def run():
+        formset = FormSet(instance=book)
+        formset.forms
+
+    return run
+
+
+@benchmark('bulk_import', params=(100, 1000))
+def bulk_import(count):
+    """ Importing `count` translations, half of them new. """
+
+    pks = create_books(count, languages=('en', ))
+
+    rows = []
+    for pk in pks:
+        rows.append({'parent': pk, 'language_code': 'en', 'title': u'New'})
+    for pk in pks[:count // 2]:
+        rows.append({'parent': pk, 'language_code': 'nl', 'title': u'Nieuw'})
+
+    def run():
+        bulk.upsert_translations(Book, rows)
+
+    return run
+
+
+def measure(run, repeat):
+    """ Return the timings, query count and peak memory of `run`. """
+
+    with CaptureQueriesContext(connection) as queries:
+        run()
+
+    peak_memory = None
+    if tracemalloc is not None:
+        tracemalloc.start()
+        run()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    timings = []
+    for index in range(repeat):
+        gc.collect()
+
+        start = timeit.default_timer()
+        run()
+        timings.append(timeit.default_timer() - start)
+
+    timings.sort()
+
+    return {
+        'best': timings[0],
+        'median': timings[len(timings) // 2],
+        'queries': len(queries),
+        'peak_memory': peak_memory,
+    }
+
+
+def run_benchmarks(selected=None, repeat=5):
+    """ Run the benchmarks whose name starts with one of `selected`. """
+
+    results = []
+
+    translation.activate('en')
+
+    for name, params, setup in benchmarks:
+        if selected and not [
+            prefix for prefix in selected if name.startswith(prefix)
+        ]:
+            continue
+
+        for param in params:
+            run = setup(param)
+
+            result = measure(run, repeat)
+            result['name'] = name
+            result['param'] = param
+            results.append(result)
+
+            multilingual_settings.FALLBACKS = {}
+            compile_fallback_chains()
+
+    translation.deactivate()
+
+    return results
+
+
+def result_key(result):
+    return '%s[%s]' % (result['name'], result['param'])
+
+
+def print_results(results, baseline=None):
+    previous = {}
+    if baseline:
+        for result in baseline:
+            previous[result_key(result)] = result
+
+    for result in results:
+        line = '%-28s %10.2f ms %10.2f ms %6d queries' % (
+            result_key(result), result['best'] * 1000,
+            result['median'] * 1000, result['queries']
+        )
+
+        if result['peak_memory'] is not None:
+            line += ' %10.1f KiB' % (result['peak_memory'] / 1024.0)
+
+        if result_key(result) in previous:
+            line += ' %+7.1f%%' % (
+                (result['best'] / previous[result_key(result)]['best'] - 1)
+                * 100
+            )
+
+        print(line)
+
+
+def main():
+    parser = OptionParser(usage='%prog [options] [benchmark ...]')
+    parser.add_option(
+        '--output', dest='output',
+        help='Write the results as JSON to this file.'
+    )
+    parser.add_option(
+        '--compare', dest='compare',
+        help='Compare the timings with results written earlier.'
+    )
+    parser.add_option(
+        '--repeat', dest='repeat', type='int', default=5,
+        help='Number of timed runs for every benchmark (default: 5).'
+    )
+
+    options, args = parser.parse_args()
+
+    old_config = connection.creation.create_test_db(verbosity=0)
+
+    try:
+        results = run_benchmarks(args, options.repeat)
+
+    finally:
+        connection.creation.destroy_test_db(old_config, verbosity=0)
+
+    baseline = None
+    if options.compare:
+        with open(options.compare) as f:
+            baseline = json.load(f)['results']
+
+    print_results(results, baseline)
+
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'platform': platform.platform(),
+                'results': results,
+            }, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,2 @@
+# Django >= 1.7
+default_app_config = 'multilingual_model.apps.MultilingualModelConfig'
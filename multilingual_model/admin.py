@@ -1,8 +1,14 @@
 import warnings
 
+from django.conf.urls import url
 from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.template.response import TemplateResponse
+from django.utils.translation import ugettext as _
 
 from .forms import TranslationFormSet
+from .query import MultilingualManager
+from .reports import get_coverage
 from . import settings
 
 
@@ -18,6 +24,30 @@ class TranslationInlineMixin(object):
     formset = TranslationFormSet
     max_num = len(settings.LANGUAGES)
 
+    # Render existing translations only, with languages limited to those not
+    # translated yet for new translations; see `TranslationFormSet.compact`.
+    compact = False
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super(TranslationInlineMixin, self).get_formset(
+            request, obj, **kwargs
+        )
+        formset.compact = self.compact
+
+        return formset
+
+    def get_extra(self, request, obj=None, **kwargs):
+        """
+        In compact mode, only render an extra form when no translations
+        exist yet. More can be added on demand.
+        """
+
+        if self.compact and obj is not None and obj.pk is not None and \
+                obj.translations.exists():
+            return 0
+
+        return self.extra
+
 
 class TranslationStackedInline(TranslationInlineMixin, admin.StackedInline):
     pass
@@ -35,3 +65,142 @@ class TranslationInline(TranslationStackedInline):
         ))
 
         return super(TranslationInline, self).__init__(*args, **kwargs)
+
+
+def translated_field(field, short_description=None):
+    """
+    Return a callable for `list_display` showing a translated field in the
+    current language, sortable in the database when used with
+    `TranslatedChangeListMixin`.
+
+    Example::
+
+        list_display = ['ISBN', translated_field('title')]
+
+    """
+
+    def display(obj):
+        return getattr(obj, field)
+
+    display.translated_field = field
+    display.admin_order_field = field
+    display.short_description = short_description or field.replace('_', ' ')
+
+    return display
+
+
+class TranslatedChangeListMixin(object):
+    """
+    ModelAdmin mixin for `MultilingualModel`, prefetching translations in the
+    current language (and its fallbacks) for all objects on a changelist
+    page with a single query. Translated fields in `list_display`, added
+    with `translated_field()`, are selected along with the objects so they
+    can be sorted on.
+
+    Related `MultilingualModel` objects in foreign key dropdowns have their
+    translations prefetched as well. To search translated fields, use
+    `translations__<field>` in `search_fields`.
+    """
+
+    def get_translated_list_fields(self):
+        return [
+            field.translated_field for field in self.list_display
+            if hasattr(field, 'translated_field')
+        ]
+
+    def get_queryset(self, request):
+        try:
+            get_queryset = super(TranslatedChangeListMixin, self).get_queryset
+        except AttributeError:
+            # Django < 1.6
+            get_queryset = super(TranslatedChangeListMixin, self).queryset
+
+        queryset = get_queryset(request)
+
+        translated_fields = self.get_translated_list_fields()
+        if translated_fields:
+            queryset = queryset.translated(*translated_fields)
+
+        return queryset.with_translations()
+
+    # Django < 1.6 compatibility
+    queryset = get_queryset
+
+    def formfield_for_foreignkey(self, db_field, request=None, **kwargs):
+        manager = db_field.rel.to._default_manager
+
+        if 'queryset' not in kwargs and \
+                isinstance(manager, MultilingualManager):
+            kwargs['queryset'] = manager.with_translations()
+
+        return super(TranslatedChangeListMixin, self).formfield_for_foreignkey(
+            db_field, request, **kwargs
+        )
+
+
+class TranslationCoverageMixin(object):
+    """
+    ModelAdmin mixin for `MultilingualModel`, adding a `coverage/` view which
+    reports how completely the objects have been translated, per language
+    and field.
+    """
+
+    coverage_template = 'admin/multilingual_model/coverage.html'
+
+    # Number of objects without a default translation to list
+    coverage_missing_limit = 100
+
+    def get_urls(self):
+        info = self.model._meta.app_label, self.model._meta.object_name.lower()
+
+        return [
+            url(
+                r'^coverage/$', self.admin_site.admin_view(self.coverage_view),
+                name='%s_%s_coverage' % info
+            ),
+        ] + list(super(TranslationCoverageMixin, self).get_urls())
+
+    def coverage_view(self, request):
+        if not self.has_change_permission(request):
+            raise PermissionDenied
+
+        coverage = get_coverage(
+            self.model, missing_limit=self.coverage_missing_limit
+        )
+        total = coverage['total']
+
+        def percentage(count):
+            if not total:
+                return None
+
+            return 100 * count // total
+
+        languages = []
+        for language in coverage['languages']:
+            languages.append({
+                'language_code': language['language_code'],
+                'translations': language['translations'],
+                'percentage': percentage(language['translations']),
+                'fields': [
+                    percentage(language['fields'][field])
+                    for field in coverage['fields']
+                ],
+            })
+
+        opts = self.model._meta
+
+        return TemplateResponse(request, self.coverage_template, {
+            'title': _('Translation coverage of %s') % (
+                opts.verbose_name_plural
+            ),
+            'opts': opts,
+            'app_label': opts.app_label,
+            'coverage': coverage,
+            'languages': languages,
+            'default_language': settings.DEFAULT_LANGUAGE,
+        }, current_app=self.admin_site.name)
+
+
+class MultilingualModelAdmin(TranslationCoverageMixin,
+                             TranslatedChangeListMixin, admin.ModelAdmin):
+    pass
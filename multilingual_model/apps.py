@@ -0,0 +1,28 @@
+import logging
+logger = logging.getLogger('multilingual_model')
+
+from django.apps import AppConfig
+from django.db import DatabaseError
+
+
+class MultilingualModelConfig(AppConfig):
+    name = 'multilingual_model'
+    verbose_name = 'Multilingual model'
+
+    def ready(self):
+        from . import settings, warmup
+
+        if settings.WARM_CACHE_ON_STARTUP:
+            try:
+                warmed = warmup.warm_configured_caches()
+            except DatabaseError:
+                # For instance before the tables have been created
+                logger.warning(
+                    u'Could not warm the translation cache.', exc_info=True
+                )
+            else:
+                for model, count in warmed:
+                    logger.info(
+                        u'Cached translations of %d %s objects.',
+                        count, model._meta.object_name
+                    )
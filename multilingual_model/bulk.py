@@ -0,0 +1,261 @@
+"""
+Writing many translations at once, bypassing the per-object `save()`.
+"""
+
+import logging
+logger = logging.getLogger('multilingual_model')
+
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connections
+
+from . import cache, changes, search, storage
+from .options import get_translation_options
+from .utils import atomic
+
+
+# Number of translations created or updated per query
+BATCH_SIZE = 100
+
+
+def translations_changed(model, pks, keys=(), using=DEFAULT_DB_ALIAS):
+    """
+    Update caches and denormalized translations of the objects of `model`
+    with the given primary keys after their translations have been changed
+    without sending signals. The written translations, as `(parent pk,
+    language code)` tuples in `keys`, are recorded in the change feed.
+    """
+
+    options = get_translation_options(model)
+
+    for pk in pks:
+        cache.local_cache.delete_group((options.translation_model, pk))
+        cache.invalidate_translations(options.translation_model, pk)
+
+    if options.json_field is not None:
+        storage.sync_to_json(model, pks)
+
+    if options.search_fields:
+        search.index_parents(model, pks, using)
+
+    if keys:
+        changes.record_changes(model, keys, using=using)
+
+
+def attach_translations(model, instances, codes):
+    """
+    Replace the translations for `codes` cached on the given instances of
+    `model` by their current state in the database, using a single query.
+    """
+
+    options = get_translation_options(model)
+
+    by_pk = {}
+    for instance in instances:
+        by_pk.setdefault(instance.pk, []).append(instance)
+
+    if not by_pk:
+        return
+
+    if options.json_field is not None:
+        translations = storage.get_parent_translations(model, list(by_pk))
+
+        for pk, pk_instances in by_pk.items():
+            for instance in pk_instances:
+                setattr(instance, options.json_field.attname, translations[pk])
+                instance._clear_translation_cache()
+
+        return
+
+    translations = options.translation_model._default_manager.filter(**{
+        '%s__in' % options.fk.name: list(by_pk),
+        'language_code__in': list(codes)
+    })
+
+    found = {}
+    for translation_obj in translations:
+        found[(getattr(translation_obj, options.fk.attname),
+               translation_obj.language_code)] = translation_obj
+
+    for pk, pk_instances in by_pk.items():
+        for instance in pk_instances:
+            for code in codes:
+                instance._cache_translation(code, found.get((pk, code)))
+
+
+def update_translations(translation_model, updates, using=None):
+    """
+    Update translations from a dictionary mapping their primary keys onto
+    dictionaries of field values, with a single query for every batch of
+    translations. Fields not given for a translation are left alone.
+    """
+
+    using = using or translation_model._default_manager.db
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    opts = translation_model._meta
+
+    fields = {}
+    for field in opts.fields:
+        fields[field.name] = field
+        fields[field.attname] = field
+
+    pks = list(updates)
+
+    for start in range(0, len(pks), BATCH_SIZE):
+        batch = pks[start:start + BATCH_SIZE]
+
+        by_field = {}
+        for pk in batch:
+            for name, value in updates[pk].items():
+                by_field.setdefault(fields[name], []).append((pk, value))
+
+        if not by_field:
+            continue
+
+        assignments = []
+        params = []
+        for field, values in by_field.items():
+            if connection.vendor == 'postgresql':
+                # Parameters are untyped in CASE expressions
+                placeholder = 'CAST(%%s AS %s)' % field.db_type(connection)
+            else:
+                placeholder = '%s'
+
+            cases = []
+            for pk, value in values:
+                cases.append('WHEN %%s THEN %s' % placeholder)
+                params.append(opts.pk.get_db_prep_value(pk, connection))
+                params.append(field.get_db_prep_save(value, connection))
+
+            assignments.append('%s = CASE %s %s ELSE %s END' % (
+                qn(field.column), qn(opts.pk.column), ' '.join(cases),
+                qn(field.column)
+            ))
+
+        sql = 'UPDATE %s SET %s WHERE %s IN (%s)' % (
+            qn(opts.db_table), ', '.join(assignments), qn(opts.pk.column),
+            ', '.join(['%s'] * len(batch))
+        )
+        params.extend(
+            opts.pk.get_db_prep_value(pk, connection) for pk in batch
+        )
+
+        connection.cursor().execute(sql, params)
+
+
+def _plan_writes(options, merged):
+    """
+    Return a list of translation objects to create, a dictionary mapping
+    primary keys of translations onto values to update, and the written
+    `(parent pk, language code)` tuples for a dictionary mapping these
+    tuples onto values, looking up existing translations with one query.
+    """
+
+    translation_model, fk = options.translation_model, options.fk
+
+    existing = {}
+    for pk, parent_pk, code in translation_model._default_manager.filter(**{
+        '%s__in' % fk.name: list(set(key[0] for key in merged)),
+        'language_code__in': list(set(key[1] for key in merged))
+    }).values_list('pk', fk.name, 'language_code'):
+        existing[(parent_pk, code)] = pk
+
+    created = []
+    updates = {}
+    written = []
+
+    for (parent_pk, code), values in merged.items():
+        pk = existing.get((parent_pk, code))
+
+        if pk is None:
+            translation_obj = translation_model(language_code=code, **values)
+            setattr(translation_obj, fk.attname, parent_pk)
+            created.append(translation_obj)
+
+        elif values:
+            updates[pk] = values
+
+        else:
+            continue
+
+        written.append((parent_pk, code))
+
+    return created, updates, written
+
+
+def upsert_translations(model, rows, instances=()):
+    """
+    Create or update translations for `model` from an iterable of
+    dictionaries holding the parent's primary key (by the name of the
+    foreign key to it), `language_code` and values for translated fields.
+    Fields not present in a row are left alone for existing translations.
+
+    Existing translations are fetched with a single query, and new ones are
+    created and existing ones updated with a single query per batch, all in
+    one transaction. When another writer creates some of the translations
+    in the meantime, violating the unique constraint on the parent and
+    language code, they are looked up again and updated instead.
+    Translations cached on the given `instances` are replaced by the written
+    ones, rather than being fetched again when accessed. Returns a tuple
+    with the number of created and updated translations.
+    """
+
+    options = get_translation_options(model)
+    translation_model, fk = options.translation_model, options.fk
+    manager = translation_model._default_manager
+
+    field_names = set()
+    for field in options.value_fields:
+        field_names.add(field.name)
+        field_names.add(field.attname)
+
+    # Merge rows for the same translation, later values taking precedence
+    merged = {}
+    for row in rows:
+        row = dict(row)
+        parent_pk = model._meta.pk.to_python(row.pop(fk.name))
+        code = row.pop('language_code')
+
+        unknown = set(row.keys()) - field_names
+        if unknown:
+            raise ValueError(
+                u"Unknown translated fields for %s: %s" % (
+                    model._meta.object_name, ', '.join(sorted(unknown))
+                )
+            )
+
+        merged.setdefault((parent_pk, code), {}).update(row)
+
+    if not merged:
+        return 0, 0
+
+    parent_pks = set(parent_pk for parent_pk, code in merged)
+    codes = set(code for parent_pk, code in merged)
+
+    created, updates, written = _plan_writes(options, merged)
+
+    with atomic(using=manager.db):
+        try:
+            with atomic(using=manager.db):
+                manager.bulk_create(created, batch_size=BATCH_SIZE)
+
+        except IntegrityError:
+            # Some translations have been created by a concurrent writer
+            # since looking them up; update those instead
+            created, updates, written = _plan_writes(options, merged)
+            manager.bulk_create(created, batch_size=BATCH_SIZE)
+
+        update_translations(translation_model, updates, manager.db)
+
+        translations_changed(model, parent_pks, written, manager.db)
+
+    if instances:
+        attach_translations(model, instances, codes)
+
+    updated = len(updates)
+
+    logger.debug(
+        u'Created %d and updated %d translations for %s.',
+        len(created), updated, model._meta.object_name
+    )
+
+    return len(created), updated
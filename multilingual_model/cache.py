@@ -0,0 +1,221 @@
+"""
+Translation caches shared between objects.
+
+The shared cache, on top of Django's cache framework, stores translations
+per `(translation model, parent pk, language code)` as a dictionary of field
+values. The process-wide local cache is a bounded LRU cache, keeping
+translation objects for the same keys.
+
+Missing translations are stored as well, so a lookup of a translation which
+does not exist does not hit the database either. Cached translations are
+invalidated whenever a translation is saved or deleted.
+"""
+
+import logging
+logger = logging.getLogger('multilingual_model')
+
+from . import settings
+from .lru import LRUCache
+from .options import get_translation_options, translation_models
+from .utils import get_loaded_values, instantiate_deferred
+
+
+# Cached value for translations which do not exist
+MISSING = 'missing'
+
+
+def get_cache():
+    """
+    Return the cache configured by `MULTILINGUAL_CACHE`, or `None` when
+    the shared translation cache is disabled.
+    """
+
+    if not settings.CACHE:
+        return None
+
+    try:
+        from django.core.cache import caches
+    except ImportError:
+        # Django < 1.7
+        from django.core.cache import get_cache as get_cache_backend
+        return get_cache_backend(settings.CACHE)
+
+    return caches[settings.CACHE]
+
+
+local_cache = LRUCache(
+    settings.LOCAL_CACHE_ENTRIES, settings.LOCAL_CACHE_BYTES,
+    settings.LOCAL_CACHE_TIMEOUT
+)
+
+
+def get_local_cache():
+    """
+    Return the process-wide LRU cache for translation objects, or `None`
+    when it is disabled by `MULTILINGUAL_LOCAL_CACHE_ENTRIES`.
+    """
+
+    if local_cache.max_entries:
+        return local_cache
+
+    return None
+
+
+def get_cache_key(translation_model, parent_pk, code):
+    opts = translation_model._meta
+
+    return 'multilingual:%s.%s:%s:%s' % (
+        opts.app_label, opts.object_name.lower(), parent_pk, code
+    )
+
+
+def _dump(translation_obj):
+    if translation_obj is None:
+        return MISSING
+
+    # Deferred fields which have not been loaded are left out, and will be
+    # deferred again when loading the translation from the cache.
+    return get_loaded_values(translation_obj)
+
+
+def _load(translation_model, value):
+    if value == MISSING:
+        return None
+
+    translation_obj = instantiate_deferred(translation_model, value)
+    translation_obj._state.adding = False
+
+    return translation_obj
+
+
+def get_translations(translation_model, keys):
+    """
+    Return a dictionary mapping `(parent_pk, language_code)` keys onto
+    translation objects, or `None` for missing translations. Keys which are
+    not available from the cache are left out.
+    """
+
+    cache = get_cache()
+    if cache is None or not keys:
+        return {}
+
+    cache_keys = {}
+    for parent_pk, code in keys:
+        cache_keys[get_cache_key(translation_model, parent_pk, code)] = \
+            (parent_pk, code)
+
+    result = {}
+    for cache_key, value in cache.get_many(list(cache_keys.keys())).items():
+        result[cache_keys[cache_key]] = _load(translation_model, value)
+
+    logger.debug(
+        u'Found %d out of %d translations in the shared cache.',
+        len(result), len(keys)
+    )
+
+    return result
+
+
+def set_translations(translation_model, translations):
+    """
+    Store a dictionary mapping `(parent_pk, language_code)` keys onto
+    translation objects (or `None` for missing translations) in the cache.
+    """
+
+    cache = get_cache()
+    if cache is None or not translations:
+        return
+
+    values = {}
+    for (parent_pk, code), translation_obj in translations.items():
+        values[get_cache_key(translation_model, parent_pk, code)] = \
+            _dump(translation_obj)
+
+    cache.set_many(values, settings.CACHE_TIMEOUT)
+
+
+def invalidate_translations(translation_model, parent_pk, codes=None):
+    """
+    Remove the cached translations of a parent for the given language codes,
+    or for all of the configured languages.
+    """
+
+    cache = get_cache()
+    if cache is None:
+        return
+
+    if codes is None:
+        codes = [code for code, name in settings.LANGUAGES]
+
+    cache.delete_many([
+        get_cache_key(translation_model, parent_pk, code) for code in codes
+    ])
+
+
+def invalidate(instance, language=None):
+    """
+    Remove the cached translations of a `MultilingualModel` instance for
+    `language`, or for all languages, from the instance itself and the
+    local and shared caches.
+    """
+
+    options = get_translation_options(type(instance))
+
+    instance._clear_translation_cache(language)
+
+    if instance.pk is None:
+        return
+
+    if language is None:
+        local_cache.delete_group((options.translation_model, instance.pk))
+        invalidate_translations(options.translation_model, instance.pk)
+
+    else:
+        local_cache.delete((options.translation_model, instance.pk, language))
+        invalidate_translations(
+            options.translation_model, instance.pk, [language]
+        )
+
+
+def translation_changed(sender, instance, **kwargs):
+    """
+    Signal handler invalidating the cached translations of the parent of a
+    saved or deleted translation, and of its previous parent when it has
+    been moved to another one. As the language of a translation might have
+    been changed, this includes all of the configured languages.
+    """
+
+    if sender not in translation_models:
+        return
+
+    fk = translation_models[sender].fk
+    parent_pk = getattr(instance, fk.attname)
+
+    parent_pks = []
+    codes = [code for code, name in settings.LANGUAGES]
+
+    if parent_pk is not None:
+        parent_pks.append(parent_pk)
+
+        if instance.language_code not in codes:
+            codes.append(instance.language_code)
+
+        # Clear the parent in memory as well, when available
+        parent = getattr(instance, fk.get_cache_name(), None)
+        if parent is not None:
+            parent._clear_translation_cache()
+
+    # Looked up by the pre_save handler in `multilingual_model.models`
+    previous = instance.__dict__.get('_previous_translation_key')
+    if previous is not None:
+        if previous[0] != parent_pk:
+            parent_pks.append(previous[0])
+
+        if previous[1] not in codes:
+            codes.append(previous[1])
+
+    for pk in parent_pks:
+        local_cache.delete_group((sender, pk))
+
+        if get_cache() is not None:
+            invalidate_translations(sender, pk, codes)
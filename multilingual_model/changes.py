@@ -0,0 +1,153 @@
+"""
+A feed of changed translations, for models with `track_translation_changes`.
+
+Every saved, written or deleted translation is recorded as a
+`TranslationChange`, replacing earlier records for the same parent and
+language, so the feed holds a single record per translation: the latest
+change, which is a tombstone for deleted translations. The primary key of a
+record serves as its revision, so consumers can ask for the changes since
+the last revision they have seen, at a cost proportional to the number of
+changes.
+"""
+
+import datetime
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.six.moves import reduce
+
+from . import settings
+from .options import get_translation_options, translation_models
+
+
+# Number of changes recorded per query
+BATCH_SIZE = 100
+
+# Number of changes returned by `changed_since()` by default
+PAGE_SIZE = 1000
+
+
+def get_model_label(model):
+    return '%s.%s' % (model._meta.app_label, model._meta.object_name)
+
+
+def record_changes(model, keys, deleted=False, using=DEFAULT_DB_ALIAS):
+    """
+    Record changes of the translations of `model` for an iterable of
+    `(parent pk, language code)` tuples, as deletions when `deleted` is
+    `True`. Nothing is recorded unless the model tracks translation changes.
+    """
+
+    from .models import TranslationChange
+
+    if not get_translation_options(model).track_changes:
+        return
+
+    label = get_model_label(model)
+    keys = list(set(keys))
+    manager = TranslationChange._default_manager.using(using)
+
+    for start in range(0, len(keys), BATCH_SIZE):
+        batch = keys[start:start + BATCH_SIZE]
+
+        manager.filter(model_label=label).filter(reduce(
+            lambda a, b: a | b, [
+                Q(parent_pk=str(parent_pk), language_code=code)
+                for parent_pk, code in batch
+            ]
+        )).delete()
+
+        manager.bulk_create([
+            TranslationChange(
+                model_label=label, parent_pk=str(parent_pk),
+                language_code=code, deleted=deleted
+            ) for parent_pk, code in batch
+        ])
+
+
+def translation_saved(sender, instance, **kwargs):
+    """ Signal handler recording a saved translation. """
+
+    options = translation_models.get(sender)
+    if options is None:
+        return
+
+    using = kwargs.get('using') or DEFAULT_DB_ALIAS
+    key = (getattr(instance, options.fk.attname), instance.language_code)
+    # Looked up by the pre_save handler in `multilingual_model.models`
+    previous = instance.__dict__.get('_previous_translation_key')
+
+    if previous is not None and previous != key:
+        record_changes(options.model, [previous], True, using)
+
+    if key[0] is not None:
+        record_changes(options.model, [key], False, using)
+
+
+def translation_deleted(sender, instance, **kwargs):
+    """ Signal handler recording a deleted translation. """
+
+    options = translation_models.get(sender)
+    if options is None:
+        return
+
+    parent_pk = getattr(instance, options.fk.attname)
+    if parent_pk is not None:
+        record_changes(
+            options.model, [(parent_pk, instance.language_code)], True,
+            kwargs.get('using') or DEFAULT_DB_ALIAS
+        )
+
+
+def changed_since(model, token=None, limit=PAGE_SIZE, lag=None,
+                  using=DEFAULT_DB_ALIAS):
+    """
+    Return a tuple of a list of at most `limit` changed translations of
+    `model` since the revision `token` (or all recorded changes when it is
+    `None`), and the token for the next page. Changes are dictionaries with
+    the `parent_pk`, the `language_code`, whether the translation has been
+    `deleted`, and the `revision`, in order of revision. Fewer changes than
+    `limit` means all changes have been returned::
+
+        changes, token = changed_since(Book, token)
+
+    Revisions are assigned when changes are recorded, not when they are
+    committed, so a change in a transaction still in progress could end up
+    behind the token. Therefore, only changes recorded at least `lag`
+    seconds ago (by default `MULTILINGUAL_CHANGE_FEED_LAG`) are returned,
+    which should exceed the duration of transactions writing translations.
+    """
+
+    from .models import TranslationChange
+
+    changes = TranslationChange._default_manager.using(using).filter(
+        model_label=get_model_label(model)
+    )
+
+    if token is not None:
+        changes = changes.filter(pk__gt=token)
+
+    if lag is None:
+        lag = settings.CHANGE_FEED_LAG
+
+    if lag:
+        changes = changes.filter(
+            changed__lte=timezone.now() - datetime.timedelta(seconds=lag)
+        )
+
+    result = []
+    for revision, parent_pk, code, deleted in changes.order_by('pk') \
+            .values_list('pk', 'parent_pk', 'language_code', 'deleted')[
+                :limit]:
+        result.append({
+            'revision': revision,
+            'parent_pk': model._meta.pk.to_python(parent_pk),
+            'language_code': code,
+            'deleted': deleted,
+        })
+
+    if result:
+        token = result[-1]['revision']
+
+    return result, token
@@ -0,0 +1,49 @@
+from .options import translation_models
+
+
+def get_non_unique_translation_models():
+    """
+    Return the concrete translation models lacking a unique constraint on
+    their parent and language code.
+    """
+
+    return [
+        translation_model
+        for translation_model, options in translation_models.items()
+        if not translation_model._meta.abstract and
+        not translation_model._meta.proxy and
+        not options.unique_translations
+    ]
+
+
+def check_unique_translations(app_configs=None, **kwargs):
+    """
+    Warn about translation models without a unique constraint on their
+    parent and language code.
+    """
+
+    from django.core import checks
+
+    return [
+        checks.Warning(
+            u"'%s' has no unique constraint on its parent and language code."
+            % translation_model._meta.object_name,
+            hint=u"Add ('%s', 'language_code') to unique_together." %
+            translation_models[translation_model].fk.name,
+            obj=translation_model,
+            id='multilingual_model.W001',
+        )
+        for translation_model in get_non_unique_translation_models()
+    ]
+
+
+def register_checks():
+    """ Register the checks with Django's system check framework. """
+
+    try:
+        from django.core.checks import register
+    except ImportError:
+        # Django < 1.7
+        return
+
+    register()(check_unique_translations)
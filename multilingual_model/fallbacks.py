@@ -0,0 +1,75 @@
+from . import settings
+from .options import split_language_code
+
+
+# Compiled fallback chains, by language code and base code
+_chains = {}
+
+
+def get_fallback_chain(code, base_code=None):
+    """
+    Return the language codes which are consulted, in order, when looking
+    up a translation for `code`: the code itself, the fallbacks configured in
+    `MULTILINGUAL_FALLBACKS` or otherwise the base locale, and finally the
+    default language when falling back to it.
+    """
+
+    key = (code, base_code)
+
+    try:
+        return _chains[key]
+
+    except KeyError:
+        pass
+
+    codes = [code]
+
+    if code in settings.FALLBACKS:
+        codes.extend(settings.FALLBACKS[code])
+
+    else:
+        base_code = base_code or split_language_code(code)
+
+        if base_code:
+            codes.append(base_code)
+
+    if settings.FALL_BACK_TO_DEFAULT and settings.DEFAULT_LANGUAGE:
+        codes.append(settings.DEFAULT_LANGUAGE)
+
+    # Remove duplicates, keeping the order
+    chain = []
+    for chain_code in codes:
+        if chain_code not in chain:
+            chain.append(chain_code)
+
+    chain = tuple(chain)
+    _chains[key] = chain
+
+    return chain
+
+
+def get_fallback_languages(codes):
+    """
+    Return the language codes in the fallback chains of all `codes`,
+    without duplicates.
+    """
+
+    result = []
+    for code in codes:
+        for chain_code in get_fallback_chain(code):
+            if chain_code not in result:
+                result.append(chain_code)
+
+    return result
+
+
+def compile_fallback_chains():
+    """ Compile the fallback chains for all of the configured languages. """
+
+    _chains.clear()
+
+    for code, name in settings.LANGUAGES:
+        get_fallback_chain(code)
+
+
+compile_fallback_chains()
@@ -0,0 +1,49 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import six
+
+
+class TranslationsField(models.TextField):
+    """
+    Stores the translations of a `MultilingualModel` on the model itself,
+    as JSON mapping language codes onto field values::
+
+        {"en": {"title": "Django for Dummies"}, "nl": {...}}
+
+    Adding this field to a `MultilingualModel` makes translations to be read
+    from it rather than from the translation table. The field is kept in
+    sync with the table whenever translations are saved or deleted, and is
+    left out when saving an existing object.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('blank', True)
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('default', '{}')
+
+        super(TranslationsField, self).__init__(*args, **kwargs)
+
+    def to_python(self, value):
+        if isinstance(value, six.string_types):
+            return json.loads(value or '{}')
+
+        if value is None:
+            return {}
+
+        return value
+
+    def get_prep_value(self, value):
+        if value is None or isinstance(value, six.string_types):
+            return value
+
+        return json.dumps(value, cls=DjangoJSONEncoder)
+
+    def value_to_string(self, obj):
+        return self.get_prep_value(self.value_from_object(obj))
+
+    def south_field_triple(self):
+        """ Field description for South migrations. """
+
+        return ('django.db.models.fields.TextField', [], {})
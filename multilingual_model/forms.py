@@ -7,6 +7,9 @@ from django.forms.models import BaseInlineFormSet
 from django import forms
 
 from . import settings
+from .bulk import upsert_translations
+from .options import get_translation_options
+from .utils import atomic
 
 
 class TranslationFormSet(BaseInlineFormSet):
@@ -57,47 +60,97 @@ class TranslationFormSet(BaseInlineFormSet):
                 _('At least one translation should be provided.')
             )
 
+    # Only offer the language of existing translations, and languages not
+    # yet translated for new translations, reducing the size of the forms
+    # when many languages are available.
+    compact = False
+
+    # Save all translations with a single upsert, rather than saving every
+    # form on its own. Requires all translated fields to be concrete fields.
+    bulk_save = False
+
     def _construct_available_languages(self):
-        self.available_languages = [
-            choice[0]
-            for choice in self.form.base_fields['language_code'].choices
+        """
+        Work out the available languages, and the languages of existing
+        translations, once for the whole formset.
+        """
+
+        self.language_choices = [
+            choice for choice in self.form.base_fields['language_code'].choices
             if choice[0] != ''
         ]
+        self.available_languages = [
+            choice[0] for choice in self.language_choices
+        ]
+
+        self.existing_languages = set(
+            obj.language_code for obj in self.get_queryset()
+        )
+        self.used_languages = set(self.existing_languages)
 
+        self._language_index = 0
 
     def _get_default_language(self):
         """
-        If a default language has been set, and is still available in
-        `self.available_languages`, return it and remove it from the list.
+        If a default language has been set, and has not been used yet in this
+        formset, return it and mark it as used.
 
-        If not, simply pop the first available language.
+        If not, return the first available language which has not been used,
+        or `None` when all languages have been used.
         """
 
         assert hasattr(self, 'available_languages'), \
             'No available languages have been generated.'
-        assert len(self.available_languages) > 0, \
-            'No available languages to select from.'
 
         if (
             settings.DEFAULT_LANGUAGE and
-            settings.DEFAULT_LANGUAGE in self.available_languages
+            settings.DEFAULT_LANGUAGE in self.available_languages and
+            settings.DEFAULT_LANGUAGE not in self.used_languages
         ) or (
             'language_code' not in self.form.base_fields
         ):
             # Default language still available
 
-            self.available_languages.remove(settings.DEFAULT_LANGUAGE)
+            self.used_languages.add(settings.DEFAULT_LANGUAGE)
             return settings.DEFAULT_LANGUAGE
 
+        # Select the first unused language; as languages are only ever added
+        # to the used ones, the search continues where it left off.
+        while self._language_index < len(self.available_languages):
+            language_code = self.available_languages[self._language_index]
+            self._language_index += 1
+
+            if language_code not in self.used_languages:
+                self.used_languages.add(language_code)
+                return language_code
+
+        return None
+
+    def _limit_language_choices(self, form, language_code=None):
+        """
+        Limit the language choices of a form to `language_code` or, when
+        not given, to the languages not having a translation yet.
+        """
+
+        if language_code:
+            choices = [
+                choice for choice in self.language_choices
+                if choice[0] == language_code
+            ] or [(language_code, language_code)]
         else:
-            # Select the first item and return it
-            return self.available_languages.pop(0)
+            choices = [('', '---------')] + [
+                choice for choice in self.language_choices
+                if choice[0] not in self.existing_languages
+            ]
+
+        form.fields['language_code'].choices = choices
 
     def _construct_form(self, i, **kwargs):
         """
         Construct the form, overriding the initial value for `language_code`.
         """
-        if not settings.HIDE_LANGUAGE:
+        if not settings.HIDE_LANGUAGE and \
+                not hasattr(self, 'available_languages'):
             self._construct_available_languages()
 
         form = super(TranslationFormSet, self)._construct_form(i, **kwargs)
@@ -109,11 +162,12 @@ class TranslationFormSet(BaseInlineFormSet):
 
             if language_code:
                 logger.debug(
-                    u'Removing translation choice %s for instance %s'
-                    u' in form %d', language_code, form.instance, i
+                    u'Translation choice %s already used in form %d',
+                    language_code, i
                 )
 
-                self.available_languages.remove(language_code)
+                if self.compact:
+                    self._limit_language_choices(form, language_code)
 
             else:
                 initial_language_code = self._get_default_language()
@@ -123,6 +177,111 @@ class TranslationFormSet(BaseInlineFormSet):
                     initial_language_code, i
                 )
 
-                form.initial['language_code'] = initial_language_code
+                if initial_language_code:
+                    form.initial['language_code'] = initial_language_code
+
+                if self.compact:
+                    self._limit_language_choices(form)
+
+        return form
+
+    def _get_translation_row(self, form, options):
+        """ Return the values of a form for `upsert_translations()`. """
+
+        row = {
+            options.fk.name: self.instance.pk,
+            'language_code':
+                form.cleaned_data.get('language_code') or
+                form.instance.language_code,
+        }
+
+        for field in options.value_fields:
+            if field.name in form.cleaned_data:
+                row[field.name] = form.cleaned_data[field.name]
+
+        return row
+
+    def save(self, commit=True):
+        """
+        Save the translations. With `bulk_save`, all changed and new
+        translations are written with a single upsert, and the translations
+        cached on the parent are replaced by the saved ones.
+        """
+
+        if not (commit and self.bulk_save):
+            return super(TranslationFormSet, self).save(commit)
+
+        if not self.is_valid():
+            raise ValueError(
+                u"The translations of %s could not be saved because the "
+                u"data didn't validate." % self.instance._meta.object_name
+            )
+
+        options = get_translation_options(type(self.instance))
+
+        self.changed_objects = []
+        self.deleted_objects = []
+        self.new_objects = []
+
+        deleted_pks = []
+        rows = []
+        new_codes = []
+
+        forms_to_delete = self.deleted_forms if self.can_delete else []
+
+        for form in self.initial_forms:
+            if form in forms_to_delete:
+                self.deleted_objects.append(form.instance)
+                deleted_pks.append(form.instance.pk)
+
+            elif form.has_changed() and not form.errors:
+                self.changed_objects.append((form.instance, form.changed_data))
+                row = self._get_translation_row(form, options)
+
+                if row['language_code'] != form.instance.language_code:
+                    # Moved to another language
+                    deleted_pks.append(form.instance.pk)
+                    new_codes.append(row['language_code'])
+
+                rows.append(row)
+
+        for form in self.extra_forms:
+            if not form.has_changed() or form in forms_to_delete or \
+                    form.errors:
+                continue
+
+            row = self._get_translation_row(form, options)
+            new_codes.append(row['language_code'])
+            rows.append(row)
+
+        manager = self.model._default_manager
+
+        with atomic(using=manager.db):
+            if deleted_pks:
+                manager.filter(pk__in=deleted_pks).delete()
+
+            upsert_translations(
+                type(self.instance), rows, instances=[self.instance]
+            )
+
+        for obj in self.deleted_objects:
+            self.instance._clear_translation_cache(obj.language_code)
+
+        codes = [row['language_code'] for row in rows]
+        translations = self.instance.translations_for(codes)
+
+        self.new_objects = [translations[code] for code in new_codes]
+
+        return [translations[code] for code in codes]
+
+    @property
+    def empty_form(self):
+        form = super(TranslationFormSet, self).empty_form
+
+        if self.compact and not settings.HIDE_LANGUAGE:
+            if not hasattr(self, 'available_languages'):
+                self._construct_available_languages()
+
+            self._limit_language_choices(form)
 
         return form
@@ -0,0 +1,170 @@
+import sys
+import time
+import threading
+
+
+def get_object_size(obj):
+    """
+    Approximate the number of bytes used by an object and the values in its
+    `__dict__`, without following references any further.
+    """
+
+    size = sys.getsizeof(obj)
+
+    obj_dict = getattr(obj, '__dict__', None)
+    if obj_dict is not None:
+        size += sys.getsizeof(obj_dict)
+
+        for value in obj_dict.values():
+            size += sys.getsizeof(value)
+
+    return size
+
+
+# Indexes of the entries in linked list nodes
+PREV, NEXT, KEY, VALUE, SIZE, EXPIRES = range(6)
+
+
+class LRUCache(object):
+    """
+    Thread safe least recently used cache, bounded by a number of entries
+    and, optionally, an approximate number of bytes. Entries expire after
+    `timeout` seconds, unless `timeout` is `None`.
+
+    Keys are tuples, of which all but the last item form a group. All
+    entries in a group can be removed at once with `delete_group()`.
+    """
+
+    def __init__(
+        self, max_entries, max_bytes=None, timeout=None,
+        sizeof=get_object_size
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.sizeof = sizeof
+
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        """ Remove all entries and reset the statistics. """
+
+        with self._lock:
+            self._entries = {}
+            self._groups = {}
+
+            # Circular doubly linked list, most recently used entry last
+            self._root = root = []
+            root[:] = [root, root, None, None, 0, None]
+
+            self.bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _unlink(self, node):
+        node[PREV][NEXT] = node[NEXT]
+        node[NEXT][PREV] = node[PREV]
+
+    def _remove(self, node):
+        self._unlink(node)
+
+        key = node[KEY]
+        del self._entries[key]
+
+        group = self._groups[key[:-1]]
+        group.discard(key)
+        if not group:
+            del self._groups[key[:-1]]
+
+        self.bytes -= node[SIZE]
+
+    def get(self, key):
+        """
+        Return the value for `key`, raising `KeyError` when it is not
+        available or has expired.
+        """
+
+        with self._lock:
+            node = self._entries.get(key)
+
+            if node is None:
+                self.misses += 1
+                raise KeyError(key)
+
+            if node[EXPIRES] is not None and node[EXPIRES] < time.time():
+                self._remove(node)
+                self.misses += 1
+                raise KeyError(key)
+
+            # Move to the most recently used position
+            self._unlink(node)
+            last = self._root[PREV]
+            last[NEXT] = self._root[PREV] = node
+            node[PREV] = last
+            node[NEXT] = self._root
+
+            self.hits += 1
+
+            return node[VALUE]
+
+    def set(self, key, value):
+        """ Store `value` for `key`, evicting old entries when necessary. """
+
+        size = self.sizeof(value)
+
+        if self.timeout is None:
+            expires = None
+        else:
+            expires = time.time() + self.timeout
+
+        with self._lock:
+            node = self._entries.get(key)
+            if node is not None:
+                self._remove(node)
+
+            last = self._root[PREV]
+            node = [last, self._root, key, value, size, expires]
+            last[NEXT] = self._root[PREV] = node
+
+            self._entries[key] = node
+            self._groups.setdefault(key[:-1], set()).add(key)
+            self.bytes += size
+
+            while self._entries and (
+                len(self._entries) > self.max_entries or
+                (self.max_bytes is not None and self.bytes > self.max_bytes)
+            ):
+                self._remove(self._root[NEXT])
+                self.evictions += 1
+
+    def delete(self, key):
+        """ Remove `key` from the cache, if present. """
+
+        with self._lock:
+            node = self._entries.get(key)
+            if node is not None:
+                self._remove(node)
+
+    def delete_group(self, group):
+        """ Remove all entries for keys starting with `group`. """
+
+        with self._lock:
+            for key in list(self._groups.get(group, ())):
+                self._remove(self._entries[key])
+
+    def stats(self):
+        """ Return a dictionary with usage statistics. """
+
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
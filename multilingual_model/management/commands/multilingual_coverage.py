@@ -0,0 +1,93 @@
+from optparse import make_option
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from multilingual_model import settings
+from multilingual_model.models import MultilingualModel
+from multilingual_model.reports import get_coverage, get_multilingual_models
+from multilingual_model.utils import get_model
+
+
+def percentage(count, total):
+    if not total:
+        return '-'
+
+    return '%d%%' % (100 * count // total)
+
+
+class Command(BaseCommand):
+    args = '[app_label.ModelName app_label.ModelName ...]'
+    help = (
+        'Report how completely multilingual models have been translated, '
+        'per language and field.'
+    )
+
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--language', action='append', dest='languages',
+            help='Language to report on; can be given multiple times '
+                 '(default: all configured languages).'
+        ),
+        make_option(
+            '--missing', type='int', dest='missing', default=0,
+            help='List the primary keys of at most this many objects '
+                 'without a translation in the default language.'
+        ),
+    )
+
+    def handle(self, *labels, **options):
+        if labels:
+            models = []
+            for label in labels:
+                try:
+                    model = get_model(label)
+                except ImproperlyConfigured as e:
+                    raise CommandError(e)
+
+                if not issubclass(model, MultilingualModel):
+                    raise CommandError(
+                        '%s is not a multilingual model.' % label
+                    )
+
+                models.append(model)
+
+        else:
+            models = get_multilingual_models()
+
+        missing = options.get('missing') or 0
+
+        for model in models:
+            coverage = get_coverage(
+                model, options.get('languages'), missing_limit=missing
+            )
+            total = coverage['total']
+
+            self.stdout.write('%s.%s: %d objects, %d without %s\n' % (
+                model._meta.app_label, model._meta.object_name, total,
+                coverage['missing_default'], settings.DEFAULT_LANGUAGE
+            ))
+
+            self.stdout.write('  %-10s %12s %s\n' % (
+                'language', 'translations',
+                ' '.join('%12s' % field for field in coverage['fields'])
+            ))
+
+            for language in coverage['languages']:
+                translations = language['translations']
+
+                self.stdout.write('  %-10s %12s %s\n' % (
+                    language['language_code'],
+                    percentage(translations, total),
+                    ' '.join(
+                        '%12s' % percentage(language['fields'][field], total)
+                        for field in coverage['fields']
+                    )
+                ))
+
+            if coverage['missing_default_pks']:
+                self.stdout.write('  Without %s: %s\n' % (
+                    settings.DEFAULT_LANGUAGE, ', '.join(
+                        str(pk) for pk in coverage['missing_default_pks']
+                    )
+                ))
@@ -0,0 +1,164 @@
+import io
+import time
+
+from optparse import make_option
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from multilingual_model import settings
+from multilingual_model.models import MultilingualModel
+from multilingual_model.options import get_translation_options
+from multilingual_model.transfer import (
+    FORMATS, CSVWriter, JSONLWriter, POWriter, guess_format
+)
+from multilingual_model.utils import get_model, iterate_pks, iterate_values
+
+
+class Command(BaseCommand):
+    args = '<app_label.ModelName>'
+    help = (
+        'Export the translations of a multilingual model as CSV, JSON '
+        'lines or a gettext PO file, reading them in chunks.'
+    )
+
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--format', dest='format', choices=FORMATS,
+            help='Output format; guessed from the output file if omitted, '
+                 'defaults to jsonl.'
+        ),
+        make_option(
+            '--output', dest='output',
+            help='File to write to, instead of standard output.'
+        ),
+        make_option(
+            '--language', dest='language',
+            help='Only export translations in this language. Required for '
+                 'PO files.'
+        ),
+        make_option(
+            '--source-language', dest='source_language',
+            help='Language for the msgid of PO entries (default: '
+                 'the default language).'
+        ),
+        make_option(
+            '--chunk-size', type='int', dest='chunk_size', default=1000,
+            help='Number of rows to read per query (default: 1000).'
+        ),
+    )
+
+    def handle(self, *args, **options):
+        if len(args) != 1:
+            raise CommandError('Specify a model.')
+
+        try:
+            model = get_model(args[0])
+        except ImproperlyConfigured as e:
+            raise CommandError(e)
+
+        if not issubclass(model, MultilingualModel):
+            raise CommandError('%s is not a multilingual model.' % args[0])
+
+        verbosity = int(options.get('verbosity', 1))
+        output = options.get('output')
+        language = options.get('language')
+        chunk_size = options.get('chunk_size') or 1000
+
+        file_format = options.get('format')
+        if not file_format:
+            file_format = output and guess_format(output) or 'jsonl'
+
+        if file_format == 'po' and not language:
+            raise CommandError('Specify the language for the PO file.')
+
+        if output:
+            stream = io.open(output, 'w', encoding='utf-8', newline='')
+        else:
+            stream = self.stdout
+
+        start = time.time()
+
+        try:
+            if file_format == 'po':
+                count = self.export_po(
+                    model, stream, language,
+                    options.get('source_language') or
+                    settings.DEFAULT_LANGUAGE,
+                    chunk_size
+                )
+            else:
+                count = self.export_rows(
+                    model, stream, file_format, language, chunk_size
+                )
+        finally:
+            if output:
+                stream.close()
+
+        if verbosity > 0 and output:
+            self.stdout.write('Exported %d rows in %.1fs (%.0f rows/s).\n' % (
+                count, time.time() - start,
+                count / max(time.time() - start, 0.001)
+            ))
+
+    def export_rows(self, model, stream, file_format, language, chunk_size):
+        """ Write a row for every translation. """
+
+        options = get_translation_options(model)
+        fields = [field.name for field in options.value_fields]
+        fieldnames = [options.fk.name, 'language_code'] + fields
+
+        if file_format == 'csv':
+            writer = CSVWriter(stream, fieldnames)
+        else:
+            writer = JSONLWriter(stream, fieldnames)
+
+        queryset = options.translation_model._default_manager.all()
+        if language:
+            queryset = queryset.filter(language_code=language)
+
+        count = 0
+        for row in iterate_values(queryset, fieldnames, chunk_size):
+            writer.write(row)
+            count += 1
+
+        return count
+
+    def export_po(self, model, stream, language, source_language,
+                  chunk_size):
+        """
+        Write a PO entry for every translated field of every object having
+        a translation in the source language.
+        """
+
+        options = get_translation_options(model)
+        fk_name = options.fk.name
+        fields = [field.name for field in options.value_fields]
+
+        writer = POWriter(stream, language)
+        translations = options.translation_model._default_manager
+
+        count = 0
+        for pks in iterate_pks(model._default_manager.all(), chunk_size):
+            values = {}
+            for row in translations.filter(**{
+                '%s__in' % fk_name: pks,
+                'language_code__in': [source_language, language]
+            }).values(fk_name, 'language_code', *fields):
+                values[(row[fk_name], row['language_code'])] = row
+
+            for pk in pks:
+                source = values.get((pk, source_language))
+                if source is None:
+                    continue
+
+                target = values.get((pk, language), {})
+
+                for field in fields:
+                    if source[field]:
+                        writer.write(
+                            pk, field, source[field], target.get(field)
+                        )
+                        count += 1
+
+        return count
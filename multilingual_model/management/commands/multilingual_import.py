@@ -0,0 +1,134 @@
+import itertools
+import os
+import time
+
+from optparse import make_option
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from multilingual_model.bulk import upsert_translations
+from multilingual_model.models import MultilingualModel
+from multilingual_model.options import get_translation_options
+from multilingual_model.transfer import (
+    FORMATS, chunked, guess_format, read_csv, read_jsonl, read_po
+)
+from multilingual_model.utils import get_model
+
+
+class Command(BaseCommand):
+    args = '<app_label.ModelName> <file>'
+    help = (
+        'Import translations for a multilingual model from a CSV, JSON '
+        'lines or gettext PO file, creating or updating translations in '
+        'chunks. CSV and JSON lines rows hold the parent (by the name of '
+        'the foreign key), language_code and translated fields.'
+    )
+
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--format', dest='format', choices=FORMATS,
+            help='Format of the file; guessed from its extension if omitted.'
+        ),
+        make_option(
+            '--language', dest='language',
+            help='Language of the translations in a PO file.'
+        ),
+        make_option(
+            '--chunk-size', type='int', dest='chunk_size', default=1000,
+            help='Number of rows to import per transaction (default: 1000).'
+        ),
+        make_option(
+            '--skip', type='int', dest='skip', default=0,
+            help='Number of rows to skip, i.e. to resume an import.'
+        ),
+        make_option(
+            '--checkpoint', dest='checkpoint',
+            help='File keeping the number of imported rows, allowing an '
+                 'interrupted import to resume where it left off.'
+        ),
+    )
+
+    def handle(self, *args, **options):
+        if len(args) != 2:
+            raise CommandError('Specify a model and a file.')
+
+        label, path = args
+
+        try:
+            model = get_model(label)
+        except ImproperlyConfigured as e:
+            raise CommandError(e)
+
+        if not issubclass(model, MultilingualModel):
+            raise CommandError('%s is not a multilingual model.' % label)
+
+        verbosity = int(options.get('verbosity', 1))
+        chunk_size = options.get('chunk_size') or 1000
+        language = options.get('language')
+
+        file_format = options.get('format') or guess_format(path)
+        if file_format is None:
+            raise CommandError('Cannot guess the format of %s.' % path)
+
+        if file_format == 'csv':
+            rows = read_csv(path)
+        elif file_format == 'jsonl':
+            rows = read_jsonl(path)
+        else:
+            if not language:
+                raise CommandError('Specify the language of the PO file.')
+
+            fk_name = get_translation_options(model).fk.name
+            rows = read_po(path, fk_name, language)
+
+        skip = options.get('skip') or 0
+        checkpoint = options.get('checkpoint')
+        if checkpoint and os.path.exists(checkpoint):
+            with open(checkpoint) as f:
+                skip = int(f.read().strip() or 0)
+
+            if verbosity > 0:
+                self.stdout.write('Resuming after row %d.\n' % skip)
+
+        rows = itertools.islice(rows, skip, None)
+
+        start = time.time()
+        count = created = updated = 0
+
+        for chunk in chunked(rows, chunk_size):
+            try:
+                chunk_created, chunk_updated = \
+                    upsert_translations(model, chunk)
+            except (ValueError, KeyError) as e:
+                raise CommandError(
+                    'Error importing rows %d to %d: %s' % (
+                        skip + count + 1, skip + count + len(chunk), e
+                    )
+                )
+
+            count += len(chunk)
+            created += chunk_created
+            updated += chunk_updated
+
+            if checkpoint:
+                with open(checkpoint, 'w') as f:
+                    f.write('%d' % (skip + count))
+
+            if verbosity > 1:
+                self.stdout.write('%d rows (%.0f rows/s)\n' % (
+                    count, count / max(time.time() - start, 0.001)
+                ))
+
+        if checkpoint and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+        if verbosity > 0:
+            self.stdout.write(
+                'Imported %d rows in %.1fs (%.0f rows/s): %d translations '
+                'created, %d updated.\n' % (
+                    count, time.time() - start,
+                    count / max(time.time() - start, 0.001),
+                    created, updated
+                )
+            )
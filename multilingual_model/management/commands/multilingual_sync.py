@@ -0,0 +1,70 @@
+from optparse import make_option
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from multilingual_model.models import MultilingualModel
+from multilingual_model.options import get_translation_options
+from multilingual_model.storage import sync_to_json, sync_to_table
+from multilingual_model.utils import get_model, iterate_pks
+
+
+class Command(BaseCommand):
+    args = '<app_label.ModelName app_label.ModelName ...>'
+    help = (
+        'Copy translations of multilingual models from their translation '
+        'table into their TranslationsField or, with --to-table, the other '
+        'way around.'
+    )
+
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--to-table', action='store_true', dest='to_table',
+            default=False,
+            help='Copy translations from the TranslationsField into the '
+                 'translation table, replacing existing translations.'
+        ),
+        make_option(
+            '--batch-size', type='int', dest='batch_size', default=1000,
+            help='Number of objects to process per batch (default: 1000).'
+        ),
+    )
+
+    def handle(self, *labels, **options):
+        if not labels:
+            raise CommandError('Specify at least one model.')
+
+        verbosity = int(options.get('verbosity', 1))
+        batch_size = options.get('batch_size', 1000)
+
+        if options.get('to_table'):
+            sync = sync_to_table
+        else:
+            sync = sync_to_json
+
+        for label in labels:
+            try:
+                model = get_model(label)
+            except ImproperlyConfigured as e:
+                raise CommandError(e)
+
+            if not issubclass(model, MultilingualModel) or \
+                    get_translation_options(model).json_field is None:
+                raise CommandError(
+                    '%s is not a multilingual model with a '
+                    'TranslationsField.' % label
+                )
+
+            count = 0
+            for pks in iterate_pks(model._default_manager.all(), batch_size):
+                sync(model, pks)
+                count += len(pks)
+
+                if verbosity > 1:
+                    self.stdout.write('%s: %d objects\n' % (label, count))
+
+            if verbosity > 0:
+                self.stdout.write(
+                    'Synchronized translations of %d %s objects.\n' %
+                    (count, label)
+                )
@@ -0,0 +1,98 @@
+from optparse import make_option
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from multilingual_model.cache import get_cache
+from multilingual_model.models import MultilingualModel
+from multilingual_model.reports import get_multilingual_models
+from multilingual_model.utils import get_model
+from multilingual_model.warmup import (
+    CHUNK_SIZE, get_warm_querysets, warm_caches
+)
+
+
+class Command(BaseCommand):
+    args = '[app_label.ModelName app_label.ModelName ...]'
+    help = (
+        'Preload translations of multilingual models into the translation '
+        'caches. Without models, those in MULTILINGUAL_WARM_CACHE are '
+        'preloaded, or otherwise all multilingual models.'
+    )
+
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--language', action='append', dest='languages',
+            help='Language to preload; can be given multiple times '
+                 '(default: all configured languages).'
+        ),
+        make_option(
+            '--chunk-size', type='int', dest='chunk_size',
+            default=CHUNK_SIZE,
+            help='Number of objects to preload per query (default: %d).'
+                 % CHUNK_SIZE
+        ),
+        make_option(
+            '--max-rows', type='int', dest='max_rows', default=None,
+            help='Maximum number of objects to preload per model.'
+        ),
+        make_option(
+            '--max-seconds', type='float', dest='max_seconds', default=None,
+            help='Stop preloading after this number of seconds.'
+        ),
+    )
+
+    def handle(self, *labels, **options):
+        verbosity = int(options.get('verbosity', 1))
+
+        # The local cache only lives as long as this process
+        if get_cache() is None:
+            raise CommandError(
+                'The shared translation cache is disabled; set '
+                'MULTILINGUAL_CACHE to preload translations.'
+            )
+
+        if labels:
+            querysets = []
+            for label in labels:
+                try:
+                    model = get_model(label)
+                except ImproperlyConfigured as e:
+                    raise CommandError(e)
+
+                if not issubclass(model, MultilingualModel):
+                    raise CommandError(
+                        '%s is not a multilingual model.' % label
+                    )
+
+                querysets.append((model._default_manager.all(), {}))
+
+        else:
+            try:
+                querysets = get_warm_querysets()
+            except ImproperlyConfigured as e:
+                raise CommandError(e)
+
+            if not querysets:
+                querysets = [
+                    (model._default_manager.all(), {})
+                    for model in get_multilingual_models()
+                ]
+
+        try:
+            warmed = warm_caches(
+                querysets, options.get('languages'),
+                chunk_size=options.get('chunk_size') or CHUNK_SIZE,
+                max_rows=options.get('max_rows'),
+                max_seconds=options.get('max_seconds')
+            )
+        except ImproperlyConfigured as e:
+            raise CommandError(e)
+
+        if verbosity > 0:
+            for model, count in warmed:
+                self.stdout.write(
+                    'Cached translations of %d %s.%s objects.\n' % (
+                        count, model._meta.app_label, model._meta.object_name
+                    )
+                )
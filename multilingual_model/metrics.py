@@ -0,0 +1,169 @@
+"""
+Counting what happens when translations are looked up.
+
+Events are recorded per model and language code:
+
+`hit`
+    A translation (or its absence) was found in the translation cache.
+`miss`
+    A translation had to be fetched.
+`query`
+    A database query for translations was issued. The language code is
+    `None` when a single query fetched several languages.
+`fallback`
+    A translation was resolved from a language further down the fallback
+    chain, at the given depth.
+`missing`
+    No translation was found in the whole fallback chain.
+
+Recorders are callables which are called with the event, the model, the
+language code and, for fallbacks, the depth. Collecting metrics for a block
+of code, or a request with `TranslationMetricsMiddleware`, is done with a
+`TranslationMetrics` collector::
+
+    with collect_metrics() as metrics:
+        render_page()
+
+    metrics.summary()
+
+When no recorders or collectors are active, nothing is recorded and the
+overhead is limited to checking `metrics.enabled`.
+"""
+
+import threading
+
+from contextlib import contextmanager
+
+
+# Whether any recorders or collectors are active; checked before recording
+enabled = False
+
+_recorders = []
+
+_local = threading.local()
+_lock = threading.Lock()
+_active_collectors = 0
+
+
+def _update_enabled():
+    global enabled
+    enabled = bool(_recorders) or _active_collectors > 0
+
+
+def add_recorder(recorder):
+    """ Call `recorder` for every event in every thread. """
+
+    _recorders.append(recorder)
+    _update_enabled()
+
+
+def remove_recorder(recorder):
+    """ Stop calling a recorder added with `add_recorder()`. """
+
+    _recorders.remove(recorder)
+    _update_enabled()
+
+
+def record(event, model, language_code, depth=None):
+    """ Pass an event on to all recorders and collectors of this thread. """
+
+    for recorder in _recorders:
+        recorder(event, model, language_code, depth)
+
+    for collector in getattr(_local, 'collectors', ()):
+        collector(event, model, language_code, depth)
+
+
+class TranslationMetrics(object):
+    """ Counts events per model and language code. """
+
+    def __init__(self):
+        # Counts by (event, model label, language code)
+        self.counts = {}
+
+        # Counts of fallbacks by (model label, language code, depth)
+        self.fallback_depths = {}
+
+    def __call__(self, event, model, language_code, depth=None):
+        label = '%s.%s' % (model._meta.app_label, model._meta.object_name)
+
+        key = (event, label, language_code)
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+        if depth is not None:
+            key = (label, language_code, depth)
+            self.fallback_depths[key] = self.fallback_depths.get(key, 0) + 1
+
+    def total(self, event):
+        """ Return the number of times `event` was recorded. """
+
+        return sum(
+            count for (counted_event, label, language_code), count
+            in self.counts.items() if counted_event == event
+        )
+
+    def summary(self):
+        """ Return a dictionary with the total count of every event. """
+
+        result = {}
+        for event in ('hit', 'miss', 'query', 'fallback', 'missing'):
+            result[event] = self.total(event)
+
+        return result
+
+    def __str__(self):
+        return ', '.join(
+            '%s: %d' % (event, count)
+            for event, count in sorted(self.summary().items())
+        )
+
+
+def start_collecting(collector=None):
+    """
+    Start collecting events in the current thread with `collector`, or a new
+    `TranslationMetrics` instance, and return the collector.
+    """
+
+    global _active_collectors
+
+    if collector is None:
+        collector = TranslationMetrics()
+
+    if not hasattr(_local, 'collectors'):
+        _local.collectors = []
+
+    _local.collectors.append(collector)
+
+    with _lock:
+        _active_collectors += 1
+        _update_enabled()
+
+    return collector
+
+
+def stop_collecting(collector):
+    """ Stop collecting events with a collector from `start_collecting()`. """
+
+    global _active_collectors
+
+    _local.collectors.remove(collector)
+
+    with _lock:
+        _active_collectors -= 1
+        _update_enabled()
+
+
+@contextmanager
+def collect_metrics(collector=None):
+    """
+    Collect the events in the current thread during a block of code, yielding
+    the collector.
+    """
+
+    collector = start_collecting(collector)
+
+    try:
+        yield collector
+
+    finally:
+        stop_collecting(collector)
@@ -0,0 +1,27 @@
+import logging
+logger = logging.getLogger('multilingual_model')
+
+from . import metrics
+
+
+class TranslationMetricsMiddleware(object):
+    """
+    Collects translation metrics for every request, making them available
+    as `request.translation_metrics` and logging a summary when the
+    response is returned.
+    """
+
+    def process_request(self, request):
+        request.translation_metrics = metrics.start_collecting()
+
+    def process_response(self, request, response):
+        collector = getattr(request, 'translation_metrics', None)
+
+        if collector is not None:
+            metrics.stop_collecting(collector)
+
+            logger.debug(
+                u'Translation metrics for %s: %s', request.path, collector
+            )
+
+        return response
@@ -1,21 +1,28 @@
+import copy
 import logging
 logger = logging.getLogger('multilingual_model')
 
-import re
-
 from django.utils.translation import ugettext_lazy as _
 from django.utils.translation import ugettext
 
-from django.db import models
+import django
+from django.db import DEFAULT_DB_ALIAS, models
 from django.utils.translation import get_language
-from django.core.exceptions import ObjectDoesNotExist
-
-from . import settings
+from django.core.exceptions import FieldError, ObjectDoesNotExist
+from django.db.models.signals import (
+    class_prepared, pre_save, post_save, post_delete
+)
 
-# Match something like en, but also en_us
-LANGUAGE_CODE_RE = re.compile(
-    r'_(?P<base_code>[a-z]{2,7})(_(?P<ext_code>[a-z]{2,7})){0,1}$'
+from . import (
+    cache, changes, checks, metrics, search, settings, signals, storage
 )
+from .bulk import upsert_translations
+from .fallbacks import get_fallback_chain
+from .options import (
+    LANGUAGE_CODE_RE, TranslationOptions, defer_translation_fields,
+    get_translation_options, get_translation_relation, translation_models
+)
+from .query import MultilingualManager
 
 
 class MultilingualTranslation(models.Model):
@@ -30,16 +37,230 @@ class MultilingualTranslation(models.Model):
     )
 
 
+class TranslationChange(models.Model):
+    """
+    The latest change of a translation of a model with
+    `track_translation_changes`; see `multilingual_model.changes`. The
+    primary key serves as revision.
+    """
+
+    model_label = models.CharField(max_length=100, db_index=True)
+    parent_pk = models.CharField(max_length=255, db_index=True)
+    language_code = models.CharField(max_length=7)
+    deleted = models.BooleanField(default=False)
+    changed = models.DateTimeField(auto_now=True)
+
+
 class MultilingualModel(models.Model):
     """ Provides support for multilingual fields. """
 
     class Meta:
         abstract = True
 
-    def __init__(self, *args, **kwargs):
-        super(MultilingualModel, self).__init__(*args, **kwargs)
-        self._language = get_language()
-        self._translation_cache = {}
+    objects = MultilingualManager()
+
+    def _get_language(self):
+        """
+        Return the language for translated attributes without a language
+        code: the language set for the object, for instance by an
+        `in_language()` queryset, or the language active upon access.
+        """
+
+        return self.__dict__.get('_language') or get_language()
+
+    def _set_language(self, language):
+        self.__dict__['_language'] = language
+
+    _language = property(_get_language, _set_language)
+
+    def save(self, force_insert=False, force_update=False, using=None,
+             update_fields=None):
+        """
+        Save the object, leaving out the `TranslationsField` when updating
+        an existing object. The field is written whenever translations
+        change, so the value loaded with the object may be out of date.
+        """
+
+        options = get_translation_options(type(self))
+        kwargs = {}
+
+        if options.json_field is not None and update_fields is None and \
+                not force_insert and not self._state.adding:
+            if django.VERSION < (1, 5):
+                # Saving only some fields is not supported; write the
+                # stored value back instead
+                attname = options.json_field.attname
+                stored = list(type(self)._default_manager.using(
+                    using or self._state.db
+                ).filter(pk=self.pk).values_list(attname, flat=True))
+
+                if stored:
+                    setattr(self, attname, stored[0])
+
+            else:
+                # Deferred fields which have not been loaded are left out
+                update_fields = [
+                    field.name for field in self._meta.fields
+                    if not field.primary_key and
+                    field is not options.json_field and
+                    field.attname in self.__dict__
+                ]
+
+        if update_fields is not None:
+            kwargs['update_fields'] = update_fields
+
+        super(MultilingualModel, self).save(
+            force_insert, force_update, using, **kwargs
+        )
+
+    def _clear_translation_cache(self, code=None):
+        """
+        Remove translations cached on the object itself for `code`, or for
+        all languages.
+        """
+
+        translation_cache = self.__dict__.get('_translation_cache')
+
+        if translation_cache is not None:
+            if code is None:
+                translation_cache.clear()
+            else:
+                translation_cache.pop(code, None)
+
+    def _get_cached_translation(self, code):
+        """
+        Return the cached translation object (or `None` for a missing
+        translation) for a language code, raising `KeyError` if the
+        translation has not been cached.
+
+        Translations are looked up on the object itself first and then, for
+        saved objects, in the process-wide cache when it is enabled.
+        """
+
+        translation_cache = self.__dict__.get('_translation_cache')
+        if translation_cache is not None and code in translation_cache:
+            return translation_cache[code]
+
+        local_cache = cache.get_local_cache()
+        if local_cache is None or self.pk is None:
+            raise KeyError(code)
+
+        options = get_translation_options(type(self))
+        translation_obj = local_cache.get(
+            (options.translation_model, self.pk, code)
+        )
+
+        # The cache is only allocated when a translation is cached
+        self.__dict__.setdefault('_translation_cache', {})[code] = \
+            translation_obj
+
+        return translation_obj
+
+    def _cache_translation(self, code, translation_obj):
+        """
+        Cache a translation object, or `None` for a missing translation,
+        for a language code on the object itself and, for saved objects,
+        in the process-wide cache when it is enabled.
+        """
+
+        options = get_translation_options(type(self))
+        cache_name = options.fk.get_cache_name()
+
+        if translation_obj is not None:
+            # Prevent a query when the parent is requested
+            setattr(translation_obj, cache_name, self)
+
+        local_cache = cache.get_local_cache()
+        if local_cache is not None and self.pk is not None:
+            shared_obj = translation_obj
+
+            if translation_obj is not None:
+                # Translations in the process-wide cache do not refer to a
+                # particular parent, which the cache would keep alive
+                shared_obj = copy.copy(translation_obj)
+                del shared_obj.__dict__[cache_name]
+
+            local_cache.set(
+                (options.translation_model, self.pk, code), shared_obj
+            )
+
+        self.__dict__.setdefault('_translation_cache', {})[code] = \
+            translation_obj
+
+    def _fetch_translations(self, codes):
+        """
+        Fetch the translation objects for a list of language codes from the
+        `TranslationsField` of the object, if available, or from the shared
+        cache or, failing that, from the database using a single query.
+        Returns a dictionary mapping language codes onto translation objects,
+        or `None` for missing translations. The translations are cached on
+        the way.
+        """
+
+        options = get_translation_options(type(self))
+        result = {}
+
+        if options.json_field is not None:
+            translations = storage.get_json_translations(self)
+
+            for code in codes:
+                values = translations.get(code)
+
+                if values is None:
+                    result[code] = None
+                else:
+                    result[code] = storage.load_translation(self, code, values)
+
+                self._cache_translation(code, result[code])
+
+            return result
+
+        if self.pk is not None:
+            cached = cache.get_translations(
+                options.translation_model, [(self.pk, code) for code in codes]
+            )
+
+            for (pk, code), translation_obj in cached.items():
+                result[code] = translation_obj
+
+        missing = [code for code in codes if code not in result]
+
+        if missing:
+            logger.debug(
+                u'Fetching translations for languages %s.', missing
+            )
+
+            fetched = {}
+            for code in missing:
+                fetched[code] = None
+
+            if self.pk is not None:
+                translations = defer_translation_fields(
+                    self.translations.filter(language_code__in=missing),
+                    options
+                )
+
+                if metrics.enabled:
+                    metrics.record(
+                        'query', type(self),
+                        missing[0] if len(missing) == 1 else None
+                    )
+
+                for translation_obj in translations:
+                    fetched[translation_obj.language_code] = translation_obj
+
+                cache_items = {}
+                for code, translation_obj in fetched.items():
+                    cache_items[(self.pk, code)] = translation_obj
+
+                cache.set_translations(options.translation_model, cache_items)
+
+            result.update(fetched)
+
+        for code, translation_obj in result.items():
+            self._cache_translation(code, translation_obj)
+
+        return result
 
     def _get_translation(self, field, code):
         """
@@ -49,156 +270,212 @@ class MultilingualModel(models.Model):
         today, this stuff is cached. As the cache is rather aggressive it
         might cause rather strange effects. However, we would see the same
         effects when an ordinary object is changed which is already in memory:
-        the old state would remain.
+        the old state would remain. Use `multilingual_model.cache.invalidate`
+        to clear cached translations.
         """
 
-        if not code in self._translation_cache:
-            translations = self.translations.select_related()
-
-            logger.debug(
-                u'Matched with field %s for language %s. Attempting lookup.',
-                field, code
-            )
-
-            try:
-                translation_obj = translations.get(language_code=code)
-
-            except ObjectDoesNotExist:
-                translation_obj = None
+        try:
+            translation_obj = self._get_cached_translation(code)
 
-            self._translation_cache[code] = translation_obj
+            if metrics.enabled:
+                metrics.record('hit', type(self), code)
 
-            logger.debug(u'Translation not found in cache.')
+        except KeyError:
+            if metrics.enabled:
+                metrics.record('miss', type(self), code)
 
-        else:
-            logger.debug(u'Translation found in cache.')
-            # Get the translation from the cache
-            translation_obj = self._translation_cache.get(code)
+            translation_obj = self._fetch_translations([code])[code]
 
         # If this is none, it means that a translation does not exist
         # It is important to cache this one as well
         if not translation_obj:
             raise ObjectDoesNotExist
 
-        field_value = getattr(translation_obj, field)
+        return getattr(translation_obj, field)
 
-        logger.debug(
-            u'Found translation object %s, returning value %s.',
-            translation_obj, field_value
-        )
+    def _get_translation_from_chain(self, chain):
+        """
+        Return a tuple of the first available translation object for the
+        language codes in `chain` and its position in the chain, or
+        `(None, None)` when none of the translations exist.
 
-        return field_value
+        All translations which have not been cached are fetched at once.
+        """
 
-    def __getattr__(self, attr):
-        # If an attribute is defined in the current model, don't
-        # look any further.
-        if attr in self.__dict__:
-            # TODO: Test coverage!
-            return self.__dict__[attr]
-
-        # See whether we can find a translation for the field
-        translated_fields = self.translations.model._meta.get_all_field_names()
-        for field in translated_fields:
-            code = None
-
-            # Only consider attributes starting with this field name
-            if attr.startswith(field):
-                # If we have a match, see if we can re-match the language
-                # code in the remaining string.
-                match = LANGUAGE_CODE_RE.match(attr[len(field):])
-                if match:
-                    base_code = match.group('base_code')
-                    ext_code = match.group('ext_code')
-
-                    # TODO: CLEANUP
-                    # This is ugly code and redundant.
-
-                    if ext_code:
-                        code = '%s-%s' % (base_code, ext_code)
-                    else:
-                        code = base_code
-
-                    logger.debug(
-                        u'Regular expression match, resulting code: %s', code
-                    )
+        found = {}
+        missing = []
+
+        for code in chain:
+            try:
+                translation_obj = self._get_cached_translation(code)
 
-                elif attr in translated_fields:
-                    # TODO: Test coverage!
+            except KeyError:
+                if metrics.enabled:
+                    metrics.record('miss', type(self), code)
 
-                    code = self._language
-                    base_code = None
-                    field = attr
+                missing.append(code)
 
-                    logger.debug(
-                        u'Regular expression not matched but translated'
-                        u' field detected.'
-                    )
+            else:
+                if metrics.enabled:
+                    metrics.record('hit', type(self), code)
 
-            if code:
-                try:
-                    return self._get_translation(field, code)
-
-                except ObjectDoesNotExist:
-                    # TODO: CLEANUP
-                    # This is ugly code and redundant.
-                    if not base_code:
-                        # TODO: Test coverage!
-                        base_pos = code.find('-')
-                        if base_pos > 0:
-                            base_code = code[:base_pos]
-
-                    if base_code:
-
-                        logger.debug(
-                            u'Attempting a match for the base \'%s\'',
-                            base_code
-                        )
-
-                        try:
-                            return self._get_translation(field, base_code)
-                        except ObjectDoesNotExist:
-                            pass
-
-                    logger.debug(
-                        u'Lookup failed, attempting fallback or '
-                        u'failing silently.'
-                    )
+                found[code] = translation_obj
 
-                    # If we're using a default language and the current
-                    # language is not the default language (which has already
-                    # been checked), lookup the value for the default language.
-                    if (
-                        settings.FALL_BACK_TO_DEFAULT and
-                        settings.DEFAULT_LANGUAGE and
-                        code != settings.DEFAULT_LANGUAGE
-                    ):
-
-                        try:
-                            return self._get_translation(
-                                field, settings.DEFAULT_LANGUAGE
-                            )
-
-                        except ObjectDoesNotExist:
-                            # TODO: Test coverage!
-                            pass
-
-                    # TODO: Test coverage!
-                    if settings.FAIL_SILENTLY:
-                        return None
-
-                    raise ValueError(
-                        u"'%s' object with pk '%s' has no"
-                        u" translation to '%s'" % (
-                            self._meta.object_name, self.pk, code
-                        )
-                    )
+                if translation_obj is not None and not missing:
+                    # No need to fetch translations further down the chain
+                    break
+
+        if missing:
+            found.update(self._fetch_translations(missing))
+
+        for depth, code in enumerate(chain):
+            translation_obj = found.get(code)
+
+            if translation_obj is not None:
+                return translation_obj, depth
+
+        return None, None
+
+    def _resolve_translation(self, field, code, base_code=None):
+        """
+        Get the value of `field` for language `code`, falling back to the
+        languages in its fallback chain when no translation exists.
+        """
+
+        chain = get_fallback_chain(code, base_code)
+        translation_obj, depth = self._get_translation_from_chain(chain)
+
+        if depth != 0:
+            if depth is None:
+                resolved_code = None
+            else:
+                resolved_code = chain[depth]
+
+            if metrics.enabled:
+                if depth is None:
+                    metrics.record('missing', type(self), code)
+                else:
+                    metrics.record('fallback', type(self), code, depth)
+
+            signals.translation_fallback.send(
+                sender=type(self), instance=self, field=field,
+                language_code=code, resolved_language_code=resolved_code,
+                depth=depth
+            )
+
+        if translation_obj is not None:
+            return getattr(translation_obj, field)
 
-        raise AttributeError(
-            u"'%s' object has no attribute '%s'" % (
-                self._meta.object_name, str(attr)
+        # TODO: Test coverage!
+        if settings.FAIL_SILENTLY:
+            return None
+
+        raise ValueError(
+            u"'%s' object with pk '%s' has no"
+            u" translation to '%s'" % (
+                self._meta.object_name, self.pk, code
             )
         )
 
+    def __getattr__(self, attr):
+        # Look the attribute up in the table of translated attributes
+        # for this class. Language codes of `None` refer to the current
+        # language.
+        resolved = get_translation_options(type(self)).resolve(attr)
+
+        if resolved is None:
+            raise AttributeError(
+                u"'%s' object has no attribute '%s'" % (
+                    self._meta.object_name, str(attr)
+                )
+            )
+
+        field, code, base_code = resolved
+
+        if code is None:
+            code = self._language
+
+        return self._resolve_translation(field, code, base_code)
+
+    def get_translation(self, field, language_code=None, fallback=True):
+        """
+        Return the value of a translated field for `language_code`, which
+        defaults to the language of the object. Unless `fallback` is `False`,
+        the languages in its fallback chain are used when no translation is
+        available; otherwise `ObjectDoesNotExist` is raised.
+        """
+
+        options = get_translation_options(type(self))
+        if field not in options.fields:
+            raise FieldError(
+                u"Cannot resolve keyword '%s' into a translated field. "
+                u"Choices are: %s" % (field, ', '.join(options.fields))
+            )
+
+        code = language_code or self._language
+
+        if fallback:
+            return self._resolve_translation(field, code)
+
+        return self._get_translation(field, code)
+
+    def translations_for(self, languages):
+        """
+        Return a dictionary mapping each of the language codes in `languages`
+        onto its translation object, or `None` when there is no translation.
+        Translations which have not been cached are fetched with a single
+        query.
+        """
+
+        result = {}
+        missing = []
+
+        for code in languages:
+            try:
+                result[code] = self._get_cached_translation(code)
+
+            except KeyError:
+                missing.append(code)
+
+        if missing:
+            result.update(self._fetch_translations(missing))
+
+        return result
+
+    def set_translations(self, translations):
+        """
+        Create or update translations from a dictionary mapping language
+        codes onto dictionaries of translated field values, in a single
+        transaction. Translations cached on the object are replaced by the
+        written ones. Returns a tuple with the number of created and updated
+        translations.
+
+        Example::
+
+            book.set_translations({
+                'en': {'title': 'Django for Dummies'},
+                'nl': {'title': 'Django voor Dummies'}
+            })
+
+        """
+
+        if self.pk is None:
+            raise ValueError(
+                u"'%s' object needs to be saved before setting translations."
+                % self._meta.object_name
+            )
+
+        fk = get_translation_options(type(self)).fk
+
+        rows = []
+        for code, values in translations.items():
+            row = dict(values)
+            row[fk.name] = self.pk
+            row['language_code'] = code
+            rows.append(row)
+
+        return upsert_translations(type(self), rows, instances=[self])
+
     def unicode_wrapper(self, property, default=ugettext('Untitled')):
         """
         Wrapper to allow for easy unicode representation of an object by
@@ -226,3 +503,116 @@ class MultilingualModel(models.Model):
             value = default
 
         return value
+
+
+def translation_saving(sender, instance, **kwargs):
+    """
+    Signal handler looking up the parent and language of a translation
+    before it is saved, as `_previous_translation_key`, when the change
+    feed, the `TranslationsField` or the translation caches have to know:
+    a change of either means the translation for the previous ones has been
+    removed.
+    """
+
+    instance.__dict__.pop('_previous_translation_key', None)
+
+    options = translation_models.get(sender)
+    if options is None or instance.pk is None:
+        return
+
+    if not options.track_changes and options.json_field is None and \
+            cache.get_cache() is None and cache.get_local_cache() is None:
+        return
+
+    previous = list(sender._default_manager.using(
+        kwargs.get('using') or DEFAULT_DB_ALIAS
+    ).filter(pk=instance.pk).values_list(options.fk.attname, 'language_code'))
+
+    if previous:
+        instance._previous_translation_key = previous[0]
+
+
+def prepare_translation_options(sender, **kwargs):
+    """
+    Compile the `TranslationOptions` of a `MultilingualModel` as soon as
+    both the model and its translation model have been prepared.
+    """
+
+    if sender._meta.abstract:
+        return
+
+    if issubclass(sender, MultilingualModel):
+        candidates = [sender]
+
+    elif issubclass(sender, MultilingualTranslation):
+        candidates = [
+            field.rel.to for field in sender._meta.fields
+            if isinstance(field, models.ForeignKey) and
+            isinstance(field.rel.to, type) and
+            issubclass(field.rel.to, MultilingualModel)
+        ]
+
+    else:
+        return
+
+    for model in candidates:
+        if hasattr(model, 'translations'):
+            if get_translation_relation(model)[1].rel.to is not model:
+                # Subclasses share the options of the model translated
+                get_translation_options(model)
+                continue
+
+            options = TranslationOptions(model)
+            model._translation_options = options
+
+            pre_save.connect(
+                translation_saving, sender=options.translation_model
+            )
+            post_save.connect(
+                cache.translation_changed, sender=options.translation_model
+            )
+            post_delete.connect(
+                cache.translation_changed, sender=options.translation_model
+            )
+
+            if options.json_field is not None:
+                post_save.connect(
+                    storage.translation_changed,
+                    sender=options.translation_model
+                )
+                post_delete.connect(
+                    storage.translation_changed,
+                    sender=options.translation_model
+                )
+
+            if options.search_fields:
+                post_save.connect(
+                    search.translation_saved,
+                    sender=options.translation_model
+                )
+                post_delete.connect(
+                    search.translation_deleted,
+                    sender=options.translation_model
+                )
+
+            if options.track_changes:
+                post_save.connect(
+                    changes.translation_saved,
+                    sender=options.translation_model
+                )
+                post_delete.connect(
+                    changes.translation_deleted,
+                    sender=options.translation_model
+                )
+
+            if settings.UNIQUE_TRANSLATIONS:
+                options.add_unique_translations()
+
+            if settings.DESCRIPTORS:
+                options.install_descriptors()
+
+class_prepared.connect(prepare_translation_options)
+
+checks.register_checks()
+
+search.connect_signals()
@@ -0,0 +1,257 @@
+import re
+
+from . import settings
+from .fields import TranslationsField
+
+# Match something like en, but also en_us
+LANGUAGE_CODE_RE = re.compile(
+    r'_(?P<base_code>[a-z]{2,7})(_(?P<ext_code>[a-z]{2,7})){0,1}$'
+)
+
+# Mapping of translation models onto the options of their parent model
+translation_models = {}
+
+
+def get_translation_relation(model):
+    """
+    Return a tuple of the translation model and the foreign key pointing
+    from the translation model to `model`.
+    """
+
+    fk = model.translations.related.field
+    return fk.model, fk
+
+
+def split_language_code(code):
+    """
+    Return the base code for a language code like `en-us`, or `None` when
+    the code has no extension.
+    """
+
+    base_pos = code.find('-')
+    if base_pos > 0:
+        return code[:base_pos]
+
+    return None
+
+
+class TranslatedFieldDescriptor(object):
+    """
+    Descriptor providing access to a translated field, either in a specific
+    language or, when `code` is `None`, in the currently active language.
+    """
+
+    def __init__(self, field, code=None, base_code=None):
+        self.field = field
+        self.code = code
+        self.base_code = base_code
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        code = self.code
+        if code is None:
+            code = instance._language
+
+        return instance._resolve_translation(
+            self.field, code, self.base_code
+        )
+
+
+class TranslationOptions(object):
+    """
+    Per-class metadata for a `MultilingualModel`: the translation model and
+    a lookup table mapping attribute names like `title`, `title_nl` or
+    `title_en_us` onto a `(field, language_code, base_code)` tuple.
+
+    Translated fields listed in `deferred_translation_fields` on the model
+    are left out when fetching translations, and loaded when accessed.
+    Those listed in `search_translation_fields` are indexed for full-text
+    search. Changes of translations of models with
+    `track_translation_changes` are recorded.
+
+    A `language_code` of `None` denotes the currently active language.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.translation_model, self.fk = get_translation_relation(model)
+        translation_models[self.translation_model] = self
+
+        # Field storing translations on the model itself, if any
+        self.json_field = None
+        for field in model._meta.fields:
+            if isinstance(field, TranslationsField):
+                self.json_field = field
+                break
+
+        translation_opts = self.translation_model._meta
+        self.fields = [
+            field.name
+            for field in list(translation_opts.fields) +
+            list(translation_opts.many_to_many)
+            if field is not translation_opts.pk and field is not self.fk
+        ]
+
+        # Concrete fields holding translated values
+        self.value_fields = [
+            field for field in translation_opts.fields
+            if field.name in self.fields and field.name != 'language_code'
+        ]
+
+        # Translated fields which are only loaded when accessed
+        self.deferred_fields = tuple(
+            getattr(model, 'deferred_translation_fields', ())
+        )
+
+        # Translated fields in the full-text search index
+        self.search_fields = tuple(
+            getattr(model, 'search_translation_fields', ())
+        )
+
+        # Whether changed translations are recorded
+        self.track_changes = getattr(model, 'track_translation_changes', False)
+
+        self.attributes = {}
+        for field in self.fields:
+            self.attributes[field] = (field, None, None)
+
+            for code, name in settings.LANGUAGES:
+                attr = '%s_%s' % (field, code.replace('-', '_'))
+                self.attributes[attr] = (
+                    field, code, split_language_code(code)
+                )
+
+        # Attributes for languages which have not been configured are
+        # matched once and stored in the lookup table afterwards. Longest
+        # field names go first, so `short_title_en` is never taken for
+        # a `short` field.
+        self.attribute_re = re.compile(r'^(?P<field>%s)%s' % (
+            '|'.join(
+                re.escape(field)
+                for field in sorted(self.fields, key=len, reverse=True)
+            ),
+            LANGUAGE_CODE_RE.pattern
+        ))
+
+    @property
+    def unique_translations(self):
+        """
+        Whether the translation model has a unique constraint on the parent
+        and the language code.
+        """
+
+        unique_fields = set([self.fk.name, 'language_code'])
+
+        for fields in self.translation_model._meta.unique_together:
+            if set(fields) == unique_fields:
+                return True
+
+        return False
+
+    def add_unique_translations(self):
+        """
+        Add the parent and the language code to the `unique_together` of the
+        translation model, unless already present.
+        """
+
+        if self.unique_translations:
+            return
+
+        translation_opts = self.translation_model._meta
+        translation_opts.unique_together = \
+            tuple(translation_opts.unique_together) + \
+            ((self.fk.name, 'language_code'), )
+
+        # Make sure migrations pick up the constraint, for Django >= 1.7
+        original_attrs = getattr(translation_opts, 'original_attrs', None)
+        if original_attrs is not None:
+            original_attrs['unique_together'] = \
+                translation_opts.unique_together
+
+    def install_descriptors(self):
+        """
+        Add a `TranslatedFieldDescriptor` to the model for every translated
+        field, and for every translated field in each of the configured
+        languages, unless the model already has an attribute by that name.
+        """
+
+        for attr, resolved in list(self.attributes.items()):
+            if resolved is not None and not hasattr(self.model, attr):
+                setattr(
+                    self.model, attr, TranslatedFieldDescriptor(*resolved)
+                )
+
+    def resolve(self, attr):
+        """
+        Return the `(field, language_code, base_code)` tuple for a translated
+        attribute, or `None` if `attr` is not a translated attribute.
+        """
+
+        try:
+            return self.attributes[attr]
+
+        except KeyError:
+            pass
+
+        match = self.attribute_re.match(attr)
+        if match:
+            base_code = match.group('base_code')
+            ext_code = match.group('ext_code')
+
+            if ext_code:
+                result = (
+                    match.group('field'),
+                    '%s-%s' % (base_code, ext_code),
+                    base_code
+                )
+            else:
+                result = (match.group('field'), base_code, None)
+
+        else:
+            result = None
+
+        # Negative results are stored as well, making a lookup of an unknown
+        # attribute a single dictionary lookup the next time.
+        self.attributes[attr] = result
+
+        return result
+
+
+def get_translation_options(model):
+    """
+    Return the `TranslationOptions` for a `MultilingualModel` class,
+    creating them when not yet available. Subclasses of a translated model
+    share its options.
+    """
+
+    options = model.__dict__.get('_translation_options')
+
+    if options is None:
+        translation_model, fk = get_translation_relation(model)
+
+        if fk.rel.to is not model:
+            # Subclasses share the options of the model translated
+            options = get_translation_options(fk.rel.to)
+        else:
+            options = TranslationOptions(model)
+
+        model._translation_options = options
+
+    return options
+
+
+def defer_translation_fields(queryset, options, fields=None):
+    """
+    Restrict a queryset of translations to the translated fields in `fields`
+    or, when not given, leave out the deferred translation fields.
+    """
+
+    if fields is not None:
+        return queryset.only(options.fk.name, 'language_code', *fields)
+
+    if options.deferred_fields:
+        return queryset.defer(*options.deferred_fields)
+
+    return queryset
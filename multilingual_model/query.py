@@ -0,0 +1,589 @@
+import logging
+logger = logging.getLogger('multilingual_model')
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    # Python < 2.7
+    from django.utils.datastructures import SortedDict as OrderedDict
+
+from django.core.exceptions import FieldError
+from django.db import connections, models
+from django.db.models.query import QuerySet
+from django.utils.translation import get_language
+
+from . import cache, metrics, search
+from .bulk import upsert_translations
+from .fallbacks import get_fallback_chain, get_fallback_languages
+from .options import defer_translation_fields, get_translation_options
+
+
+# Number of parent objects for which translations are fetched in one go
+CHUNK_SIZE = 100
+
+
+def prefetch_translations(instances, languages, fields=None):
+    """
+    Fetch the translations for `languages` of all given `MultilingualModel`
+    instances with a single query per model and store them in the
+    translation cache of each instance. Languages for which no translation
+    exists are cached as well, so attribute access will not hit the database
+    afterwards.
+
+    When `fields` is given, only those translated fields are fetched and
+    the others are loaded when accessed. Otherwise, the model's
+    `deferred_translation_fields` are left out.
+    """
+
+    by_model = {}
+    for instance in instances:
+        if instance is not None and instance.pk is not None:
+            by_model.setdefault(type(instance), []).append(instance)
+
+    for model, model_instances in by_model.items():
+        options = get_translation_options(model)
+        translation_model, fk = options.translation_model, options.fk
+
+        if options.json_field is not None:
+            # Translations are stored on the objects themselves
+            for instance in model_instances:
+                instance._fetch_translations(languages)
+
+            continue
+
+        by_pk = {}
+        for instance in model_instances:
+            by_pk.setdefault(instance.pk, []).append(instance)
+
+        keys = [(pk, code) for pk in by_pk for code in languages]
+        found = cache.get_translations(translation_model, keys)
+
+        missing_pks = set(pk for pk, code in keys if (pk, code) not in found)
+        if missing_pks:
+            translations = defer_translation_fields(
+                translation_model._default_manager.filter(**{
+                    '%s__in' % fk.name: list(missing_pks),
+                    'language_code__in': languages
+                }), options, fields
+            )
+
+            if metrics.enabled:
+                metrics.record(
+                    'query', model,
+                    languages[0] if len(languages) == 1 else None
+                )
+
+            fetched = {}
+            for pk in missing_pks:
+                for code in languages:
+                    fetched[(pk, code)] = None
+
+            for translation in translations:
+                fetched[(getattr(translation, fk.attname),
+                         translation.language_code)] = translation
+
+            cache.set_translations(translation_model, fetched)
+            found.update(fetched)
+
+            logger.debug(
+                u'Prefetched translations for %d %s objects.',
+                len(missing_pks), model._meta.object_name
+            )
+
+        for pk, pk_instances in by_pk.items():
+            for code in languages:
+                translation_obj = found.get((pk, code))
+
+                for instance in pk_instances:
+                    instance._cache_translation(code, translation_obj)
+
+
+def _follow_relation(instances, path):
+    """
+    Yield the objects reached by following the `__`-separated relation `path`
+    from each of `instances`. Use `select_related` or `prefetch_related` on
+    the queryset to prevent a query per object here.
+    """
+
+    related = instances
+    for attr in path.split('__'):
+        next_related = []
+
+        for obj in related:
+            value = getattr(obj, attr, None)
+
+            if isinstance(value, models.Manager):
+                next_related.extend(value.all())
+            elif value is not None:
+                next_related.append(value)
+
+        related = next_related
+
+    return related
+
+
+def _prepare_like(connection, value):
+    return connection.ops.prep_for_like_query(value)
+
+
+# Lookups supported by `filter_translated()`, along with functions preparing
+# the value to compare with.
+TRANSLATED_LOOKUPS = {
+    'exact': lambda connection, value: value,
+    'iexact': lambda connection, value:
+        connection.ops.prep_for_iexact_query(value),
+    'contains': lambda connection, value:
+        '%%%s%%' % _prepare_like(connection, value),
+    'icontains': lambda connection, value:
+        '%%%s%%' % _prepare_like(connection, value),
+    'startswith': lambda connection, value:
+        '%s%%' % _prepare_like(connection, value),
+    'istartswith': lambda connection, value:
+        '%s%%' % _prepare_like(connection, value),
+    'endswith': lambda connection, value:
+        '%%%s' % _prepare_like(connection, value),
+    'iendswith': lambda connection, value:
+        '%%%s' % _prepare_like(connection, value),
+    'gt': lambda connection, value: value,
+    'gte': lambda connection, value: value,
+    'lt': lambda connection, value: value,
+    'lte': lambda connection, value: value,
+}
+
+
+# Aggregates concatenating the language codes of translations, by vendor
+AVAILABLE_LANGUAGES_SQL = {
+    'sqlite': "GROUP_CONCAT(%(column)s, ',')",
+    'mysql': "GROUP_CONCAT(%(column)s SEPARATOR ',')",
+    'postgresql': "array_to_string(array_agg(%(column)s), ',')",
+    'oracle': "LISTAGG(%(column)s, ',') WITHIN GROUP (ORDER BY %(column)s)",
+}
+
+
+class MultilingualQuerySet(QuerySet):
+    """ QuerySet for `MultilingualModel`, able to prefetch translations. """
+
+    _translation_languages = None
+    _language = None
+    _translation_related = ()
+    _translation_fields = None
+    _translated_columns = {}
+    _available_languages = False
+
+    def _clone(self, *args, **kwargs):
+        clone = super(MultilingualQuerySet, self)._clone(*args, **kwargs)
+
+        clone._translation_languages = self._translation_languages
+        clone._language = self._language
+        clone._translation_related = self._translation_related
+        clone._translation_fields = self._translation_fields
+        clone._translated_columns = self._translated_columns
+        clone._available_languages = self._available_languages
+
+        return clone
+
+    def _translated_column_sql(self, field, chain):
+        """
+        Return the SQL and parameters selecting the value of a translated
+        field for the first language in `chain` having a translation.
+        """
+
+        options = get_translation_options(self.model)
+
+        if field not in options.fields:
+            raise FieldError(
+                u"Cannot resolve keyword '%s' into a translated field. "
+                u"Choices are: %s" % (field, ', '.join(options.fields))
+            )
+
+        qn = connections[self.db].ops.quote_name
+        translation_opts = options.translation_model._meta
+        translation_table = qn(translation_opts.db_table)
+
+        subquery = (
+            '(SELECT %(table)s.%(column)s FROM %(table)s'
+            ' WHERE %(table)s.%(fk)s = %(parent_table)s.%(parent_pk)s'
+            ' AND %(table)s.%(language_code)s = %%s)'
+        ) % {
+            'table': translation_table,
+            'column': qn(translation_opts.get_field(field).column),
+            'fk': qn(options.fk.column),
+            'parent_table': qn(self.model._meta.db_table),
+            'parent_pk': qn(self.model._meta.pk.column),
+            'language_code': qn(
+                translation_opts.get_field('language_code').column
+            ),
+        }
+
+        if len(chain) == 1:
+            sql = subquery
+        else:
+            sql = 'COALESCE(%s)' % ', '.join([subquery] * len(chain))
+
+        return sql, list(chain)
+
+    def translated(self, *fields, **kwargs):
+        """
+        Annotate the objects with the values of the given translated fields
+        for `language`, which defaults to the language of the queryset or
+        the current language. Unless
+        `fallback` is `False`, values for the languages in the fallback
+        chain are used when no translation is available.
+
+        The values are selected along with the objects themselves, so they
+        can be used with `order_by()`, `values()`, `values_list()` and
+        `filter_translated()`.
+
+        Example::
+
+            Book.objects.translated('title', language='nl').order_by('title')
+
+        """
+
+        language = kwargs.pop('language', None) or self._language or \
+            get_language()
+        fallback = kwargs.pop('fallback', True)
+        if kwargs:
+            raise TypeError(
+                u"translated() got an unexpected keyword argument '%s'"
+                % list(kwargs.keys())[0]
+            )
+
+        if fallback:
+            chain = get_fallback_chain(language)
+        else:
+            chain = (language, )
+
+        select = OrderedDict()
+        select_params = []
+        translated_columns = dict(self._translated_columns)
+
+        for field in fields:
+            sql, params = self._translated_column_sql(field, chain)
+
+            select[field] = sql
+            select_params.extend(params)
+            translated_columns[field] = (sql, params)
+
+        clone = self.extra(select=select, select_params=select_params)
+        clone._translated_columns = translated_columns
+
+        return clone
+
+    def filter_translated(self, **kwargs):
+        """
+        Filter on translated fields annotated with `translated()`, using the
+        lookups in `TRANSLATED_LOOKUPS` or `isnull`.
+
+        Example::
+
+            Book.objects.translated('title').filter_translated(
+                title__icontains='django'
+            )
+
+        """
+
+        connection = connections[self.db]
+        where = []
+        params = []
+
+        for lookup, value in kwargs.items():
+            if '__' in lookup:
+                field, lookup_type = lookup.rsplit('__', 1)
+            else:
+                field, lookup_type = lookup, 'exact'
+
+            if field not in self._translated_columns:
+                raise FieldError(
+                    u"Translated field '%s' has not been annotated, "
+                    u"use translated() first." % field
+                )
+
+            sql, sql_params = self._translated_columns[field]
+
+            if lookup_type == 'isnull':
+                where.append(
+                    '%s IS %sNULL' % (sql, '' if value else 'NOT ')
+                )
+                params.extend(sql_params)
+
+            elif lookup_type in TRANSLATED_LOOKUPS:
+                where.append('%s %s' % (
+                    connection.ops.lookup_cast(lookup_type) % sql,
+                    connection.operators[lookup_type] % '%s'
+                ))
+                params.extend(sql_params)
+                params.append(
+                    TRANSLATED_LOOKUPS[lookup_type](connection, value)
+                )
+
+            else:
+                raise FieldError(
+                    u"Unsupported lookup '%s' for translated field '%s'."
+                    % (lookup_type, field)
+                )
+
+        return self.extra(where=where, params=params)
+
+    def with_available_languages(self):
+        """
+        Annotate the objects with `available_languages`, the sorted list of
+        language codes they have been translated to. The codes are selected
+        along with the objects themselves, using an aggregate subquery; with
+        `values()` and `values_list()` they are a comma-separated string.
+
+        Example::
+
+            for book in Book.objects.with_available_languages():
+                print(book.available_languages)
+
+        """
+
+        connection = connections[self.db]
+
+        if connection.vendor not in AVAILABLE_LANGUAGES_SQL:
+            raise NotImplementedError(
+                u"with_available_languages() is not supported on %s."
+                % connection.vendor
+            )
+
+        qn = connection.ops.quote_name
+        options = get_translation_options(self.model)
+        translation_opts = options.translation_model._meta
+        translation_table = qn(translation_opts.db_table)
+
+        sql = (
+            '(SELECT %(aggregate)s FROM %(table)s'
+            ' WHERE %(table)s.%(fk)s = %(parent_table)s.%(parent_pk)s)'
+        ) % {
+            'aggregate': AVAILABLE_LANGUAGES_SQL[connection.vendor] % {
+                'column': '%s.%s' % (
+                    translation_table,
+                    qn(translation_opts.get_field('language_code').column)
+                )
+            },
+            'table': translation_table,
+            'fk': qn(options.fk.column),
+            'parent_table': qn(self.model._meta.db_table),
+            'parent_pk': qn(self.model._meta.pk.column),
+        }
+
+        clone = self.extra(select={'available_languages': sql})
+        clone._available_languages = True
+
+        return clone
+
+    def bulk_set_translations(self, mapping):
+        """
+        Create or update translations for objects in this queryset from a
+        dictionary mapping objects, or their primary keys, onto dictionaries
+        mapping language codes onto translated field values, in a single
+        transaction. Translations cached on the given objects are replaced by
+        the written ones. Returns a tuple with the number of created and
+        updated translations.
+
+        Example::
+
+            Book.objects.bulk_set_translations({
+                book: {'en': {'title': 'Django for Dummies'}},
+                2: {'nl': {'title': 'Django voor Dummies'}}
+            })
+
+        """
+
+        fk = get_translation_options(self.model).fk
+
+        instances = []
+        by_pk = {}
+        for key, translations in mapping.items():
+            if isinstance(key, models.Model):
+                instances.append(key)
+                key = key.pk
+
+            # Keys from JSON or request data are strings
+            key = self.model._meta.pk.to_python(key)
+
+            by_pk.setdefault(key, {}).update(translations)
+
+        found = set(
+            self.filter(pk__in=list(by_pk)).values_list('pk', flat=True)
+        )
+        missing = set(by_pk) - found
+        if missing:
+            raise self.model.DoesNotExist(
+                u"%s matching query does not exist for primary keys: %s" % (
+                    self.model._meta.object_name,
+                    ', '.join(sorted(str(pk) for pk in missing))
+                )
+            )
+
+        rows = []
+        for pk, translations in by_pk.items():
+            for code, values in translations.items():
+                row = dict(values)
+                row[fk.name] = pk
+                row['language_code'] = code
+                rows.append(row)
+
+        return upsert_translations(self.model, rows, instances)
+
+    def search(self, text, language=None, limit=None):
+        """
+        Return a list of the objects whose translation in `language`, which
+        defaults to the language of the queryset or the current language,
+        matches all terms in `text`, ranked by relevance. See
+        `multilingual_model.search.search()`.
+
+        Example::
+
+            Book.objects.search('django beginners', language='en')
+
+        """
+
+        return search.search(self, text, language, limit)
+
+    def in_language(self, language):
+        """
+        Use `language`, rather than the language active when accessing them,
+        for translated attributes without a language code of the objects
+        from this queryset, and as the default language for `translated()`
+        and `with_translations()`.
+
+        Example::
+
+            Book.objects.in_language('nl').with_translations()
+
+        """
+
+        clone = self._clone()
+        clone._language = language
+
+        return clone
+
+    def with_translations(self, *languages, **kwargs):
+        """
+        Prefetch translations for the given language codes, and the
+        languages they fall back to, using a single query for every chunk of
+        results. Without language codes, the translations for the language
+        of the queryset, or the language active upon evaluation, are fetched.
+
+        The `related` keyword argument takes a list of relations (i.e.
+        `author` or `author__publisher`) whose `MultilingualModel` objects
+        should have their translations prefetched as well.
+
+        The `fields` keyword argument limits the translated fields which are
+        fetched; other fields are loaded when accessed.
+
+        Example::
+
+            Book.objects.select_related('author').with_translations(
+                'nl', 'en', related=['author'], fields=['title']
+            )
+
+        """
+
+        related = kwargs.pop('related', ())
+        fields = kwargs.pop('fields', None)
+        if kwargs:
+            raise TypeError(
+                u"with_translations() got an unexpected keyword argument '%s'"
+                % list(kwargs.keys())[0]
+            )
+
+        clone = self._clone()
+        clone._translation_languages = tuple(languages)
+        clone._translation_related = tuple(related)
+        clone._translation_fields = fields
+
+        return clone
+
+    def _prefetch_translations(self, instances):
+        languages = self._translation_languages
+        if not languages:
+            languages = (self._language or get_language(), )
+
+        languages = get_fallback_languages(languages)
+
+        prefetch_translations(instances, languages, self._translation_fields)
+
+        for path in self._translation_related:
+            prefetch_translations(
+                _follow_relation(instances, path), languages
+            )
+
+    def _set_language(self, iterator):
+        for obj in iterator:
+            obj._language = self._language
+            yield obj
+
+    def _split_available_languages(self, iterator):
+        for obj in iterator:
+            if obj.available_languages:
+                obj.available_languages = sorted(
+                    obj.available_languages.split(',')
+                )
+            else:
+                obj.available_languages = []
+
+            yield obj
+
+    def iterator(self):
+        iterator = super(MultilingualQuerySet, self).iterator()
+
+        if self._language is not None:
+            iterator = self._set_language(iterator)
+
+        if self._available_languages:
+            iterator = self._split_available_languages(iterator)
+
+        if self._translation_languages is None:
+            for obj in iterator:
+                yield obj
+
+            return
+
+        chunk = []
+        for obj in iterator:
+            chunk.append(obj)
+
+            if len(chunk) >= CHUNK_SIZE:
+                self._prefetch_translations(chunk)
+
+                for chunk_obj in chunk:
+                    yield chunk_obj
+
+                chunk = []
+
+        if chunk:
+            self._prefetch_translations(chunk)
+
+            for chunk_obj in chunk:
+                yield chunk_obj
+
+
+class MultilingualManager(models.Manager):
+    """ Default manager for `MultilingualModel`. """
+
+    def get_queryset(self):
+        return MultilingualQuerySet(self.model, using=self._db)
+
+    # Django < 1.6 compatibility
+    get_query_set = get_queryset
+
+    def bulk_set_translations(self, mapping):
+        return self.get_queryset().bulk_set_translations(mapping)
+
+    def in_language(self, language):
+        return self.get_queryset().in_language(language)
+
+    def search(self, text, language=None, limit=None):
+        return self.get_queryset().search(text, language, limit)
+
+    def with_available_languages(self):
+        return self.get_queryset().with_available_languages()
+
+    def with_translations(self, *languages, **kwargs):
+        return self.get_queryset().with_translations(*languages, **kwargs)
+
+    def translated(self, *fields, **kwargs):
+        return self.get_queryset().translated(*fields, **kwargs)
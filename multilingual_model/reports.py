@@ -0,0 +1,124 @@
+"""
+Reports on the completeness of translations, computed with aggregate
+queries rather than by looking at every object.
+"""
+
+from django.db import connections, models
+
+from . import settings
+from .options import get_translation_options, translation_models
+
+
+def get_multilingual_models():
+    """ Return all multilingual models, sorted by their label. """
+
+    return sorted(
+        [options.model for options in translation_models.values()],
+        key=lambda model: (model._meta.app_label, model._meta.object_name)
+    )
+
+
+def _count_translations(options, using):
+    """
+    Return a dictionary mapping language codes onto the number of
+    translations and the number of translations having a value for each
+    of the translated fields, using a single query.
+    """
+
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    translation_opts = options.translation_model._meta
+
+    counts = []
+    for field in options.value_fields:
+        condition = '%s IS NOT NULL' % qn(field.column)
+
+        if isinstance(field, (models.CharField, models.TextField)):
+            condition += " AND %s <> ''" % qn(field.column)
+
+        counts.append('SUM(CASE WHEN %s THEN 1 ELSE 0 END)' % condition)
+
+    language_code = qn(translation_opts.get_field('language_code').column)
+
+    cursor = connection.cursor()
+    cursor.execute('SELECT %s, COUNT(*)%s FROM %s GROUP BY %s' % (
+        language_code, ''.join(', %s' % count for count in counts),
+        qn(translation_opts.db_table), language_code
+    ))
+
+    result = {}
+    for row in cursor.fetchall():
+        fields = {}
+        for field, count in zip(options.value_fields, row[2:]):
+            fields[field.name] = int(count or 0)
+
+        result[row[0]] = {'translations': row[1], 'fields': fields}
+
+    return result
+
+
+def get_coverage(model, languages=None, missing_limit=100, using=None):
+    """
+    Return a dictionary describing how completely the objects of a
+    `MultilingualModel` have been translated:
+
+    `total`
+        The number of objects.
+    `languages`
+        A list of dictionaries, for the given languages (by default the
+        configured languages and those having translations), with the
+        `language_code`, the number of `translations` and a mapping of
+        `fields` onto the number of translations having a value for them.
+    `fields`
+        The names of the translated fields.
+    `missing_default`
+        The number of objects without a translation in the default language.
+    `missing_default_pks`
+        The primary keys of at most `missing_limit` of those objects.
+
+    The report takes four queries, regardless of the number of objects.
+    """
+
+    options = get_translation_options(model)
+    manager = model._default_manager
+    if using is not None:
+        manager = manager.db_manager(using)
+
+    using = manager.db
+
+    counts = _count_translations(options, using)
+
+    if languages is None:
+        languages = [code for code, name in settings.LANGUAGES]
+        languages.extend(sorted(
+            code for code in counts if code not in languages
+        ))
+
+    empty = dict((field.name, 0) for field in options.value_fields)
+
+    language_counts = []
+    for code in languages:
+        count = counts.get(code, {'translations': 0, 'fields': empty})
+
+        language_counts.append({
+            'language_code': code,
+            'translations': count['translations'],
+            'fields': count['fields'],
+        })
+
+    missing_default = manager.exclude(
+        pk__in=options.translation_model._default_manager.using(using)
+        .filter(language_code=settings.DEFAULT_LANGUAGE)
+        .values(options.fk.name)
+    )
+
+    return {
+        'total': manager.count(),
+        'languages': language_counts,
+        'fields': [field.name for field in options.value_fields],
+        'missing_default': missing_default.count(),
+        'missing_default_pks': list(
+            missing_default.order_by('pk')
+            .values_list('pk', flat=True)[:missing_limit]
+        ),
+    }
@@ -0,0 +1,464 @@
+"""
+Full-text search of translated fields, per language.
+
+Models list the translated fields to search in `search_translation_fields`.
+Their translations are indexed in a separate table next to the translation
+table: an FTS5 table on SQLite and a table of `tsvector` documents on
+PostgreSQL, using the text search configuration for the language of each
+translation. The index is created along with the other tables, and kept up
+to date whenever translations are saved, deleted or written in bulk.
+
+On other databases, or when SQLite lacks FTS5, searching falls back to
+case-insensitive matching of every search term, without ranking.
+"""
+
+import logging
+logger = logging.getLogger('multilingual_model')
+
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, models
+from django.db.models import Q
+from django.utils.six.moves import reduce
+from django.utils.translation import get_language
+
+from . import settings
+from .options import (
+    get_translation_options, split_language_code, translation_models
+)
+from .utils import iterate_pks
+
+
+# PostgreSQL text search configurations by language code
+SEARCH_CONFIGS = {
+    'da': 'danish',
+    'de': 'german',
+    'en': 'english',
+    'es': 'spanish',
+    'fi': 'finnish',
+    'fr': 'french',
+    'hu': 'hungarian',
+    'it': 'italian',
+    'nb': 'norwegian',
+    'nl': 'dutch',
+    'no': 'norwegian',
+    'pt': 'portuguese',
+    'ro': 'romanian',
+    'ru': 'russian',
+    'sv': 'swedish',
+    'tr': 'turkish',
+}
+SEARCH_CONFIGS.update(settings.SEARCH_CONFIGS)
+
+# Number of parent objects indexed per query when rebuilding the index
+BATCH_SIZE = 100
+
+# Whether the search index exists, by database alias and table
+_index_tables = {}
+
+
+def get_search_config(language_code):
+    """
+    Return the PostgreSQL text search configuration for a language code,
+    using the configuration for its base language if needed.
+    """
+
+    if language_code in SEARCH_CONFIGS:
+        return SEARCH_CONFIGS[language_code]
+
+    base_code = split_language_code(language_code)
+    return SEARCH_CONFIGS.get(base_code, 'simple')
+
+
+def get_index_table(options):
+    return '%s_search' % options.translation_model._meta.db_table
+
+
+def _get_backend(connection):
+    if connection.vendor in ('sqlite', 'postgresql'):
+        return connection.vendor
+
+    return None
+
+
+def _column_type(field, connection):
+    if isinstance(field, models.AutoField):
+        return 'integer'
+
+    if isinstance(field, models.ForeignKey):
+        return _column_type(field.rel.get_related_field(), connection)
+
+    return field.db_type(connection)
+
+
+def _quote_fts_query(text):
+    """ Match all terms in `text`, ignoring FTS5 query syntax. """
+
+    return ' '.join(
+        '"%s"' % term.replace('"', '""') for term in text.split()
+    )
+
+
+def index_exists(options, using=DEFAULT_DB_ALIAS):
+    """ Return whether the search index for a model has been created. """
+
+    key = (using, get_index_table(options))
+
+    if key not in _index_tables:
+        _index_tables[key] = key[1] in \
+            connections[using].introspection.table_names()
+
+    return _index_tables[key]
+
+
+def create_index(options, using=DEFAULT_DB_ALIAS):
+    """
+    Create the search index for the translations of a model, returning
+    `False` when the database does not support it.
+    """
+
+    connection = connections[using]
+    backend = _get_backend(connection)
+    qn = connection.ops.quote_name
+    translation_opts = options.translation_model._meta
+    table = get_index_table(options)
+
+    if backend == 'sqlite':
+        try:
+            connection.cursor().execute(
+                'CREATE VIRTUAL TABLE %s USING fts5('
+                'language_code UNINDEXED, parent_id UNINDEXED, %s)' % (
+                    qn(table), ', '.join(
+                        qn(translation_opts.get_field(field).column)
+                        for field in options.search_fields
+                    )
+                )
+            )
+
+        except DatabaseError:
+            logger.warning(
+                u'SQLite lacks FTS5, not indexing %s.',
+                translation_opts.object_name
+            )
+
+            return False
+
+    elif backend == 'postgresql':
+        cursor = connection.cursor()
+        cursor.execute(
+            'CREATE TABLE %s (translation_id %s PRIMARY KEY, '
+            'parent_id %s NOT NULL, language_code varchar(7) NOT NULL, '
+            'document tsvector NOT NULL)' % (
+                qn(table), _column_type(translation_opts.pk, connection),
+                _column_type(options.fk, connection)
+            )
+        )
+        cursor.execute('CREATE INDEX %s ON %s USING gin(document)' % (
+            qn('%s_document' % table), qn(table)
+        ))
+
+    else:
+        return False
+
+    _index_tables[(using, table)] = True
+
+    return True
+
+
+def _delete_rows(options, translation_pks, connection):
+    """
+    Remove the rows of the translations with the given primary keys from the
+    index, looking them up by the primary key of the index table.
+    """
+
+    qn = connection.ops.quote_name
+
+    if _get_backend(connection) == 'sqlite':
+        column = 'rowid'
+    else:
+        column = 'translation_id'
+
+    translation_pks = list(translation_pks)
+
+    for start in range(0, len(translation_pks), BATCH_SIZE):
+        batch = translation_pks[start:start + BATCH_SIZE]
+
+        connection.cursor().execute(
+            'DELETE FROM %s WHERE %s IN (%s)' % (
+                qn(get_index_table(options)), column,
+                ', '.join(['%s'] * len(batch))
+            ), batch
+        )
+
+
+def _insert_rows(options, rows, connection):
+    """
+    Index rows of the translation pk, the parent pk, the language code and
+    the values of the search fields.
+    """
+
+    qn = connection.ops.quote_name
+    table = qn(get_index_table(options))
+    translation_opts = options.translation_model._meta
+
+    if _get_backend(connection) == 'sqlite':
+        connection.cursor().executemany(
+            'INSERT INTO %s (rowid, language_code, parent_id, %s) '
+            'VALUES (%s)' % (
+                table, ', '.join(
+                    qn(translation_opts.get_field(field).column)
+                    for field in options.search_fields
+                ),
+                ', '.join(['%s'] * (len(options.search_fields) + 3))
+            ),
+            [
+                (pk, code, parent_pk) + tuple(
+                    value or u'' for value in values
+                )
+                for pk, parent_pk, code, values in rows
+            ]
+        )
+
+    else:
+        connection.cursor().executemany(
+            'INSERT INTO %s (translation_id, parent_id, language_code, '
+            'document) VALUES (%%s, %%s, %%s, '
+            'to_tsvector(%%s::regconfig, %%s))' % table,
+            [
+                (pk, parent_pk, code, get_search_config(code), u' '.join(
+                    value for value in values if value
+                ))
+                for pk, parent_pk, code, values in rows
+            ]
+        )
+
+
+def _can_index(options, connection, using):
+    return options.search_fields and \
+        _get_backend(connection) is not None and \
+        index_exists(options, using)
+
+
+def index_parents(model, parent_pks, using=DEFAULT_DB_ALIAS):
+    """
+    Replace the indexed translations of the objects of `model` with the
+    given primary keys by their current translations. Translations deleted
+    without sending signals should be removed with `unindex_translations()`.
+    """
+
+    options = get_translation_options(model)
+    connection = connections[using]
+
+    if not parent_pks or not _can_index(options, connection, using):
+        return
+
+    translations = list(options.translation_model._default_manager.using(
+        using
+    ).filter(**{
+        '%s__in' % options.fk.name: list(parent_pks)
+    }).values_list(
+        'pk', options.fk.name, 'language_code', *options.search_fields
+    ))
+
+    _delete_rows(options, [row[0] for row in translations], connection)
+    _insert_rows(options, [
+        (row[0], row[1], row[2], row[3:]) for row in translations
+    ], connection)
+
+
+def unindex_translations(model, translation_pks, using=DEFAULT_DB_ALIAS):
+    """
+    Remove the translations of `model` with the given primary keys from the
+    search index.
+    """
+
+    options = get_translation_options(model)
+    connection = connections[using]
+
+    if not translation_pks or not _can_index(options, connection, using):
+        return
+
+    _delete_rows(options, translation_pks, connection)
+
+
+def rebuild_index(model, using=DEFAULT_DB_ALIAS, batch_size=BATCH_SIZE):
+    """ Index the translations of all objects of `model` from scratch. """
+
+    options = get_translation_options(model)
+    connection = connections[using]
+
+    if not _can_index(options, connection, using):
+        return
+
+    connection.cursor().execute(
+        'DELETE FROM %s' % connection.ops.quote_name(get_index_table(options))
+    )
+
+    for pks in iterate_pks(model._default_manager.using(using), batch_size):
+        index_parents(model, pks, using)
+
+
+def translation_saved(sender, instance, **kwargs):
+    """ Signal handler updating the search index for a saved translation. """
+
+    options = translation_models[sender]
+
+    parent_pk = getattr(instance, options.fk.attname)
+    if parent_pk is not None:
+        index_parents(
+            options.model, [parent_pk], kwargs.get('using') or DEFAULT_DB_ALIAS
+        )
+
+
+def translation_deleted(sender, instance, **kwargs):
+    """
+    Signal handler removing a deleted translation from the search index.
+    """
+
+    # The primary key is still set in post_delete
+    unindex_translations(
+        translation_models[sender].model, [instance.pk],
+        kwargs.get('using') or DEFAULT_DB_ALIAS
+    )
+
+
+def create_indexes(sender, **kwargs):
+    """
+    Signal handler creating, and filling, the search indexes which do not
+    exist yet after the database tables have been created.
+    """
+
+    using = kwargs.get('using') or kwargs.get('db') or DEFAULT_DB_ALIAS
+    _index_tables.clear()
+
+    for options in list(translation_models.values()):
+        if not options.search_fields:
+            continue
+
+        if options.translation_model._meta.db_table not in \
+                connections[using].introspection.table_names():
+            continue
+
+        if not index_exists(options, using) and create_index(options, using):
+            rebuild_index(options.model, using)
+
+
+def connect_signals():
+    try:
+        from django.db.models.signals import post_migrate
+    except ImportError:
+        # Django < 1.7
+        from django.db.models.signals import post_syncdb as post_migrate
+
+    post_migrate.connect(
+        create_indexes, dispatch_uid='multilingual_model.search'
+    )
+
+
+def _search_index(options, text, language, limit, connection):
+    """
+    Return a list of `(parent pk, rank)` tuples for the translations in
+    `language` matching `text` in the search index, best matches first.
+    """
+
+    qn = connection.ops.quote_name
+    table = qn(get_index_table(options))
+
+    if _get_backend(connection) == 'sqlite':
+        # bm25() is lower for better matches
+        sql = (
+            'SELECT parent_id, -bm25(%(table)s) FROM %(table)s '
+            'WHERE %(table)s MATCH %%s AND language_code = %%s '
+            'ORDER BY bm25(%(table)s)'
+        ) % {'table': table}
+        params = [_quote_fts_query(text), language]
+
+    else:
+        sql = (
+            'SELECT parent_id, ts_rank(document, query) '
+            'FROM %s, plainto_tsquery(%%s::regconfig, %%s) query '
+            'WHERE language_code = %%s AND document @@ query '
+            'ORDER BY 2 DESC'
+        ) % table
+        params = [get_search_config(language), text, language]
+
+    if limit is not None:
+        sql += ' LIMIT %d' % int(limit)
+
+    cursor = connection.cursor()
+    cursor.execute(sql, params)
+
+    return [(parent_pk, rank) for parent_pk, rank in cursor.fetchall()]
+
+
+def _search_fields(options, text, language, limit, using):
+    """
+    Return a list of `(parent pk, rank)` tuples for the translations in
+    `language` containing all terms in `text` in any of the search fields.
+    """
+
+    translations = options.translation_model._default_manager.using(
+        using
+    ).filter(language_code=language)
+
+    for term in text.split():
+        translations = translations.filter(reduce(
+            lambda a, b: a | b, [
+                Q(**{'%s__icontains' % field: term})
+                for field in options.search_fields
+            ]
+        ))
+
+    parent_pks = translations.order_by(options.fk.name).values_list(
+        options.fk.name, flat=True
+    )
+
+    if limit is not None:
+        parent_pks = parent_pks[:limit]
+
+    return [(parent_pk, 1.0) for parent_pk in parent_pks]
+
+
+def search(queryset, text, language=None, limit=None):
+    """
+    Return a list of the objects in a queryset of a `MultilingualModel`
+    whose translation in `language` matches all terms in `text`, the best
+    matches first. Every object has its relevance as `search_rank`, and its
+    translations for `language` and its fallbacks prefetched. `limit`
+    limits the number of matching translations.
+    """
+
+    model = queryset.model
+    options = get_translation_options(model)
+
+    if not options.search_fields:
+        raise ValueError(
+            u"%s has no search_translation_fields." % model._meta.object_name
+        )
+
+    language = language or queryset._language or get_language()
+
+    if not text.split():
+        return []
+
+    connection = connections[queryset.db]
+    backend = _get_backend(connection)
+
+    if backend is not None and index_exists(options, queryset.db):
+        ranks = _search_index(options, text, language, limit, connection)
+    else:
+        ranks = _search_fields(options, text, language, limit, queryset.db)
+
+    objects = {}
+    for obj in queryset.filter(
+        pk__in=[parent_pk for parent_pk, rank in ranks]
+    ).with_translations(language):
+        objects[obj.pk] = obj
+
+    result = []
+    for parent_pk, rank in ranks:
+        obj = objects.get(parent_pk)
+
+        if obj is not None:
+            obj.search_rank = rank
+            result.append(obj)
+
+    return result
@@ -0,0 +1,152 @@
+"""
+Serializing the translations of many objects as plain dictionaries, without
+instantiating models, in chunks to keep memory usage constant.
+"""
+
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from . import settings
+from .fallbacks import get_fallback_chain, get_fallback_languages
+from .options import get_translation_options
+from .transfer import chunked
+from .utils import iterate_values
+
+
+# Number of objects serialized per chunk
+CHUNK_SIZE = 100
+
+
+def _fetch_values(options, rows, fields, languages):
+    """
+    Return a dictionary mapping `(parent pk, language code)` onto the
+    values of the translated `fields` of the parents in `rows`.
+    """
+
+    values = {}
+
+    if options.json_field is not None:
+        attnames = [
+            options.translation_model._meta.get_field(field).attname
+            for field in fields
+        ]
+
+        for pk, json_value in rows:
+            translations = options.json_field.to_python(json_value)
+
+            for code in languages:
+                stored = translations.get(code)
+
+                if stored is not None:
+                    values[(pk, code)] = tuple(
+                        stored.get(attname) for attname in attnames
+                    )
+
+        return values
+
+    translations = options.translation_model._default_manager.filter(**{
+        '%s__in' % options.fk.name: [row[0] for row in rows],
+        'language_code__in': languages
+    }).values_list(options.fk.attname, 'language_code', *fields)
+
+    for row in translations:
+        values[(row[0], row[1])] = row[2:]
+
+    return values
+
+
+def serialize_translations(queryset, fields=None, languages=None,
+                           chunk_size=CHUNK_SIZE, fallback=False):
+    """
+    Yield a dictionary for every object in a queryset of a
+    `MultilingualModel`, holding its primary key as `id` and, for each of
+    the translated `fields`, a dictionary mapping each of `languages` onto
+    the translated value::
+
+        {'id': 1, 'title': {'en': 'Django for Dummies', 'nl': None}}
+
+    Fields default to all translated fields and languages to all configured
+    languages. Values are `None` for missing translations unless `fallback`
+    is `True`, in which case the languages in the fallback chain are used.
+
+    Objects are read in chunks of `chunk_size`, with one query for the
+    objects and one for their translations per chunk.
+    """
+
+    options = get_translation_options(queryset.model)
+
+    if fields is None:
+        fields = [field.name for field in options.value_fields]
+
+    if languages is None:
+        languages = [code for code, name in settings.LANGUAGES]
+
+    if fallback:
+        fetched_languages = get_fallback_languages(languages)
+        chains = dict(
+            (code, get_fallback_chain(code)) for code in languages
+        )
+    else:
+        fetched_languages = list(languages)
+        chains = dict((code, (code, )) for code in languages)
+
+    if options.json_field is not None:
+        parent_fields = [options.json_field.attname]
+    else:
+        parent_fields = []
+
+    # Rows are tuples of the primary key and the parent fields
+    value_fields = [queryset.model._meta.pk.attname] + parent_fields
+
+    for chunk in chunked(
+        iterate_values(queryset, value_fields, chunk_size), chunk_size
+    ):
+        rows = [tuple(row[field] for field in value_fields) for row in chunk]
+        values = _fetch_values(options, rows, fields, fetched_languages)
+
+        for row in rows:
+            pk = row[0]
+            result = {'id': pk}
+
+            for field in fields:
+                result[field] = {}
+
+            for code in languages:
+                found = None
+                for chain_code in chains[code]:
+                    found = values.get((pk, chain_code))
+
+                    if found is not None:
+                        break
+
+                for index, field in enumerate(fields):
+                    if found is None:
+                        result[field][code] = None
+                    else:
+                        result[field][code] = found[index]
+
+            yield result
+
+
+def stream_json(queryset, **kwargs):
+    """
+    Yield the output of `serialize_translations()` as pieces of a JSON
+    array, to be used with a `StreamingHttpResponse`::
+
+        StreamingHttpResponse(
+            stream_json(Book.objects.all(), languages=['en', 'nl']),
+            content_type='application/json'
+        )
+
+    """
+
+    separator = u'['
+    for result in serialize_translations(queryset, **kwargs):
+        yield separator + json.dumps(result, cls=DjangoJSONEncoder)
+        separator = u',\n'
+
+    if separator == u'[':
+        yield u'[]'
+    else:
+        yield u']'
@@ -20,3 +20,55 @@ LANGUAGES = getattr(
 HIDE_LANGUAGE = getattr(
     settings, 'MULTILINGUAL_HIDE_LANGUAGE', len(LANGUAGES) == 1
 )
+
+DESCRIPTORS = getattr(
+    settings, 'MULTILINGUAL_DESCRIPTORS', False
+)
+
+CACHE = getattr(
+    settings, 'MULTILINGUAL_CACHE', None
+)
+
+CACHE_TIMEOUT = getattr(
+    settings, 'MULTILINGUAL_CACHE_TIMEOUT', 300
+)
+
+LOCAL_CACHE_ENTRIES = getattr(
+    settings, 'MULTILINGUAL_LOCAL_CACHE_ENTRIES', 0
+)
+
+LOCAL_CACHE_BYTES = getattr(
+    settings, 'MULTILINGUAL_LOCAL_CACHE_BYTES', None
+)
+
+LOCAL_CACHE_TIMEOUT = getattr(
+    settings, 'MULTILINGUAL_LOCAL_CACHE_TIMEOUT', None
+)
+
+FALLBACKS = getattr(
+    settings, 'MULTILINGUAL_FALLBACKS', {}
+)
+
+SEARCH_CONFIGS = getattr(
+    settings, 'MULTILINGUAL_SEARCH_CONFIGS', {}
+)
+
+UNIQUE_TRANSLATIONS = getattr(
+    settings, 'MULTILINGUAL_UNIQUE_TRANSLATIONS', True
+)
+
+WARM_CACHE = getattr(
+    settings, 'MULTILINGUAL_WARM_CACHE', {}
+)
+
+WARM_CACHE_ON_STARTUP = getattr(
+    settings, 'MULTILINGUAL_WARM_CACHE_ON_STARTUP', False
+)
+
+WARM_CACHE_SECONDS = getattr(
+    settings, 'MULTILINGUAL_WARM_CACHE_SECONDS', None
+)
+
+CHANGE_FEED_LAG = getattr(
+    settings, 'MULTILINGUAL_CHANGE_FEED_LAG', 5
+)
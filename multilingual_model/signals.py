@@ -0,0 +1,9 @@
+from django.dispatch import Signal
+
+
+# Sent when a translated field could not be resolved for the requested
+# language, with the language used instead and the depth in its fallback
+# chain. Both are `None` when no translation could be found at all.
+translation_fallback = Signal(providing_args=[
+    'instance', 'field', 'language_code', 'resolved_language_code', 'depth'
+])
@@ -0,0 +1,231 @@
+"""
+Sitemaps listing the URLs of multilingual objects for every language they
+have been translated to, with `hreflang` alternates, and a view streaming
+them rather than rendering a template.
+"""
+
+from django.contrib.sitemaps import Sitemap
+from django.core.exceptions import ImproperlyConfigured
+from django.core.paginator import EmptyPage, PageNotAnInteger
+from django.http import Http404
+from django.utils import six, translation
+from django.utils.html import escape
+
+try:
+    from django.http import StreamingHttpResponse
+except ImportError:
+    # Django < 1.5
+    from django.http import HttpResponse as StreamingHttpResponse
+
+try:
+    from django.contrib.sites.shortcuts import get_current_site
+except ImportError:
+    # Django < 1.7
+    from django.contrib.sites.models import get_current_site
+
+from . import settings
+
+
+class MultilingualSitemap(Sitemap):
+    """
+    Sitemap for the objects of a `MultilingualModel`, listing a URL for
+    every language an object has been translated to, out of `languages`
+    (by default the configured languages). Each URL lists the others as
+    alternates. URLs for a language are determined by `location()` with
+    that language activated.
+
+    The languages of the objects are selected along with the objects
+    themselves, which are read with `iterator()` by `iter_urls()`, so pages
+    of many thousands of URLs take a single query.
+
+    Example::
+
+        class BookSitemap(MultilingualSitemap):
+            model = Book
+
+    """
+
+    model = None
+    languages = None
+
+    def get_languages(self):
+        if self.languages is not None:
+            return list(self.languages)
+
+        return [code for code, name in settings.LANGUAGES]
+
+    def _get_limit(self):
+        # Keep the number of URLs per page below the number of objects
+        # allowed by the sitemap protocol
+        return max(1, Sitemap.limit // len(self.get_languages()))
+    limit = property(_get_limit)
+
+    def items(self):
+        if self.model is None:
+            raise ImproperlyConfigured(
+                u"%s is missing a model." % type(self).__name__
+            )
+
+        return self.model._default_manager.with_available_languages() \
+            .order_by('pk')
+
+    def _get(self, name, obj, default=None):
+        attr = getattr(self, name, None)
+
+        if attr is None:
+            return default
+
+        if callable(attr):
+            return attr(obj)
+
+        return attr
+
+    def iter_urls(self, page=1, site=None, protocol=None):
+        """
+        Yield a dictionary like those in `get_urls()` for every URL on a
+        page, with `language_code` and a list of `alternates`, dictionaries
+        with the `language_code` and `location` of every language of the
+        object.
+        """
+
+        return self._iter_page_urls(self.paginator.page(page), site, protocol)
+
+    def _iter_page_urls(self, page_obj, site, protocol):
+        if self.protocol is not None:
+            protocol = self.protocol
+
+        if protocol is None:
+            protocol = 'http'
+
+        if site is None:
+            raise ImproperlyConfigured(
+                u"Pass a Site or RequestSite object to get the URLs of a "
+                u"MultilingualSitemap."
+            )
+
+        languages = self.get_languages()
+
+        for item in page_obj.object_list.iterator():
+            alternates = []
+
+            for code in item.available_languages:
+                if code in languages:
+                    with translation.override(code):
+                        location = self._get('location', item)
+
+                    alternates.append({
+                        'language_code': code,
+                        'location': '%s://%s%s' % (
+                            protocol, site.domain, location
+                        ),
+                    })
+
+            priority = self._get('priority', item)
+
+            for alternate in alternates:
+                yield {
+                    'item': item,
+                    'location': alternate['location'],
+                    'language_code': alternate['language_code'],
+                    'alternates': alternates,
+                    'lastmod': self._get('lastmod', item),
+                    'changefreq': self._get('changefreq', item),
+                    'priority': str(priority if priority is not None else ''),
+                }
+
+    def get_urls(self, page=1, site=None, protocol=None):
+        return list(self.iter_urls(page, site, protocol))
+
+
+def _render_url(url):
+    parts = [u'<url><loc>%s</loc>' % escape(url['location'])]
+
+    if url['lastmod']:
+        parts.append(
+            u'<lastmod>%s</lastmod>' % url['lastmod'].strftime('%Y-%m-%d')
+        )
+
+    if url['changefreq']:
+        parts.append(u'<changefreq>%s</changefreq>' % url['changefreq'])
+
+    if url['priority']:
+        parts.append(u'<priority>%s</priority>' % url['priority'])
+
+    if len(url['alternates']) > 1:
+        for alternate in url['alternates']:
+            parts.append(
+                u'<xhtml:link rel="alternate" hreflang="%s" href="%s"/>' % (
+                    alternate['language_code'],
+                    escape(alternate['location'])
+                )
+            )
+
+    parts.append(u'</url>\n')
+
+    return u''.join(parts)
+
+
+def _stream_urlset(urls):
+    yield (
+        u'<?xml version="1.0" encoding="UTF-8"?>\n'
+        u'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" '
+        u'xmlns:xhtml="http://www.w3.org/1999/xhtml">\n'
+    )
+
+    for url in urls:
+        yield _render_url(url)
+
+    yield u'</urlset>\n'
+
+
+def _iter_urls(pages, site, protocol):
+    for site_map, page_obj in pages:
+        for url in site_map._iter_page_urls(page_obj, site, protocol):
+            yield url
+
+
+def sitemap(request, sitemaps, section=None,
+            content_type='application/xml'):
+    """
+    Stream a page of the `MultilingualSitemap` objects (or classes) in the
+    `sitemaps` dictionary, or of the one for `section`, with `hreflang`
+    alternates. Use it instead of `django.contrib.sitemaps.views.sitemap`::
+
+        url(r'^sitemap\\.xml$', sitemap, {'sitemaps': sitemaps})
+
+    """
+
+    protocol = 'https' if request.is_secure() else 'http'
+    site = get_current_site(request)
+
+    if section is not None:
+        if section not in sitemaps:
+            raise Http404("No sitemap available for section: %r" % section)
+
+        maps = [sitemaps[section]]
+    else:
+        maps = list(six.itervalues(sitemaps))
+
+    page = request.GET.get('p', 1)
+
+    pages = []
+    for site_map in maps:
+        if callable(site_map):
+            site_map = site_map()
+
+        # Validate the page before starting the response, counting the
+        # objects only once
+        try:
+            pages.append((site_map, site_map.paginator.page(page)))
+        except EmptyPage:
+            raise Http404("Page %s empty" % page)
+        except PageNotAnInteger:
+            raise Http404("No page '%s'" % page)
+
+    response = StreamingHttpResponse(
+        _stream_urlset(_iter_urls(pages, site, protocol)),
+        content_type=content_type
+    )
+    response['X-Robots-Tag'] = 'noindex, noodp, noarchive'
+
+    return response
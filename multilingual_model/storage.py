@@ -0,0 +1,210 @@
+"""
+Denormalized storage of translations in a `TranslationsField` on the
+translated model itself.
+"""
+
+import logging
+logger = logging.getLogger('multilingual_model')
+
+from django.db import connections
+
+from . import changes, search
+from .options import get_translation_options, translation_models
+from .utils import atomic
+
+
+def get_json_translations(instance):
+    """
+    Return the dictionary of translations stored in the `TranslationsField`
+    of a `MultilingualModel` instance.
+    """
+
+    options = get_translation_options(type(instance))
+    attname = options.json_field.attname
+
+    value = getattr(instance, attname)
+    if not isinstance(value, dict):
+        # Decode and keep the decoded value
+        value = options.json_field.to_python(value)
+        setattr(instance, attname, value)
+
+    return value
+
+
+def dump_translation(translation_obj):
+    """ Return the values of the translated fields of a translation. """
+
+    options = translation_models[type(translation_obj)]
+
+    values = {}
+    for field in options.value_fields:
+        values[field.attname] = field.value_from_object(translation_obj)
+
+    return values
+
+
+def load_translation(instance, code, values):
+    """
+    Return an (unsaved) translation object for `instance` with the given
+    language code and stored values.
+    """
+
+    options = get_translation_options(type(instance))
+    translation_opts = options.translation_model._meta
+
+    kwargs = {'language_code': code}
+    for field in translation_opts.fields:
+        if field.attname in values:
+            kwargs[field.attname] = field.to_python(values[field.attname])
+
+    translation_obj = options.translation_model(**kwargs)
+    setattr(translation_obj, options.fk.get_cache_name(), instance)
+
+    return translation_obj
+
+
+def get_parent_translations(model, pks):
+    """
+    Return a dictionary mapping the given primary keys of `model` onto the
+    JSON representation of their translations in the translation table.
+    """
+
+    options = get_translation_options(model)
+
+    result = {}
+    for pk in pks:
+        result[pk] = {}
+
+    translations = options.translation_model._default_manager.filter(**{
+        '%s__in' % options.fk.name: pks
+    })
+
+    for translation_obj in translations:
+        parent_pk = getattr(translation_obj, options.fk.attname)
+        result[parent_pk][translation_obj.language_code] = \
+            dump_translation(translation_obj)
+
+    return result
+
+
+def sync_to_json(model, pks):
+    """
+    Store the translations from the translation table in the
+    `TranslationsField` of the objects of `model` with the given primary keys.
+    """
+
+    options = get_translation_options(model)
+    manager = model._default_manager
+
+    with atomic():
+        for pk, translations in get_parent_translations(model, pks).items():
+            manager.filter(pk=pk).update(**{
+                options.json_field.attname:
+                    options.json_field.get_prep_value(translations)
+            })
+
+
+def _delete_parent_translations(options, pks, using):
+    """
+    Delete the translations of the parents with the given primary keys
+    without sending signals, whose handlers would store the half-emptied
+    translation table in the `TranslationsField`.
+    """
+
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    translation_opts = options.translation_model._meta
+
+    connection.cursor().execute('DELETE FROM %s WHERE %s IN (%s)' % (
+        qn(translation_opts.db_table), qn(options.fk.column),
+        ', '.join(['%s'] * len(pks))
+    ), [options.model._meta.pk.get_db_prep_value(pk, connection)
+        for pk in pks])
+
+
+def sync_to_table(model, pks):
+    """
+    Store the translations from the `TranslationsField` of the objects of
+    `model` with the given primary keys in the translation table, replacing
+    the existing translations of these objects.
+    """
+
+    from .bulk import translations_changed
+
+    options = get_translation_options(model)
+    translation_manager = options.translation_model._default_manager
+    using = translation_manager.db
+    pks = list(pks)
+
+    if not pks:
+        return
+
+    translation_objs = []
+    for instance in model._default_manager.filter(pk__in=pks):
+        for code, values in get_json_translations(instance).items():
+            translation_obj = load_translation(instance, code, values)
+            setattr(translation_obj, options.fk.attname, instance.pk)
+
+            translation_objs.append(translation_obj)
+
+    existing = {}
+    for pk, parent_pk, code in translation_manager.filter(**{
+        '%s__in' % options.fk.name: pks
+    }).values_list('pk', options.fk.name, 'language_code'):
+        existing[(parent_pk, code)] = pk
+
+    created = set(
+        (getattr(translation_obj, options.fk.attname),
+         translation_obj.language_code)
+        for translation_obj in translation_objs
+    )
+
+    with atomic(using=using):
+        _delete_parent_translations(options, pks, using)
+        search.unindex_translations(model, existing.values(), using)
+        translation_manager.bulk_create(translation_objs)
+
+        changes.record_changes(
+            model, set(existing) - created, deleted=True, using=using
+        )
+        translations_changed(model, pks, created, using)
+
+
+def translation_changed(sender, instance, **kwargs):
+    """
+    Signal handler updating the `TranslationsField` of the parent of a saved
+    or deleted translation, and of its previous parent when it has been
+    moved to another one.
+    """
+
+    options = translation_models.get(sender)
+    if options is None or options.json_field is None:
+        return
+
+    parent_pks = []
+
+    parent_pk = getattr(instance, options.fk.attname)
+    if parent_pk is not None:
+        parent_pks.append(parent_pk)
+
+    # Looked up by the pre_save handler in `multilingual_model.models`
+    previous = instance.__dict__.get('_previous_translation_key')
+    if previous is not None and previous[0] != parent_pk:
+        parent_pks.append(previous[0])
+
+    if not parent_pks:
+        return
+
+    translations = get_parent_translations(options.model, parent_pks)
+
+    for pk in parent_pks:
+        options.model._default_manager.filter(pk=pk).update(**{
+            options.json_field.attname:
+                options.json_field.get_prep_value(translations[pk])
+        })
+
+    # Update the parent in memory as well, when available
+    parent = getattr(instance, options.fk.get_cache_name(), None)
+    if parent is not None and parent.pk == parent_pk:
+        setattr(parent, options.json_field.attname, translations[parent_pk])
+        parent._clear_translation_cache(instance.language_code)
@@ -0,0 +1,87 @@
+from django import template
+from django.core.exceptions import FieldError, ObjectDoesNotExist
+
+from ..fallbacks import get_fallback_languages
+from ..models import MultilingualModel
+from ..query import prefetch_translations as prefetch
+
+
+register = template.Library()
+
+
+def _split(value):
+    if not value:
+        return None
+
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+@register.simple_tag
+def prefetch_translations(objects, fields=None, languages=None):
+    """
+    Fetch the translations of all objects in an iterable, with a single query
+    per model, before they are rendered. Translations are fetched for the
+    language of each object, or the given comma-separated `languages`, and
+    the languages they fall back to. With `fields`, only the given
+    comma-separated translated fields are fetched.
+
+    Example::
+
+        {% prefetch_translations books fields="title" %}
+        {% for book in books %}{{ book.title }}{% endfor %}
+
+    """
+
+    if not objects:
+        return u''
+
+    instances = [
+        obj for obj in objects if isinstance(obj, MultilingualModel)
+    ]
+
+    languages = _split(languages)
+    if languages is None:
+        languages = []
+        for instance in instances:
+            if instance._language not in languages:
+                languages.append(instance._language)
+
+    prefetch(instances, get_fallback_languages(languages), _split(fields))
+
+    return u''
+
+
+@register.filter
+def translated(obj, arg):
+    """
+    Return a translated field of an object in a given language, as
+    `field[:language[:nofallback]]`. The language defaults to the language
+    of the object. Unless `nofallback` is given, the languages in the
+    fallback chain are used when no translation is available. Renders an
+    empty string when no translation can be found.
+
+    Example::
+
+        {{ book|translated:"title:nl" }}
+        {{ book|translated:"title:nl:nofallback" }}
+
+    """
+
+    if not isinstance(obj, MultilingualModel):
+        return u''
+
+    parts = arg.split(':')
+    field = parts[0]
+    language = len(parts) > 1 and parts[1] or None
+    fallback = len(parts) < 3 or parts[2] != 'nofallback'
+
+    try:
+        value = obj.get_translation(field, language, fallback)
+
+    except (FieldError, ObjectDoesNotExist, ValueError):
+        return u''
+
+    if value is None:
+        return u''
+
+    return value
@@ -1,8 +1,49 @@
-from django.db import models
+import io
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+import django
+from django.contrib.admin.sites import AdminSite
+from django.core.exceptions import (
+    FieldError, ImproperlyConfigured, ObjectDoesNotExist
+)
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, models
+from django.forms.models import inlineformset_factory
+from django.template import Context, Template
 from django.test import TestCase
-from django.utils import translation
+from django.test.client import RequestFactory
+from django.utils import six, translation
 
-from .models import MultilingualModel, MultilingualTranslation
+from .admin import MultilingualModelAdmin, translated_field
+from .bulk import update_translations
+from .cache import get_cache, invalidate, local_cache
+from .changes import changed_since
+from .checks import get_non_unique_translation_models
+from .fallbacks import compile_fallback_chains, get_fallback_chain
+from .fields import TranslationsField
+from .forms import TranslationFormSet
+from .lru import LRUCache
+from .management.commands import (
+    multilingual_warm_cache as warm_cache_command
+)
+from .metrics import collect_metrics
+from .middleware import TranslationMetricsMiddleware
+from .models import (
+    MultilingualModel, MultilingualTranslation, TranslationChange
+)
+from .options import TranslatedFieldDescriptor, get_translation_options
+from .reports import get_coverage, get_multilingual_models
+from .search import index_exists, rebuild_index
+from .serialization import serialize_translations, stream_json
+from .sitemaps import MultilingualSitemap, sitemap
+from .signals import translation_fallback
+from .storage import get_json_translations
+from .warmup import warm_cache, warm_configured_caches
 
 
 class BookTranslation(MultilingualTranslation):
@@ -14,6 +55,64 @@ class BookTranslation(MultilingualTranslation):
 
 class Book(MultilingualModel):
     ISBN = models.IntegerField()
+    author = models.ForeignKey('Author', null=True, blank=True)
+
+
+class AuthorTranslation(MultilingualTranslation):
+    parent = models.ForeignKey('Author', related_name='translations')
+
+    biography = models.TextField()
+
+
+class Author(MultilingualModel):
+    name = models.CharField(max_length=64)
+
+
+class MagazineTranslation(MultilingualTranslation):
+    parent = models.ForeignKey('Magazine', related_name='translations')
+
+    title = models.CharField(max_length=32)
+
+
+class Magazine(MultilingualModel):
+    ISSN = models.IntegerField()
+    translations_json = TranslationsField()
+
+
+class ArticleTranslation(MultilingualTranslation):
+    parent = models.ForeignKey('Article', related_name='translations')
+
+    title = models.CharField(max_length=32)
+    body = models.TextField()
+
+
+class Article(MultilingualModel):
+    deferred_translation_fields = ('body', )
+
+
+class PostTranslation(MultilingualTranslation):
+    parent = models.ForeignKey('Post', related_name='translations')
+
+    title = models.CharField(max_length=32)
+    body = models.TextField()
+
+
+class Post(MultilingualModel):
+    search_translation_fields = ('title', 'body')
+
+
+class ChapterTranslation(MultilingualTranslation):
+    parent = models.ForeignKey('Chapter', related_name='translations')
+
+    title = models.CharField(max_length=32)
+
+
+class Chapter(MultilingualModel):
+    track_translation_changes = True
+
+
+class SpecialChapter(Chapter):
+    pass
 
 
 __test__ = {'doctest': """
@@ -53,7 +152,7 @@ u'Django voor complete idioten.'
 """}
 
 
-class BookTestCase(TestCase):
+class BookFixtureMixin(object):
     def setUp(self):
         """ Setup a book with translations. """
 
@@ -78,6 +177,8 @@ class BookTestCase(TestCase):
         self.book_pl.parent = self.book
         self.book_pl.save()
 
+
+class BookTestCase(BookFixtureMixin, TestCase):
     def test_explicit(self):
         """
         Test explicit request for a specific language. This is basically
@@ -180,3 +281,1984 @@ class BookTestCase(TestCase):
         # Check if the language set in book's init is actually the right
         # language.
         self.assertEquals(book._language, test_lang)
+
+
+class TranslationOptionsTestCase(TestCase):
+    def test_options_prepared(self):
+        """ Options are compiled when the models are prepared. """
+
+        options = Book.__dict__['_translation_options']
+
+        self.assertEqual(options.translation_model, BookTranslation)
+        self.assertEqual(
+            sorted(options.fields), ['description', 'language_code', 'title']
+        )
+
+    def test_resolve(self):
+        """ Attribute names resolve to field, code and base code. """
+
+        options = Book._translation_options
+
+        self.assertEqual(options.resolve('title'), ('title', None, None))
+        self.assertEqual(options.resolve('title_en'), ('title', 'en', None))
+        self.assertEqual(
+            options.resolve('description_sr_latn'),
+            ('description', 'sr-latn', 'sr')
+        )
+        self.assertEqual(options.resolve('ISBN'), None)
+
+    def test_resolve_cached(self):
+        """ Results for unconfigured attributes are stored in the table. """
+
+        options = Book._translation_options
+
+        self.assertEqual(options.resolve('title_xx_yy'),
+                         ('title', 'xx-yy', 'xx'))
+        self.assertEqual(options.resolve('bananas'), None)
+
+        self.assertIn('title_xx_yy', options.attributes)
+        self.assertIn('bananas', options.attributes)
+
+    def test_unique_translations(self):
+        """ Translations are unique for their parent and language. """
+
+        self.assertIn(
+            ('parent', 'language_code'), BookTranslation._meta.unique_together
+        )
+        self.assertEqual(get_non_unique_translation_models(), [])
+
+        book = Book.objects.create(ISBN=1)
+        BookTranslation.objects.create(
+            parent=book, language_code='en', title='Title'
+        )
+
+        self.assertRaises(
+            IntegrityError, BookTranslation.objects.create,
+            parent=book, language_code='en', title='Title'
+        )
+
+    def test_non_unique_translations(self):
+        """ Translation models without the constraint are detected. """
+
+        unique_together = BookTranslation._meta.unique_together
+        BookTranslation._meta.unique_together = ()
+
+        try:
+            self.assertEqual(
+                get_non_unique_translation_models(), [BookTranslation]
+            )
+        finally:
+            BookTranslation._meta.unique_together = unique_together
+
+
+class DescriptorTestCase(BookTestCase):
+    def setUp(self):
+        super(DescriptorTestCase, self).setUp()
+
+        Book._translation_options.install_descriptors()
+
+    def tearDown(self):
+        for attr, value in list(Book.__dict__.items()):
+            if isinstance(value, TranslatedFieldDescriptor):
+                delattr(Book, attr)
+
+    def test_descriptors(self):
+        """ Descriptors are installed for fields in configured languages. """
+
+        self.assertTrue(
+            isinstance(Book.__dict__['title_en'], TranslatedFieldDescriptor)
+        )
+        self.assertTrue(
+            isinstance(Book.__dict__['title'], TranslatedFieldDescriptor)
+        )
+        self.assertIn('title_en_us', dir(self.book))
+
+        # Existing attributes are left alone
+        self.assertEqual(self.book.ISBN, '1234567890')
+
+
+class TranslationAccessTestCase(BookFixtureMixin, TestCase):
+    def setUp(self):
+        super(TranslationAccessTestCase, self).setUp()
+
+        self.book = Book.objects.get(pk=self.book.pk)
+
+    def test_get_translation(self):
+        """ Translated fields can be requested by name and language. """
+
+        self.assertEqual(
+            self.book.get_translation('title', 'pl'), self.book_pl.title
+        )
+        self.assertEqual(
+            self.book.get_translation('title', 'en-kk'), self.book_en.title
+        )
+        self.assertRaises(
+            ObjectDoesNotExist, self.book.get_translation, 'title', 'en-kk',
+            fallback=False
+        )
+        self.assertRaises(
+            FieldError, self.book.get_translation, 'ISBN', 'en'
+        )
+
+    def test_translations_for(self):
+        """ Translations for several languages take a single query. """
+
+        with self.assertNumQueries(1):
+            translations = self.book.translations_for(['en', 'pl', 'nl'])
+
+        self.assertEqual(translations['en'], self.book_en)
+        self.assertEqual(translations['pl'], self.book_pl)
+        self.assertEqual(translations['nl'], None)
+
+        with self.assertNumQueries(0):
+            self.book.translations_for(['en', 'nl'])
+
+
+class LanguageTestCase(BookFixtureMixin, TestCase):
+    def tearDown(self):
+        translation.deactivate()
+
+    def test_active_language(self):
+        """ The language active upon access is used. """
+
+        translation.activate('pl')
+        book = Book.objects.get(pk=self.book.pk)
+
+        self.assertNotIn('_translation_cache', book.__dict__)
+
+        translation.activate('en')
+        self.assertEqual(book.title, self.book_en.title)
+
+    def test_in_language(self):
+        """ The language can be set for all objects from a queryset. """
+
+        translation.activate('en')
+
+        book = Book.objects.in_language('pl').get(pk=self.book.pk)
+        self.assertEqual(book.title, self.book_pl.title)
+
+        book = Book.objects.in_language('pl').with_translations()[0]
+        with self.assertNumQueries(0):
+            self.assertEqual(book.title, self.book_pl.title)
+
+        self.assertEqual(
+            Book.objects.in_language('pl').translated('title')
+            .values_list('title', flat=True)[0],
+            self.book_pl.title
+        )
+
+
+class SharedCacheTestCase(BookTestCase):
+    def setUp(self):
+        from multilingual_model import settings
+
+        self._cache_setting = settings.CACHE
+        settings.CACHE = 'translations'
+
+        get_cache().clear()
+
+        super(SharedCacheTestCase, self).setUp()
+
+    def tearDown(self):
+        from multilingual_model import settings
+
+        get_cache().clear()
+        settings.CACHE = self._cache_setting
+
+    def test_shared_cache(self):
+        """ Translations are shared between instances. """
+
+        self.assertEqual(self.book.title_en, self.book_en.title)
+
+        book = Book.objects.get(pk=self.book.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(book.title_en, self.book_en.title)
+
+    def test_shared_cache_missing(self):
+        """ Missing translations are cached as well. """
+
+        self.assertRaises(
+            ObjectDoesNotExist, self.book._get_translation, 'title', 'nl'
+        )
+
+        book = Book.objects.get(pk=self.book.pk)
+        with self.assertNumQueries(0):
+            self.assertRaises(
+                ObjectDoesNotExist, book._get_translation, 'title', 'nl'
+            )
+
+    def test_shared_cache_invalidation(self):
+        """ Saving or deleting a translation invalidates the cache. """
+
+        self.assertEqual(self.book.title_en, self.book_en.title)
+
+        self.book_en.title = 'Django for Experts'
+        self.book_en.save()
+
+        book = Book.objects.get(pk=self.book.pk)
+        self.assertEqual(book.title_en, 'Django for Experts')
+
+        self.book_en.delete()
+
+        book = Book.objects.get(pk=self.book.pk)
+        self.assertRaises(
+            ObjectDoesNotExist, book._get_translation, 'title', 'en'
+        )
+
+    def test_shared_cache_moved(self):
+        """ Moving a translation invalidates the cache of both parents. """
+
+        BookTranslation.objects.filter(parent=self.book).exclude(
+            pk=self.book_en.pk
+        ).delete()
+
+        other = Book.objects.create(ISBN=5678)
+        self.assertEqual(self.book.title_en, self.book_en.title)
+        self.assertRaises(
+            ObjectDoesNotExist, other._get_translation, 'title', 'en'
+        )
+
+        self.book_en.parent = other
+        self.book_en.save()
+
+        book = Book.objects.get(pk=self.book.pk)
+        self.assertRaises(
+            ObjectDoesNotExist, book._get_translation, 'title', 'en'
+        )
+
+        other = Book.objects.get(pk=other.pk)
+        self.assertEqual(other.title_en, self.book_en.title)
+
+    def test_shared_cache_prefetch(self):
+        """ Prefetching fills and uses the shared cache. """
+
+        list(Book.objects.with_translations('en', 'nl'))
+
+        with self.assertNumQueries(1):
+            book = Book.objects.with_translations('en', 'nl')[0]
+
+        self.assertEqual(book.title_en, self.book_en.title)
+
+
+class LRUCacheTestCase(TestCase):
+    def test_max_entries(self):
+        """ Least recently used entries are evicted first. """
+
+        lru = LRUCache(2)
+        lru.set(('a', 1), 'a')
+        lru.set(('b', 1), 'b')
+        lru.get(('a', 1))
+        lru.set(('c', 1), 'c')
+
+        self.assertEqual(lru.get(('a', 1)), 'a')
+        self.assertRaises(KeyError, lru.get, ('b', 1))
+        self.assertEqual(lru.stats(), {
+            'entries': 2, 'bytes': lru.bytes,
+            'hits': 2, 'misses': 1, 'evictions': 1
+        })
+
+    def test_max_bytes(self):
+        """ Entries are evicted when exceeding the number of bytes. """
+
+        lru = LRUCache(10, max_bytes=10, sizeof=len)
+        lru.set(('a', 1), 'aaaa')
+        lru.set(('b', 1), 'bbbb')
+        lru.set(('c', 1), 'cccc')
+
+        self.assertEqual(len(lru), 2)
+        self.assertEqual(lru.bytes, 8)
+        self.assertRaises(KeyError, lru.get, ('a', 1))
+
+    def test_timeout(self):
+        """ Entries expire after the timeout. """
+
+        lru = LRUCache(10, timeout=-1)
+        lru.set(('a', 1), 'a')
+
+        self.assertRaises(KeyError, lru.get, ('a', 1))
+        self.assertEqual(len(lru), 0)
+
+    def test_delete_group(self):
+        """ Entries can be deleted by the first part of their key. """
+
+        lru = LRUCache(10)
+        lru.set(('a', 1, 'en'), 'a')
+        lru.set(('a', 1, 'nl'), 'a')
+        lru.set(('a', 2, 'en'), 'a')
+        lru.delete_group(('a', 1))
+
+        self.assertEqual(len(lru), 1)
+        self.assertEqual(lru.get(('a', 2, 'en')), 'a')
+
+
+class LocalCacheTestCase(BookTestCase):
+    def setUp(self):
+        local_cache.max_entries = 100
+        local_cache.clear()
+
+        super(LocalCacheTestCase, self).setUp()
+
+    def tearDown(self):
+        local_cache.max_entries = 0
+        local_cache.clear()
+
+    def test_local_cache(self):
+        """ Translations are shared between instances within the process. """
+
+        self.assertEqual(self.book.title_en, self.book_en.title)
+
+        book = Book.objects.get(pk=self.book.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(book.title_en, self.book_en.title)
+
+        # The cache does not keep the instance which fetched it alive
+        cached = local_cache.get((BookTranslation, self.book.pk, 'en'))
+        cache_name = BookTranslation._meta.get_field('parent').get_cache_name()
+        self.assertFalse(cache_name in cached.__dict__)
+
+    def test_prefetch_overflow(self):
+        """ Prefetched translations are kept when the cache overflows. """
+
+        local_cache.max_entries = 2
+
+        for isbn in range(10):
+            book = Book.objects.create(ISBN=isbn)
+            BookTranslation.objects.create(
+                parent=book, language_code='en', title='Book %d' % isbn,
+                description=''
+            )
+
+        with translation.override('en'):
+            books = list(Book.objects.with_translations())
+
+            with self.assertNumQueries(0):
+                for book in books:
+                    book.title
+
+    def test_invalidate(self):
+        """ Translations can be invalidated explicitly or by saving. """
+
+        self.assertEqual(self.book.title_en, self.book_en.title)
+
+        BookTranslation.objects.filter(pk=self.book_en.pk).update(
+            title='Django for Experts'
+        )
+        self.assertEqual(self.book.title_en, self.book_en.title)
+
+        invalidate(self.book, 'en')
+        self.assertEqual(self.book.title_en, 'Django for Experts')
+
+        self.book_en.title = 'Django for Gurus'
+        self.book_en.save()
+        self.assertEqual(self.book.title_en, 'Django for Gurus')
+
+
+class FallbackTestCase(BookFixtureMixin, TestCase):
+    def setUp(self):
+        super(FallbackTestCase, self).setUp()
+
+        self.fallbacks = []
+        translation_fallback.connect(self.record_fallback)
+
+        self.book = Book.objects.get(pk=self.book.pk)
+
+    def tearDown(self):
+        from multilingual_model import settings
+
+        translation_fallback.disconnect(self.record_fallback)
+
+        settings.FALLBACKS = {}
+        compile_fallback_chains()
+
+    def record_fallback(self, sender, **kwargs):
+        self.fallbacks.append(
+            (kwargs['language_code'], kwargs['resolved_language_code'],
+             kwargs['depth'])
+        )
+
+    def test_single_query(self):
+        """ The whole fallback chain is resolved with a single query. """
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.book.title_en_kk, self.book_en.title)
+
+        self.assertEqual(self.fallbacks, [('en-kk', 'en', 1)])
+
+    def test_configured_fallbacks(self):
+        """ Fallbacks can be configured per language. """
+
+        from multilingual_model import settings
+
+        settings.FALLBACKS = {'pt-br': ['pt', 'pl']}
+        compile_fallback_chains()
+
+        self.assertEqual(
+            get_fallback_chain('pt-br')[:3], ('pt-br', 'pt', 'pl')
+        )
+        self.assertEqual(self.book.title_pt_br, self.book_pl.title)
+        self.assertEqual(self.fallbacks, [('pt-br', 'pl', 2)])
+
+    def test_prefetched_fallbacks(self):
+        """ Fallback languages are prefetched along with the language. """
+
+        book = Book.objects.with_translations('en-kk').get(pk=self.book.pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(book.title_en_kk, self.book_en.title)
+
+
+class PrefetchTestCase(TestCase):
+    def setUp(self):
+        """ Setup a few books by the same author, with translations. """
+
+        self.author = Author.objects.create(name='Mark Pilgrim')
+        AuthorTranslation.objects.create(
+            parent=self.author, language_code='en', biography='Writer.'
+        )
+
+        for isbn in range(3):
+            book = Book.objects.create(ISBN=isbn, author=self.author)
+
+            for language_code in ('en', 'pl'):
+                BookTranslation.objects.create(
+                    parent=book, language_code=language_code,
+                    title='%s %d' % (language_code, isbn),
+                    description='Description'
+                )
+
+    def test_with_translations(self):
+        """
+        Prefetching translations takes a single query, after which translated
+        attributes are available without hitting the database.
+        """
+
+        with self.assertNumQueries(2):
+            books = list(Book.objects.with_translations('en', 'pl'))
+
+        with self.assertNumQueries(0):
+            for book in books:
+                self.assertEqual(book.title_en, 'en %d' % book.ISBN)
+                self.assertEqual(book.title_pl, 'pl %d' % book.ISBN)
+
+    def test_with_translations_missing(self):
+        """ Missing translations are cached as such. """
+
+        books = list(Book.objects.with_translations('en', 'nl'))
+
+        with self.assertNumQueries(0):
+            for book in books:
+                self.assertEqual(book._translation_cache['nl'], None)
+
+    def test_with_translations_related(self):
+        """ Translations of related objects can be prefetched as well. """
+
+        with self.assertNumQueries(3):
+            books = list(
+                Book.objects.select_related('author').with_translations(
+                    'en', related=['author']
+                )
+            )
+
+        with self.assertNumQueries(0):
+            for book in books:
+                self.assertEqual(book.title_en, 'en %d' % book.ISBN)
+                self.assertEqual(book.author.biography_en, 'Writer.')
+
+
+class TranslatedTestCase(TestCase):
+    def setUp(self):
+        """ Setup books with titles in different orders per language. """
+
+        for isbn, title_en, title_nl in (
+            (1, 'Banana', 'Appel'),
+            (2, 'Apple', 'Citroen'),
+            (3, 'Cherry', None),
+        ):
+            book = Book.objects.create(ISBN=isbn)
+
+            BookTranslation.objects.create(
+                parent=book, language_code='en', title=title_en,
+                description='Description'
+            )
+
+            if title_nl:
+                BookTranslation.objects.create(
+                    parent=book, language_code='nl', title=title_nl,
+                    description='Beschrijving'
+                )
+
+    def test_values_list(self):
+        """ Translated fields are available from values_list(). """
+
+        self.assertEqual(
+            list(Book.objects.translated('title', language='en').order_by(
+                'title'
+            ).values_list('ISBN', 'title')),
+            [(2, 'Apple'), (1, 'Banana'), (3, 'Cherry')]
+        )
+
+    def test_fallback(self):
+        """ Values fall back through the fallback chain. """
+
+        books = Book.objects.translated('title', language='nl-be')
+
+        self.assertEqual(
+            list(books.order_by('ISBN').values_list('title', flat=True)),
+            ['Appel', 'Citroen', None]
+        )
+
+        from multilingual_model import settings
+
+        # Before Django 1.6, values_list() cannot be ordered by extra
+        # columns it leaves out
+        if settings.FALL_BACK_TO_DEFAULT and \
+                settings.DEFAULT_LANGUAGE.startswith('en') and \
+                django.VERSION >= (1, 6):
+            books = Book.objects.translated('title', language='en-kk')
+
+            self.assertEqual(
+                list(books.order_by('-title').values_list('ISBN', flat=True)),
+                [3, 1, 2]
+            )
+
+        books = Book.objects.translated(
+            'title', language='en-kk', fallback=False
+        )
+        self.assertEqual(
+            list(books.values_list('title', flat=True)), [None] * 3
+        )
+
+    def test_instances(self):
+        """ Translated values are set on the objects. """
+
+        with self.assertNumQueries(1):
+            books = list(
+                Book.objects.translated('title', 'description', language='nl')
+            )
+
+            self.assertEqual(books[0].title, 'Appel')
+            self.assertEqual(books[0].description, 'Beschrijving')
+
+    def test_filter_translated(self):
+        """ Translated fields can be filtered on. """
+
+        books = Book.objects.translated('title', language='en')
+
+        self.assertEqual(
+            list(books.filter_translated(
+                title__icontains='AN'
+            ).values_list('ISBN', flat=True)), [1]
+        )
+        self.assertEqual(
+            list(books.filter_translated(title__startswith='C').values_list(
+                'ISBN', flat=True
+            )), [3]
+        )
+
+        books = Book.objects.translated('title', language='nl')
+        self.assertEqual(
+            list(books.filter_translated(title__isnull=True).values_list(
+                'ISBN', flat=True
+            )), [3]
+        )
+
+        self.assertRaises(
+            FieldError, books.filter_translated, description='Description'
+        )
+
+
+class TranslationsFieldTestCase(TestCase):
+    def setUp(self):
+        """ Setup a magazine with translations. """
+
+        self.magazine = Magazine.objects.create(ISSN=1234)
+
+        self.magazine_en = MagazineTranslation.objects.create(
+            parent=self.magazine, language_code='en', title='Wired'
+        )
+        self.magazine_nl = MagazineTranslation.objects.create(
+            parent=self.magazine, language_code='nl', title='Bedraad'
+        )
+
+    def test_sync(self):
+        """ Translations are kept in sync with the TranslationsField. """
+
+        self.assertEqual(self.magazine.translations_json, {
+            'en': {'title': 'Wired'}, 'nl': {'title': 'Bedraad'}
+        })
+
+        self.magazine_nl.delete()
+
+        magazine = Magazine.objects.get(pk=self.magazine.pk)
+        self.assertEqual(magazine.title_en, 'Wired')
+        self.assertEqual(
+            get_json_translations(magazine), {'en': {'title': 'Wired'}}
+        )
+
+    def test_stale_parent(self):
+        """ Saving a parent does not overwrite newer translations. """
+
+        magazine = Magazine.objects.get(pk=self.magazine.pk)
+
+        MagazineTranslation.objects.create(
+            parent=Magazine.objects.get(pk=self.magazine.pk),
+            language_code='pl', title='Przewodowy'
+        )
+
+        magazine.ISSN = 6
+        magazine.save()
+
+        magazine = Magazine.objects.get(pk=self.magazine.pk)
+        self.assertEqual(magazine.ISSN, 6)
+        self.assertEqual(magazine.title_pl, 'Przewodowy')
+
+    def test_moved_translation(self):
+        """ Both parents are updated when a translation is moved. """
+
+        other = Magazine.objects.create(ISSN=5678)
+
+        self.magazine_en.parent = other
+        self.magazine_en.save()
+
+        magazine = Magazine.objects.get(pk=self.magazine.pk)
+        self.assertEqual(
+            get_json_translations(magazine), {'nl': {'title': 'Bedraad'}}
+        )
+
+        other = Magazine.objects.get(pk=other.pk)
+        self.assertEqual(
+            get_json_translations(other), {'en': {'title': 'Wired'}}
+        )
+
+    def test_no_queries(self):
+        """ Translations are read without extra queries. """
+
+        with self.assertNumQueries(1):
+            magazine = Magazine.objects.get(pk=self.magazine.pk)
+
+            self.assertEqual(magazine.title_en, 'Wired')
+            self.assertEqual(magazine.title_nl, 'Bedraad')
+            self.assertEqual(magazine.title_nl_be, 'Bedraad')
+
+        with self.assertNumQueries(1):
+            magazines = list(Magazine.objects.with_translations('nl'))
+            self.assertEqual(magazines[0].title_nl, 'Bedraad')
+
+    def test_command(self):
+        """ The management command copies translations in batches. """
+
+        Magazine.objects.create(ISSN=5678)
+        Magazine.objects.update(translations_json='{}')
+
+        call_command(
+            'multilingual_sync', 'multilingual_model.Magazine',
+            batch_size=1, verbosity=0
+        )
+
+        magazine = Magazine.objects.get(pk=self.magazine.pk)
+        self.assertEqual(magazine.title_nl, 'Bedraad')
+
+        MagazineTranslation.objects.all().delete()
+        Magazine.objects.filter(pk=self.magazine.pk).update(
+            translations_json='{"pl": {"title": "Przewodowy"}}'
+        )
+
+        call_command(
+            'multilingual_sync', 'multilingual_model.Magazine',
+            to_table=True, batch_size=1, verbosity=0
+        )
+
+        self.assertEqual(
+            list(MagazineTranslation.objects.values_list(
+                'language_code', 'title'
+            )), [('pl', 'Przewodowy')]
+        )
+
+    def test_to_table(self):
+        """ Copying to the table keeps the TranslationsField intact. """
+
+        call_command(
+            'multilingual_sync', 'multilingual_model.Magazine',
+            to_table=True, verbosity=0
+        )
+
+        magazine = Magazine.objects.get(pk=self.magazine.pk)
+        self.assertEqual(get_json_translations(magazine), {
+            'en': {'title': 'Wired'}, 'nl': {'title': 'Bedraad'}
+        })
+        self.assertEqual(magazine.title_en, 'Wired')
+        self.assertEqual(MagazineTranslation.objects.count(), 2)
+
+
+class ImportExportTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+        self.book = Book.objects.create(ISBN=1)
+        BookTranslation.objects.create(
+            parent=self.book, language_code='en', title='Apple',
+            description='A fruit.'
+        )
+
+        self.other_book = Book.objects.create(ISBN=2)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_file(self, name, content):
+        path = os.path.join(self.directory, name)
+
+        with io.open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+        return path
+
+    def test_import_csv(self):
+        """ Translations are created and updated from CSV. """
+
+        path = self.write_file('books.csv', (
+            u'parent,language_code,title,description\n'
+            u'%(book)d,en,Pear,A fruit.\n'
+            u'%(book)d,nl,Peer,Een vrucht.\n'
+            u'%(other)d,nl,Banaan,Een vrucht.\n'
+        ) % {'book': self.book.pk, 'other': self.other_book.pk})
+
+        call_command(
+            'multilingual_import', 'multilingual_model.Book', path,
+            chunk_size=2, verbosity=0
+        )
+
+        self.assertEqual(BookTranslation.objects.count(), 3)
+
+        book = Book.objects.get(pk=self.book.pk)
+        self.assertEqual(book.title_en, 'Pear')
+        self.assertEqual(book.title_nl, 'Peer')
+
+    def test_import_jsonl_checkpoint(self):
+        """ Imports resume from a checkpoint. """
+
+        path = self.write_file('books.jsonl', (
+            u'{"parent": %(book)d, "language_code": "nl", "title": "Appel"}\n'
+            u'{"parent": %(other)d, "language_code": "nl", "title": "Peer"}\n'
+        ) % {'book': self.book.pk, 'other': self.other_book.pk})
+
+        checkpoint = self.write_file('checkpoint', u'1')
+
+        call_command(
+            'multilingual_import', 'multilingual_model.Book', path,
+            checkpoint=checkpoint, verbosity=0
+        )
+
+        self.assertEqual(
+            list(BookTranslation.objects.filter(
+                language_code='nl'
+            ).values_list('title', flat=True)), ['Peer']
+        )
+        self.assertFalse(os.path.exists(checkpoint))
+
+    def test_export_import_po(self):
+        """ PO files can be exported and imported again. """
+
+        path = os.path.join(self.directory, 'books.po')
+
+        call_command(
+            'multilingual_export', 'multilingual_model.Book',
+            output=path, language='nl', source_language='en', verbosity=0
+        )
+
+        with io.open(path, encoding='utf-8') as f:
+            content = f.read()
+
+        self.assertIn(u'msgctxt "%d.title"' % self.book.pk, content)
+        self.assertIn(u'msgid "Apple"', content)
+
+        content = content.replace(u'msgid "Apple"\nmsgstr ""', (
+            u'msgid "Apple"\nmsgstr ""\n"Ap\\"pel"'
+        ))
+        self.write_file('books.po', content)
+
+        call_command(
+            'multilingual_import', 'multilingual_model.Book', path,
+            language='nl', verbosity=0
+        )
+
+        book = Book.objects.get(pk=self.book.pk)
+        self.assertEqual(book.title_nl, 'Ap"pel')
+
+    def test_export_csv(self):
+        """ Translations are exported as CSV. """
+
+        path = os.path.join(self.directory, 'books.csv')
+
+        call_command(
+            'multilingual_export', 'multilingual_model.Book',
+            output=path, chunk_size=1, verbosity=0
+        )
+
+        with io.open(path, encoding='utf-8') as f:
+            self.assertEqual(f.read().splitlines(), [
+                u'parent,language_code,title,description',
+                u'%d,en,Apple,A fruit.' % self.book.pk
+            ])
+
+
+class TranslationFormSetTestCase(BookFixtureMixin, TestCase):
+    def get_formset(self, **kwargs):
+        FormSet = inlineformset_factory(
+            Book, BookTranslation, formset=TranslationFormSet,
+            fields=('language_code', 'title', 'description'), extra=3
+        )
+
+        for key, value in kwargs.items():
+            setattr(FormSet, key, value)
+
+        return FormSet(instance=self.book)
+
+    def test_initial_languages(self):
+        """ Extra forms get distinct languages without a translation. """
+
+        formset = self.get_formset()
+
+        initial_languages = [
+            form.initial['language_code'] for form in formset.extra_forms
+        ]
+
+        self.assertEqual(len(set(initial_languages)), 3)
+        for language_code in initial_languages:
+            self.assertNotIn(language_code, ('en', 'en-us', 'pl'))
+
+    def test_compact(self):
+        """ Compact formsets limit the language choices. """
+
+        formset = self.get_formset(compact=True)
+
+        for form in formset.initial_forms:
+            self.assertEqual(
+                [choice[0] for choice in form.fields['language_code'].choices],
+                [form.instance.language_code]
+            )
+
+        for form in formset.extra_forms + [formset.empty_form]:
+            choices = [
+                choice[0] for choice in form.fields['language_code'].choices
+            ]
+
+            self.assertEqual(choices[0], '')
+            self.assertEqual(choices[1:], [
+                language_code
+                for language_code in formset.available_languages
+                if language_code not in ('en', 'en-us', 'pl')
+            ])
+
+
+class AdminTestCase(TestCase):
+    def setUp(self):
+        """ Setup a number of books and an admin for them. """
+
+        self.author = Author.objects.create(name='Mark Pilgrim')
+        AuthorTranslation.objects.create(
+            parent=self.author, language_code='en', biography='Writer.'
+        )
+
+        for isbn in range(20):
+            book = Book.objects.create(ISBN=isbn, author=self.author)
+
+            BookTranslation.objects.create(
+                parent=book, language_code='en', title='Book %02d' % isbn,
+                description='Description %d' % isbn
+            )
+
+        class BookAdmin(MultilingualModelAdmin):
+            list_display = ['ISBN', translated_field('title')]
+
+        self.admin = BookAdmin(Book, AdminSite())
+        self.request = RequestFactory().get('/')
+
+        translation.activate('en')
+
+    def tearDown(self):
+        translation.deactivate()
+
+    def test_changelist_queries(self):
+        """ Translations for a page take a constant number of queries. """
+
+        with self.assertNumQueries(2):
+            books = list(self.admin.get_queryset(self.request)[:100])
+
+            for book in books:
+                self.assertEqual(book.title, 'Book %02d' % book.ISBN)
+                self.assertEqual(book.description, 'Description %d' % book.ISBN)
+
+    def test_changelist_ordering(self):
+        """ Translated fields can be sorted on. """
+
+        display = self.admin.list_display[1]
+        self.assertEqual(display.admin_order_field, 'title')
+
+        books = self.admin.get_queryset(self.request).order_by('-title')
+        self.assertEqual(books[0].ISBN, 19)
+
+    def test_foreignkey_queryset(self):
+        """ Foreign key choices have their translations prefetched. """
+
+        field = self.admin.formfield_for_foreignkey(
+            Book._meta.get_field('author'), self.request
+        )
+
+        with self.assertNumQueries(2):
+            for author in field.queryset:
+                self.assertEqual(author.biography, 'Writer.')
+
+
+class MetricsTestCase(BookFixtureMixin, TestCase):
+    def setUp(self):
+        super(MetricsTestCase, self).setUp()
+
+        self.book = Book.objects.get(pk=self.book.pk)
+
+    def tearDown(self):
+        from multilingual_model import settings
+
+        settings.FALLBACKS = {}
+        compile_fallback_chains()
+
+    def test_hits_and_misses(self):
+        """ Cache hits and misses and queries are counted. """
+
+        with collect_metrics() as metrics:
+            self.book.title_en
+            self.book.description_en
+
+        # Both 'en' and the default language are fetched at once
+        self.assertEqual(metrics.summary(), {
+            'hit': 1, 'miss': 2, 'query': 1, 'fallback': 0, 'missing': 0
+        })
+        self.assertEqual(metrics.counts[
+            ('hit', 'multilingual_model.Book', 'en')
+        ], 1)
+
+    def test_fallbacks(self):
+        """ Fallbacks are counted by their depth. """
+
+        from multilingual_model import settings
+
+        settings.FALLBACKS = {'pt-br': ['pt', 'pl']}
+        compile_fallback_chains()
+
+        with collect_metrics() as metrics:
+            self.book.title_pt_br
+
+        self.assertEqual(metrics.total('fallback'), 1)
+        self.assertEqual(metrics.fallback_depths, {
+            ('multilingual_model.Book', 'pt-br', 2): 1
+        })
+
+    def test_disabled(self):
+        """ Nothing is recorded outside of a collecting block. """
+
+        with collect_metrics() as metrics:
+            pass
+
+        self.book.title_en
+
+        self.assertEqual(metrics.counts, {})
+
+    def test_middleware(self):
+        """ The middleware collects metrics per request. """
+
+        middleware = TranslationMetricsMiddleware()
+        request = RequestFactory().get('/')
+
+        middleware.process_request(request)
+        self.book.title_en
+        middleware.process_response(request, None)
+
+        self.book.title_en
+
+        self.assertEqual(request.translation_metrics.total('query'), 1)
+        self.assertEqual(request.translation_metrics.total('hit'), 0)
+
+
+class DeferredFieldsTestCase(TestCase):
+    def setUp(self):
+        """ Setup an article and a book with translations. """
+
+        self.article = Article.objects.create()
+        ArticleTranslation.objects.create(
+            parent=self.article, language_code='en',
+            title='Deferring', body='A long story.'
+        )
+
+        self.book = Book.objects.create(ISBN=1234)
+        BookTranslation.objects.create(
+            parent=self.book, language_code='en',
+            title='Django for Dummies', description='Django in simple words.'
+        )
+
+    def tearDown(self):
+        from multilingual_model import settings
+
+        settings.CACHE = None
+
+    def test_deferred_fields(self):
+        """ Deferred translation fields are loaded when accessed. """
+
+        article = Article.objects.get(pk=self.article.pk)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(article.title_en, 'Deferring')
+
+        with self.assertNumQueries(1):
+            self.assertEqual(article.body_en, 'A long story.')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(article.body_en, 'A long story.')
+
+    def test_prefetch_fields(self):
+        """ Prefetching can be limited to some of the translated fields. """
+
+        with self.assertNumQueries(2):
+            book = Book.objects.with_translations('en', fields=['title'])[0]
+
+        with self.assertNumQueries(0):
+            self.assertEqual(book.title_en, 'Django for Dummies')
+
+        with self.assertNumQueries(1):
+            self.assertEqual(book.description_en, 'Django in simple words.')
+
+    def test_shared_cache(self):
+        """ Partially loaded translations are cached as such. """
+
+        from multilingual_model import settings
+
+        settings.CACHE = 'translations'
+        get_cache().clear()
+
+        Article.objects.get(pk=self.article.pk).title_en
+
+        article = Article.objects.get(pk=self.article.pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(article.title_en, 'Deferring')
+
+        with self.assertNumQueries(1):
+            self.assertEqual(article.body_en, 'A long story.')
+
+
+class SerializationTestCase(TestCase):
+    def setUp(self):
+        """ Setup books and magazines with translations. """
+
+        self.books = []
+        for isbn in range(5):
+            book = Book.objects.create(ISBN=isbn)
+            self.books.append(book)
+
+            BookTranslation.objects.create(
+                parent=book, language_code='en', title='Book %d' % isbn,
+                description='Description %d' % isbn
+            )
+
+        BookTranslation.objects.create(
+            parent=self.books[0], language_code='nl', title='Boek 0',
+            description='Beschrijving 0'
+        )
+
+        self.magazine = Magazine.objects.create(ISSN=1234)
+        MagazineTranslation.objects.create(
+            parent=self.magazine, language_code='en', title='Magazine'
+        )
+
+    def test_serialize(self):
+        """ Translations are serialized with two queries per chunk. """
+
+        with self.assertNumQueries(6):
+            results = list(serialize_translations(
+                Book.objects.all(), fields=['title'], languages=['en', 'nl'],
+                chunk_size=2
+            ))
+
+        self.assertEqual(len(results), 5)
+        self.assertEqual(results[0], {
+            'id': self.books[0].pk,
+            'title': {'en': 'Book 0', 'nl': 'Boek 0'}
+        })
+        self.assertEqual(results[1]['title'], {'en': 'Book 1', 'nl': None})
+
+    def test_serialize_fallback(self):
+        """ Missing translations can be taken from fallback languages. """
+
+        results = list(serialize_translations(
+            Book.objects.filter(pk=self.books[1].pk), languages=['en-gb'],
+            fallback=True
+        ))
+
+        self.assertEqual(results[0]['title'], {'en-gb': 'Book 1'})
+        self.assertEqual(
+            results[0]['description'], {'en-gb': 'Description 1'}
+        )
+
+    def test_serialize_json_field(self):
+        """ Translations stored on the objects are read along with them. """
+
+        with self.assertNumQueries(1):
+            results = list(serialize_translations(
+                Magazine.objects.all(), languages=['en', 'nl']
+            ))
+
+        self.assertEqual(results, [{
+            'id': self.magazine.pk, 'title': {'en': 'Magazine', 'nl': None}
+        }])
+
+    def test_stream_json(self):
+        """ Serialized objects can be streamed as a JSON array. """
+
+        output = u''.join(stream_json(
+            Book.objects.all(), fields=['title'], languages=['en']
+        ))
+
+        self.assertEqual(len(json.loads(output)), 5)
+        self.assertEqual(
+            u''.join(stream_json(Book.objects.none())), u'[]'
+        )
+
+
+class BulkWriteTestCase(TestCase):
+    def setUp(self):
+        """ Setup a book with an English translation. """
+
+        self.book = Book.objects.create(ISBN=1234)
+
+        self.book_en = BookTranslation.objects.create(
+            parent=self.book, language_code='en',
+            title='Django for Dummies', description='Django in simple words.'
+        )
+
+    def test_set_translations(self):
+        """ Translations are created and updated at once. """
+
+        book = Book.objects.get(pk=self.book.pk)
+        self.assertEqual(book.title_en, 'Django for Dummies')
+
+        self.assertEqual(book.set_translations({
+            'en': {'title': 'Django for Experts'},
+            'nl': {'title': 'Django voor Dummies', 'description': 'Simpel.'}
+        }), (1, 1))
+
+        # The cached translations have been replaced
+        with self.assertNumQueries(0):
+            self.assertEqual(book.title_en, 'Django for Experts')
+            self.assertEqual(book.description_en, 'Django in simple words.')
+            self.assertEqual(book.title_nl, 'Django voor Dummies')
+
+        self.assertEqual(
+            BookTranslation.objects.get(parent=book, language_code='nl')
+            .description, 'Simpel.'
+        )
+
+        self.assertRaises(
+            ValueError, Book().set_translations, {'en': {'title': 'New'}}
+        )
+
+    def test_bulk_set_translations(self):
+        """ Translations of many objects are written at once. """
+
+        other = Book.objects.create(ISBN=5678)
+
+        self.assertEqual(Book.objects.bulk_set_translations({
+            self.book: {'en': {'title': 'Django for Experts'}},
+            other.pk: {
+                'en': {'title': 'Other', 'description': 'Other book.'},
+                'nl': {'title': 'Ander', 'description': 'Ander boek.'}
+            }
+        }), (2, 1))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.book.title_en, 'Django for Experts')
+
+        self.assertEqual(
+            Book.objects.get(pk=other.pk).title_nl, 'Ander'
+        )
+
+        self.assertRaises(
+            Book.DoesNotExist,
+            Book.objects.filter(pk=self.book.pk).bulk_set_translations,
+            {other.pk: {'en': {'title': 'Other'}}}
+        )
+
+    def test_bulk_set_translations_string_keys(self):
+        """ Primary keys can be given as strings. """
+
+        self.assertEqual(Book.objects.bulk_set_translations({
+            str(self.book.pk): {'en': {'title': 'Django for Experts'}},
+        }), (0, 1))
+
+        self.assertEqual(
+            Book.objects.get(pk=self.book.pk).title_en, 'Django for Experts'
+        )
+
+    def test_update_translations(self):
+        """ Translations are updated with a single query. """
+
+        translation_nl = BookTranslation.objects.create(
+            parent=self.book, language_code='nl',
+            title='Django voor Dummies', description='Simpel.'
+        )
+
+        with self.assertNumQueries(1):
+            update_translations(BookTranslation, {
+                self.book_en.pk: {'title': 'Django for Experts'},
+                translation_nl.pk: {'description': 'Eenvoudig.'},
+            })
+
+        self.book_en = BookTranslation.objects.get(pk=self.book_en.pk)
+        self.assertEqual(self.book_en.title, 'Django for Experts')
+        self.assertEqual(self.book_en.description, 'Django in simple words.')
+
+        translation_nl = BookTranslation.objects.get(pk=translation_nl.pk)
+        self.assertEqual(translation_nl.title, 'Django voor Dummies')
+        self.assertEqual(translation_nl.description, 'Eenvoudig.')
+
+    def test_formset_bulk_save(self):
+        """ Formsets can save their translations at once. """
+
+        from multilingual_model import settings
+
+        default_language = settings.DEFAULT_LANGUAGE
+        settings.DEFAULT_LANGUAGE = 'en'
+
+        try:
+            FormSet = inlineformset_factory(
+                Book, BookTranslation, formset=TranslationFormSet,
+                fields=('language_code', 'title', 'description'), extra=1
+            )
+            FormSet.bulk_save = True
+
+            formset = FormSet({
+                'translations-TOTAL_FORMS': '2',
+                'translations-INITIAL_FORMS': '1',
+                'translations-MAX_NUM_FORMS': '1000',
+                'translations-0-id': str(self.book_en.pk),
+                'translations-0-parent': str(self.book.pk),
+                'translations-0-language_code': 'en',
+                'translations-0-title': 'Django for Experts',
+                'translations-0-description': 'Django in simple words.',
+                'translations-1-parent': str(self.book.pk),
+                'translations-1-language_code': 'nl',
+                'translations-1-title': 'Django voor Dummies',
+                'translations-1-description': 'Simpel.',
+            }, instance=self.book)
+
+            self.assertTrue(formset.is_valid(), formset.errors)
+
+            saved = formset.save()
+
+        finally:
+            settings.DEFAULT_LANGUAGE = default_language
+
+        self.assertEqual(
+            sorted(obj.language_code for obj in saved), ['en', 'nl']
+        )
+        self.assertEqual(
+            [obj.language_code for obj in formset.new_objects], ['nl']
+        )
+        self.assertEqual(BookTranslation.objects.count(), 2)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.book.title_en, 'Django for Experts')
+            self.assertEqual(self.book.title_nl, 'Django voor Dummies')
+
+    def test_formset_bulk_save_invalid(self):
+        """ Invalid formsets are not saved. """
+
+        FormSet = inlineformset_factory(
+            Book, BookTranslation, formset=TranslationFormSet,
+            fields=('language_code', 'title', 'description'), extra=1
+        )
+        FormSet.bulk_save = True
+
+        formset = FormSet({
+            'translations-TOTAL_FORMS': '1',
+            'translations-INITIAL_FORMS': '0',
+            'translations-MAX_NUM_FORMS': '1000',
+            'translations-0-parent': str(self.book.pk),
+            'translations-0-language_code': 'xx',
+            'translations-0-title': 'Django',
+            'translations-0-description': 'Django.',
+        }, instance=self.book)
+
+        self.assertFalse(formset.is_valid())
+        self.assertRaises(ValueError, formset.save)
+        self.assertEqual(BookTranslation.objects.count(), 1)
+
+    def test_concurrent_creation(self):
+        """ Translations created concurrently are updated instead. """
+
+        from multilingual_model import bulk
+
+        plan_writes = bulk._plan_writes
+
+        def concurrent_plan_writes(options, merged):
+            result = plan_writes(options, merged)
+
+            if not BookTranslation.objects.filter(language_code='nl'):
+                BookTranslation.objects.create(
+                    parent=self.book, language_code='nl', title='Concurrent',
+                    description='Simpel.'
+                )
+
+            return result
+
+        bulk._plan_writes = concurrent_plan_writes
+        try:
+            self.assertEqual(self.book.set_translations({
+                'nl': {'title': 'Django voor Dummies'}
+            }), (0, 1))
+        finally:
+            bulk._plan_writes = plan_writes
+
+        translation_nl = BookTranslation.objects.get(language_code='nl')
+        self.assertEqual(translation_nl.title, 'Django voor Dummies')
+        self.assertEqual(translation_nl.description, 'Simpel.')
+
+
+class TemplateTagsTestCase(TestCase):
+    def setUp(self):
+        """ Setup a few books with translations. """
+
+        for isbn in range(3):
+            book = Book.objects.create(ISBN=isbn)
+
+            BookTranslation.objects.create(
+                parent=book, language_code='en', title='Book %d' % isbn,
+                description='Description %d' % isbn
+            )
+            BookTranslation.objects.create(
+                parent=book, language_code='nl', title='Boek %d' % isbn,
+                description='Beschrijving %d' % isbn
+            )
+
+        translation.activate('en')
+
+    def tearDown(self):
+        translation.deactivate()
+
+    def render(self, source, **context):
+        return Template(
+            '{% load multilingual %}' + source
+        ).render(Context(context))
+
+    def test_prefetch_translations(self):
+        """ Translations of all objects are fetched at once. """
+
+        books = Book.objects.order_by('ISBN')
+
+        with self.assertNumQueries(2):
+            output = self.render(
+                '{% prefetch_translations books fields="title" %}'
+                '{% for book in books %}{{ book.title }},{% endfor %}',
+                books=books
+            )
+
+        self.assertEqual(output, 'Book 0,Book 1,Book 2,')
+
+        books = Book.objects.order_by('ISBN')
+
+        with self.assertNumQueries(2):
+            output = self.render(
+                '{% prefetch_translations books languages="nl" %}'
+                '{% for book in books %}{{ book.title_nl }},{% endfor %}',
+                books=books
+            )
+
+        self.assertEqual(output, 'Boek 0,Boek 1,Boek 2,')
+
+    def test_translated(self):
+        """ Translated fields can be rendered in a given language. """
+
+        book = Book.objects.get(ISBN=0)
+
+        self.assertEqual(
+            self.render('{{ book|translated:"title" }}', book=book), 'Book 0'
+        )
+        self.assertEqual(
+            self.render('{{ book|translated:"title:nl" }}', book=book),
+            'Boek 0'
+        )
+        self.assertEqual(
+            self.render('{{ book|translated:"title:en-gb" }}', book=book),
+            'Book 0'
+        )
+        self.assertEqual(
+            self.render(
+                '{{ book|translated:"title:en-gb:nofallback" }}', book=book
+            ), ''
+        )
+        self.assertEqual(
+            self.render('{{ book|translated:"ISBN" }}', book=book), ''
+        )
+
+
+class SearchTestCase(TestCase):
+    def setUp(self):
+        """ Setup a few posts with translations. """
+
+        self.posts = []
+        for title, body, title_nl, body_nl in (
+            ('Django models', 'Translating models.', 'Django modellen',
+             'Modellen vertalen.'),
+            ('Django templates', 'Models in templates, models everywhere.',
+             'Django sjablonen', 'Modellen in sjablonen.'),
+            ('Python', 'Not about the "web" at all.', 'Python', 'Geen web.'),
+        ):
+            post = Post.objects.create()
+            self.posts.append(post)
+
+            PostTranslation.objects.create(
+                parent=post, language_code='en', title=title, body=body
+            )
+            PostTranslation.objects.create(
+                parent=post, language_code='nl', title=title_nl, body=body_nl
+            )
+
+    def test_index(self):
+        """ The search index has been created along with the tables. """
+
+        options = Post._translation_options
+        self.assertTrue(index_exists(options))
+
+    def test_search(self):
+        """ Matching objects are returned, best matches first. """
+
+        posts = Post.objects.search('models', language='en')
+
+        self.assertEqual(
+            sorted(post.pk for post in posts),
+            [self.posts[0].pk, self.posts[1].pk]
+        )
+        self.assertTrue(posts[0].search_rank >= posts[1].search_rank)
+
+        with self.assertNumQueries(0):
+            self.assertTrue(posts[0].title_en.startswith('Django'))
+
+        self.assertEqual(
+            Post.objects.search('django vertalen', language='nl'),
+            [self.posts[0]]
+        )
+        self.assertEqual(
+            Post.objects.search('"web" at', language='en'), [self.posts[2]]
+        )
+        self.assertEqual(Post.objects.search('', language='en'), [])
+
+    def test_search_queryset(self):
+        """ Searching is limited to the objects in the queryset. """
+
+        self.assertEqual(
+            Post.objects.exclude(pk=self.posts[1].pk).search(
+                'models', language='en'
+            ), [self.posts[0]]
+        )
+
+    def test_incremental(self):
+        """ The index is updated when translations change. """
+
+        translation_en = PostTranslation.objects.get(
+            parent=self.posts[2], language_code='en'
+        )
+        translation_en.body = 'Models in Python.'
+        translation_en.save()
+
+        self.assertEqual(
+            len(Post.objects.search('models', language='en')), 3
+        )
+
+        translation_en.delete()
+        self.assertEqual(
+            len(Post.objects.search('models', language='en')), 2
+        )
+
+        self.posts[2].set_translations({'en': {'title': 'Models'}})
+        self.assertEqual(
+            len(Post.objects.search('models', language='en')), 3
+        )
+
+    def test_rebuild(self):
+        """ The index can be rebuilt from the translations. """
+
+        PostTranslation.objects.filter(parent=self.posts[0]).update(
+            body='Nothing.'
+        )
+        self.assertEqual(
+            len(Post.objects.search('translating', language='en')), 1
+        )
+
+        rebuild_index(Post)
+        self.assertEqual(
+            len(Post.objects.search('translating', language='en')), 0
+        )
+
+    def test_moved_translation(self):
+        """ Translations moved to another parent are indexed only once. """
+
+        translation_en = PostTranslation.objects.get(
+            parent=self.posts[0], language_code='en'
+        )
+        PostTranslation.objects.filter(
+            parent=self.posts[2], language_code='en'
+        ).delete()
+
+        translation_en.parent = self.posts[2]
+        translation_en.save()
+
+        self.assertEqual(
+            Post.objects.search('translating', language='en'),
+            [self.posts[2]]
+        )
+
+    def test_fallback_search(self):
+        """ Without an index, all search terms are matched in the fields. """
+
+        from multilingual_model import search
+
+        options = Post._translation_options
+        key = (DEFAULT_DB_ALIAS, search.get_index_table(options))
+        search._index_tables[key] = False
+
+        try:
+            posts = Post.objects.search('django MODELS', language='en')
+        finally:
+            del search._index_tables[key]
+
+        self.assertEqual(posts, [self.posts[0], self.posts[1]])
+
+
+class CoverageTestCase(TestCase):
+    def setUp(self):
+        """ Setup books with incomplete translations. """
+
+        from multilingual_model import settings
+
+        self._default_language = settings.DEFAULT_LANGUAGE
+        settings.DEFAULT_LANGUAGE = 'en'
+
+        self.books = []
+        for isbn in range(4):
+            book = Book.objects.create(ISBN=isbn)
+            self.books.append(book)
+
+            if isbn < 3:
+                BookTranslation.objects.create(
+                    parent=book, language_code='en', title='Book %d' % isbn,
+                    description=isbn and 'Description %d' % isbn or ''
+                )
+
+            if isbn == 3:
+                BookTranslation.objects.create(
+                    parent=book, language_code='nl', title='Boek %d' % isbn,
+                    description='Beschrijving %d' % isbn
+                )
+
+    def tearDown(self):
+        from multilingual_model import settings
+
+        settings.DEFAULT_LANGUAGE = self._default_language
+
+    def test_coverage(self):
+        """ Coverage is computed with a few queries. """
+
+        with self.assertNumQueries(4):
+            coverage = get_coverage(Book, languages=['en', 'nl', 'de'])
+
+        self.assertEqual(coverage['total'], 4)
+        self.assertEqual(coverage['fields'], ['title', 'description'])
+        self.assertEqual(coverage['languages'], [
+            {'language_code': 'en', 'translations': 3,
+             'fields': {'title': 3, 'description': 2}},
+            {'language_code': 'nl', 'translations': 1,
+             'fields': {'title': 1, 'description': 1}},
+            {'language_code': 'de', 'translations': 0,
+             'fields': {'title': 0, 'description': 0}},
+        ])
+        self.assertEqual(coverage['missing_default'], 1)
+        self.assertEqual(coverage['missing_default_pks'], [self.books[3].pk])
+
+    def test_command(self):
+        """ The coverage command reports per language and field. """
+
+        stdout = six.StringIO()
+
+        call_command(
+            'multilingual_coverage', 'multilingual_model.Book',
+            languages=['en'], missing=10, stdout=stdout
+        )
+
+        lines = stdout.getvalue().splitlines()
+        self.assertEqual(
+            lines[0], 'multilingual_model.Book: 4 objects, 1 without en'
+        )
+        self.assertEqual(lines[2].split(), ['en', '75%', '75%', '50%'])
+        self.assertEqual(lines[3].split()[-1], str(self.books[3].pk))
+
+    def test_admin_view(self):
+        """ The admin reports the coverage of a model. """
+
+        class BookAdmin(MultilingualModelAdmin):
+            pass
+
+        model_admin = BookAdmin(Book, AdminSite())
+
+        request = RequestFactory().get('/')
+        request.user = type('User', (object, ), {
+            'has_perm': lambda self, perm: True
+        })()
+
+        response = model_admin.coverage_view(request)
+        languages = dict(
+            (language['language_code'], language)
+            for language in response.context_data['languages']
+        )
+
+        self.assertEqual(response.context_data['coverage']['total'], 4)
+        self.assertEqual(languages['en']['percentage'], 75)
+        self.assertEqual(languages['en']['fields'], [75, 50])
+
+
+class AvailableLanguagesTestCase(TestCase):
+    def setUp(self):
+        """ Setup books translated to different languages. """
+
+        self.books = []
+        for isbn, languages in enumerate([['nl', 'en'], ['en'], []]):
+            book = Book.objects.create(ISBN=isbn)
+            self.books.append(book)
+
+            for code in languages:
+                BookTranslation.objects.create(
+                    parent=book, language_code=code, title=code,
+                    description=''
+                )
+
+    def test_available_languages(self):
+        """ Languages are selected along with the objects. """
+
+        with self.assertNumQueries(1):
+            books = list(
+                Book.objects.with_available_languages().order_by('pk')
+            )
+
+        self.assertEqual(
+            [book.available_languages for book in books],
+            [['en', 'nl'], ['en'], []]
+        )
+
+        values = Book.objects.with_available_languages().filter(
+            pk=self.books[1].pk
+        ).values_list('available_languages', flat=True)
+        self.assertEqual(list(values), ['en'])
+
+    def test_sitemap(self):
+        """ The sitemap lists a URL per language with alternates. """
+
+        class BookSitemap(MultilingualSitemap):
+            model = Book
+            languages = ['en', 'nl']
+
+            def location(self, book):
+                return '/%s/books/%d/' % (translation.get_language(), book.pk)
+
+        request = RequestFactory().get('/sitemap.xml')
+
+        with self.assertNumQueries(2):
+            response = sitemap(request, {'books': BookSitemap})
+            if hasattr(response, 'streaming_content'):
+                parts = response.streaming_content
+            else:
+                # Django < 1.5
+                parts = [response.content]
+
+            content = u''.join(
+                six.text_type(part, 'utf-8') for part in parts
+            )
+
+        pk = self.books[0].pk
+        self.assertIn(
+            u'<url><loc>http://testserver/nl/books/%d/</loc>'
+            u'<xhtml:link rel="alternate" hreflang="en" '
+            u'href="http://testserver/en/books/%d/"/>'
+            u'<xhtml:link rel="alternate" hreflang="nl" '
+            u'href="http://testserver/nl/books/%d/"/></url>' % (pk, pk, pk),
+            content
+        )
+        self.assertIn(
+            u'<url><loc>http://testserver/en/books/%d/</loc></url>'
+            % self.books[1].pk, content
+        )
+        self.assertEqual(content.count(u'<url>'), 3)
+        self.assertEqual(BookSitemap().limit, 25000)
+
+        # Sitemap instances live as long as the URLconf, so objects are
+        # counted again for every request
+        site_map = BookSitemap()
+        self.assertEqual(site_map.paginator.count, 3)
+
+        book = Book.objects.create(ISBN=4)
+        BookTranslation.objects.create(
+            parent=book, language_code='en', title='New'
+        )
+        self.assertEqual(site_map.paginator.count, 4)
+
+
+class WarmCacheTestCase(TestCase):
+    def setUp(self):
+        """ Setup books with translations and the shared cache. """
+
+        from multilingual_model import settings
+
+        self._cache_setting = settings.CACHE
+        settings.CACHE = 'translations'
+
+        get_cache().clear()
+
+        self.books = []
+        for isbn in range(5):
+            book = Book.objects.create(ISBN=isbn)
+            self.books.append(book)
+
+            BookTranslation.objects.create(
+                parent=book, language_code='en', title='Book %d' % isbn,
+                description=''
+            )
+
+        get_cache().clear()
+
+    def tearDown(self):
+        from multilingual_model import settings
+
+        get_cache().clear()
+        settings.CACHE = self._cache_setting
+
+    def test_warm_cache(self):
+        """ Translations are cached in chunks, missing ones included. """
+
+        with self.assertNumQueries(3):
+            count = warm_cache(
+                Book.objects.order_by('pk'), ['en', 'nl'], chunk_size=3
+            )
+
+        self.assertEqual(count, 5)
+
+        book = Book.objects.get(pk=self.books[4].pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(book.title_en, 'Book 4')
+            self.assertRaises(
+                ObjectDoesNotExist, book._get_translation, 'title', 'nl'
+            )
+
+    def test_budget(self):
+        """ Warming stops when the budget has been used. """
+
+        count = warm_cache(
+            Book.objects.order_by('-pk'), ['en'], chunk_size=1, max_rows=2
+        )
+        self.assertEqual(count, 2)
+
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+
+        logger = logging.getLogger('multilingual_model')
+        logger.addHandler(handler)
+        propagate, logger.propagate = logger.propagate, False
+
+        try:
+            with self.assertNumQueries(1):
+                warm_cache(Book.objects.all(), ['en'], max_seconds=0)
+        finally:
+            logger.removeHandler(handler)
+            logger.propagate = propagate
+
+        self.assertEqual(
+            [record.getMessage() for record in records],
+            [u'Stopped warming the translation cache for Book after 0 '
+             u'objects.']
+        )
+
+        book = Book.objects.get(pk=self.books[3].pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(book.title_en, 'Book 3')
+
+        book = Book.objects.get(pk=self.books[2].pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(book.title_en, 'Book 2')
+
+    def test_configured(self):
+        """ Models are warmed as configured by the settings. """
+
+        from multilingual_model import settings
+
+        warm_cache_setting = settings.WARM_CACHE
+        settings.WARM_CACHE = {
+            'multilingual_model.Book': {
+                'languages': ['en'], 'filter': {'ISBN__lt': 3},
+            },
+        }
+
+        try:
+            self.assertEqual(warm_configured_caches(), [(Book, 3)])
+
+            stdout = six.StringIO()
+            call_command('multilingual_warm_cache', stdout=stdout)
+        finally:
+            settings.WARM_CACHE = warm_cache_setting
+
+        self.assertEqual(
+            stdout.getvalue().strip(),
+            'Cached translations of 3 multilingual_model.Book objects.'
+        )
+
+    def test_disabled(self):
+        """ Warming requires a translation cache. """
+
+        from multilingual_model import settings
+
+        settings.CACHE = None
+
+        try:
+            self.assertRaises(
+                ImproperlyConfigured, warm_cache, Book.objects.all()
+            )
+            # Before Django 1.5, call_command() exits on a CommandError
+            self.assertRaises(
+                CommandError, warm_cache_command.Command().handle
+            )
+        finally:
+            settings.CACHE = 'translations'
+
+
+class ChangeFeedTestCase(TestCase):
+    def setUp(self):
+        """ Setup chapters with translations. """
+
+        from multilingual_model import settings
+
+        self._lag_setting = settings.CHANGE_FEED_LAG
+        settings.CHANGE_FEED_LAG = 0
+
+        self.chapters = [Chapter.objects.create() for i in range(3)]
+
+        self.translations = []
+        for chapter in self.chapters:
+            self.translations.append(ChapterTranslation.objects.create(
+                parent=chapter, language_code='en', title='Chapter'
+            ))
+
+    def tearDown(self):
+        from multilingual_model import settings
+
+        settings.CHANGE_FEED_LAG = self._lag_setting
+
+    def test_changed_since(self):
+        """ Changes are returned in pages, in order. """
+
+        changes, token = changed_since(Chapter, limit=2)
+        self.assertEqual(
+            [(change['parent_pk'], change['language_code'], change['deleted'])
+             for change in changes],
+            [(self.chapters[0].pk, 'en', False),
+             (self.chapters[1].pk, 'en', False)]
+        )
+
+        changes, token = changed_since(Chapter, token, limit=2)
+        self.assertEqual(
+            [change['parent_pk'] for change in changes],
+            [self.chapters[2].pk]
+        )
+
+        with self.assertNumQueries(1):
+            self.assertEqual(changed_since(Chapter, token), ([], token))
+
+        self.assertEqual(changed_since(Book), ([], None))
+
+    def test_latest_change(self):
+        """ Only the latest change of a translation is kept. """
+
+        changes, token = changed_since(Chapter)
+
+        self.translations[0].title = 'Introduction'
+        self.translations[0].save()
+        self.translations[1].delete()
+
+        changes, token = changed_since(Chapter, token)
+        self.assertEqual(
+            [(change['parent_pk'], change['deleted']) for change in changes],
+            [(self.chapters[0].pk, False), (self.chapters[1].pk, True)]
+        )
+        self.assertEqual(TranslationChange.objects.count(), 3)
+
+    def test_language_change(self):
+        """ Changing the language of a translation deletes the old one. """
+
+        changes, token = changed_since(Chapter)
+
+        self.translations[0].language_code = 'nl'
+        self.translations[0].save()
+
+        changes, token = changed_since(Chapter, token)
+        self.assertEqual(
+            [(change['language_code'], change['deleted'])
+             for change in changes],
+            [('en', True), ('nl', False)]
+        )
+
+    def test_subclass(self):
+        """ Subclasses share the options of the model translated. """
+
+        special = SpecialChapter.objects.create()
+        changes, token = changed_since(Chapter)
+
+        ChapterTranslation.objects.create(
+            parent=special, language_code='en', title='Special'
+        )
+
+        self.assertEqual(special.title_en, 'Special')
+        self.assertTrue(
+            get_translation_options(SpecialChapter) is
+            get_translation_options(Chapter)
+        )
+        self.assertIn(Chapter, get_multilingual_models())
+        self.assertNotIn(SpecialChapter, get_multilingual_models())
+
+        changes, token = changed_since(Chapter, token)
+        self.assertEqual(
+            [(change['parent_pk'], change['language_code'])
+             for change in changes],
+            [(special.pk, 'en')]
+        )
+
+    def test_lag(self):
+        """ Recent changes are left out until the lag has passed. """
+
+        self.assertEqual(changed_since(Chapter, lag=60), ([], None))
+
+    def test_bulk_changes(self):
+        """ Bulk writes and deletions of parents are recorded. """
+
+        changes, token = changed_since(Chapter)
+
+        self.chapters[0].set_translations({
+            'en': {'title': 'Introduction'}, 'nl': {'title': 'Inleiding'}
+        })
+        deleted_pk = self.chapters[2].pk
+        self.chapters[2].delete()
+
+        changes, token = changed_since(Chapter, token)
+        self.assertEqual(
+            sorted(
+                (change['parent_pk'], change['language_code'],
+                 change['deleted'])
+                for change in changes
+            ),
+            [(self.chapters[0].pk, 'en', False),
+             (self.chapters[0].pk, 'nl', False),
+             (deleted_pk, 'en', True)]
+        )
@@ -0,0 +1,230 @@
+"""
+Reading and writing translations as CSV, JSON lines and gettext PO files,
+one row (or entry) at a time.
+"""
+
+import csv
+import io
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import six
+from django.utils.encoding import force_text
+
+
+FORMATS = ('csv', 'jsonl', 'po')
+
+
+def guess_format(path):
+    """ Return the format for a file name, by its extension. """
+
+    extension = path.rsplit('.', 1)[-1].lower()
+
+    if extension == 'json':
+        return 'jsonl'
+
+    if extension in FORMATS:
+        return extension
+
+    return None
+
+
+def chunked(iterable, size):
+    """ Yield lists of at most `size` items from `iterable`. """
+
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def read_csv(path):
+    """
+    Yield a dictionary for every row in a CSV file, using the first row for
+    the keys.
+    """
+
+    if six.PY3:
+        with io.open(path, encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                yield row
+
+    else:
+        with open(path, 'rb') as f:
+            for row in csv.DictReader(f):
+                yield dict(
+                    (key.decode('utf-8'), value.decode('utf-8'))
+                    for key, value in row.items()
+                )
+
+
+def read_jsonl(path):
+    """ Yield a dictionary for every line in a JSON lines file. """
+
+    with io.open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+
+            if line:
+                yield json.loads(line)
+
+
+def _po_unescape(value):
+    value = value.strip()[1:-1]
+
+    result = []
+    chars = iter(value)
+    for char in chars:
+        if char == '\\':
+            char = next(chars, '')
+            char = {'n': '\n', 't': '\t', 'r': '\r'}.get(char, char)
+
+        result.append(char)
+
+    return u''.join(result)
+
+
+def _po_escape(value):
+    return u'"%s"' % (
+        force_text(value).replace(u'\\', u'\\\\').replace(u'"', u'\\"')
+        .replace(u'\n', u'\\n').replace(u'\t', u'\\t').replace(u'\r', u'\\r')
+    )
+
+
+def read_po_entries(path):
+    """
+    Yield a dictionary with `msgctxt`, `msgid` and `msgstr` for each entry
+    in a gettext PO file. Fuzzy entries are left out.
+    """
+
+    with io.open(path, encoding='utf-8') as f:
+        entry = {}
+        fuzzy = False
+        key = None
+
+        for line in f:
+            line = line.strip()
+
+            if not line:
+                if entry and not fuzzy:
+                    yield entry
+
+                entry = {}
+                fuzzy = False
+                key = None
+
+            elif line.startswith('#'):
+                if line.startswith('#,') and 'fuzzy' in line:
+                    fuzzy = True
+
+            elif line.startswith('"'):
+                if key:
+                    entry[key] += _po_unescape(line)
+
+            else:
+                key, value = line.split(None, 1)
+
+                if key in ('msgctxt', 'msgid', 'msgstr'):
+                    entry[key] = _po_unescape(value)
+                else:
+                    # Plural forms are not supported
+                    key = None
+
+        if entry and not fuzzy:
+            yield entry
+
+
+def read_po(path, fk_name, language_code):
+    """
+    Yield a row for every translated entry in a gettext PO file, as written
+    by `write_po()`: with a `msgctxt` of the form `<parent pk>.<field>`.
+    """
+
+    for entry in read_po_entries(path):
+        context = entry.get('msgctxt')
+        value = entry.get('msgstr')
+
+        if not context or not value or '.' not in context:
+            continue
+
+        parent_pk, field = context.rsplit('.', 1)
+
+        yield {
+            fk_name: parent_pk,
+            'language_code': language_code,
+            field: value,
+        }
+
+
+class CSVWriter(object):
+    """ Writes rows as CSV to a text stream. """
+
+    def __init__(self, stream, fieldnames):
+        self.stream = stream
+        self.fieldnames = fieldnames
+        self.buffer = six.StringIO()
+        self.writer = csv.writer(self.buffer)
+
+        self._write(fieldnames)
+
+    def _write(self, values):
+        if six.PY3:
+            self.writer.writerow(values)
+        else:
+            self.writer.writerow([
+                force_text(value).encode('utf-8') for value in values
+            ])
+
+        line = self.buffer.getvalue()
+        if not six.PY3:
+            line = line.decode('utf-8')
+
+        self.stream.write(line)
+        self.buffer.seek(0)
+        self.buffer.truncate()
+
+    def write(self, row):
+        self._write([
+            u'' if row.get(name) is None else row[name]
+            for name in self.fieldnames
+        ])
+
+
+class JSONLWriter(object):
+    """ Writes rows as JSON lines to a text stream. """
+
+    def __init__(self, stream, fieldnames):
+        self.stream = stream
+
+    def write(self, row):
+        self.stream.write(
+            json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + u'\n'
+        )
+
+
+class POWriter(object):
+    """
+    Writes gettext PO entries to a text stream, using `<parent pk>.<field>`
+    for the context.
+    """
+
+    def __init__(self, stream, language_code):
+        self.stream = stream
+
+        self.stream.write(
+            u'msgid ""\nmsgstr ""\n'
+            u'"Content-Type: text/plain; charset=UTF-8\\n"\n'
+            u'"Language: %s\\n"\n\n' % language_code
+        )
+
+    def write(self, parent_pk, field, msgid, msgstr):
+        self.stream.write(u'msgctxt %s\nmsgid %s\nmsgstr %s\n\n' % (
+            _po_escape(u'%s.%s' % (parent_pk, field)),
+            _po_escape(msgid), _po_escape(msgstr or u'')
+        ))
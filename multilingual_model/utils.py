@@ -0,0 +1,136 @@
+from django.core.exceptions import ImproperlyConfigured
+
+try:
+    from django.db.transaction import atomic
+except ImportError:
+    # Django < 1.6; blocks are not nested as savepoints
+    from django.db.transaction import commit_on_success as atomic
+
+
+def get_model(label):
+    """ Return the model for an `app_label.ModelName` label. """
+
+    try:
+        app_label, model_name = label.split('.')
+    except ValueError:
+        raise ImproperlyConfigured(
+            u"Model label '%s' should be of the form "
+            u"'app_label.ModelName'." % label
+        )
+
+    try:
+        from django.apps import apps
+    except ImportError:
+        # Django < 1.7
+        from django.db.models import get_model as get_app_model
+        model = get_app_model(app_label, model_name)
+    else:
+        try:
+            model = apps.get_model(app_label, model_name)
+        except LookupError:
+            model = None
+
+    if model is None:
+        raise ImproperlyConfigured(u"Model '%s' not found." % label)
+
+    return model
+
+
+def iterate_pks(queryset, batch_size):
+    """
+    Yield lists of at most `batch_size` primary keys of the objects in
+    `queryset`, paginating on the primary key so memory usage and query
+    cost remain constant for large tables.
+    """
+
+    queryset = queryset.order_by('pk')
+    last_pk = None
+
+    while True:
+        batch = queryset
+        if last_pk is not None:
+            batch = batch.filter(pk__gt=last_pk)
+
+        pks = list(batch.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return
+
+        yield pks
+
+        if len(pks) < batch_size:
+            return
+
+        last_pk = pks[-1]
+
+
+def iterate_values(queryset, fields, batch_size):
+    """
+    Yield a dictionary with the given fields for every object in `queryset`,
+    paginating on the primary key so memory usage and query cost remain
+    constant for large tables.
+    """
+
+    queryset = queryset.order_by('pk')
+    last_pk = None
+
+    while True:
+        batch = queryset
+        if last_pk is not None:
+            batch = batch.filter(pk__gt=last_pk)
+
+        rows = list(batch.values('pk', *fields)[:batch_size])
+        if not rows:
+            return
+
+        for row in rows:
+            last_pk = row.pop('pk')
+            yield row
+
+        if len(rows) < batch_size:
+            return
+
+
+def get_loaded_values(obj):
+    """
+    Return a dictionary mapping the attribute names of the concrete fields
+    of `obj` onto their values, leaving out deferred fields which have not
+    been loaded.
+    """
+
+    values = {}
+    for field in obj._meta.fields:
+        if field.attname in obj.__dict__:
+            values[field.attname] = obj.__dict__[field.attname]
+
+    return values
+
+
+def instantiate_deferred(model, values):
+    """
+    Instantiate `model` from a dictionary mapping attribute names onto
+    values. Fields which are left out are deferred, and loaded from the
+    database when accessed.
+    """
+
+    deferred = [
+        field.attname for field in model._meta.fields
+        if field.attname not in values
+    ]
+
+    if not deferred:
+        return model(**values)
+
+    try:
+        from django.db.models.query_utils import deferred_class_factory
+    except ImportError:
+        # Django >= 1.10
+        from django.db.models import DEFERRED
+
+        return model.from_db(None, [
+            field.attname for field in model._meta.concrete_fields
+        ], [
+            values.get(field.attname, DEFERRED)
+            for field in model._meta.concrete_fields
+        ])
+
+    return deferred_class_factory(model, deferred)(**values)
@@ -0,0 +1,168 @@
+"""
+Preloading translations into the shared and local translation caches, so
+workers do not all query the translation tables at once after a deploy.
+
+Translations are read in chunks of objects, with a single query per chunk,
+within an optional budget of objects and seconds.
+"""
+
+import logging
+logger = logging.getLogger('multilingual_model')
+
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+
+from . import cache, settings
+from .fallbacks import get_fallback_languages
+from .options import defer_translation_fields, get_translation_options
+from .transfer import chunked
+from .utils import get_model
+
+
+# Number of objects whose translations are cached per query
+CHUNK_SIZE = 500
+
+
+def _cache_chunk(options, pks, languages, local_cache):
+    translations = defer_translation_fields(
+        options.translation_model._default_manager.filter(**{
+            '%s__in' % options.fk.name: pks,
+            'language_code__in': languages
+        }), options
+    )
+
+    fetched = {}
+    for pk in pks:
+        for code in languages:
+            fetched[(pk, code)] = None
+
+    for translation_obj in translations:
+        fetched[(getattr(translation_obj, options.fk.attname),
+                 translation_obj.language_code)] = translation_obj
+
+    cache.set_translations(options.translation_model, fetched)
+
+    if local_cache is not None:
+        for (pk, code), translation_obj in fetched.items():
+            local_cache.set(
+                (options.translation_model, pk, code), translation_obj
+            )
+
+
+def warm_cache(queryset, languages=None, chunk_size=CHUNK_SIZE,
+               max_rows=None, max_seconds=None):
+    """
+    Cache the translations for `languages` (by default the configured
+    languages), and the languages they fall back to, of the objects in a
+    queryset of a `MultilingualModel`, in the order of the queryset. Missing
+    translations are cached as well.
+
+    At most `max_rows` objects are processed, and no chunks are started
+    after `max_seconds`. Returns the number of objects whose translations
+    have been cached.
+    """
+
+    options = get_translation_options(queryset.model)
+    local_cache = cache.get_local_cache()
+
+    if cache.get_cache() is None and local_cache is None:
+        raise ImproperlyConfigured(
+            u"Neither the shared nor the local translation cache is enabled."
+        )
+
+    if options.json_field is not None:
+        # Translations are read from the objects themselves
+        return 0
+
+    if languages is None:
+        languages = [code for code, name in settings.LANGUAGES]
+
+    languages = get_fallback_languages(languages)
+
+    pks = queryset.values_list('pk', flat=True)
+    if max_rows is not None:
+        pks = pks[:max_rows]
+
+    start = time.time()
+    count = 0
+
+    for chunk in chunked(pks.iterator(), chunk_size):
+        if max_seconds is not None and time.time() - start >= max_seconds:
+            logger.info(
+                u'Stopped warming the translation cache for %s after %d '
+                u'objects.', queryset.model._meta.object_name, count
+            )
+
+            break
+
+        _cache_chunk(options, chunk, languages, local_cache)
+        count += len(chunk)
+
+    return count
+
+
+def get_warm_querysets():
+    """
+    Return a list of `(queryset, options)` tuples for the models in the
+    `MULTILINGUAL_WARM_CACHE` setting. It maps model labels onto
+    dictionaries with, optionally, the `languages` to cache, the `filter`
+    and `order_by` arguments for the queryset and the `max_rows` to cache.
+    """
+
+    result = []
+    for label, model_options in sorted(settings.WARM_CACHE.items()):
+        queryset = get_model(label)._default_manager.all()
+
+        if model_options.get('filter'):
+            queryset = queryset.filter(**model_options['filter'])
+
+        if model_options.get('order_by'):
+            queryset = queryset.order_by(*model_options['order_by'])
+
+        result.append((queryset, model_options))
+
+    return result
+
+
+def warm_caches(querysets, languages=None, chunk_size=CHUNK_SIZE,
+                max_rows=None, max_seconds=None):
+    """
+    Warm the translation cache for a list of `(queryset, options)` tuples,
+    like those returned by `get_warm_querysets()`, within a total budget of
+    `max_seconds`. The `languages` and `max_rows` in the options are used
+    unless given here. Returns a list of `(model, number of objects)`
+    tuples.
+    """
+
+    start = time.time()
+    result = []
+
+    for queryset, model_options in querysets:
+        remaining = None
+        if max_seconds is not None:
+            remaining = max_seconds - (time.time() - start)
+
+            if remaining <= 0:
+                break
+
+        result.append((queryset.model, warm_cache(
+            queryset, languages or model_options.get('languages'),
+            chunk_size=chunk_size,
+            max_rows=max_rows or model_options.get('max_rows'),
+            max_seconds=remaining
+        )))
+
+    return result
+
+
+def warm_configured_caches():
+    """
+    Warm the translation cache for the models in the
+    `MULTILINGUAL_WARM_CACHE` setting, in alphabetical order, within the
+    budget of `MULTILINGUAL_WARM_CACHE_SECONDS`.
+    """
+
+    return warm_caches(
+        get_warm_querysets(), max_seconds=settings.WARM_CACHE_SECONDS
+    )
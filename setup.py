@@ -26,6 +26,8 @@ setup(
     author_email='mathijs@mathijsfietst.nl',
     url='http://github.com/dokterbob/django-multilingual-model',
     packages = find_packages(),
+    include_package_data=True,
+    install_requires=['Django>=1.4,<1.9'],
     classifiers=[
         'Development Status :: 3 - Alpha',
         'Environment :: Web Environment',
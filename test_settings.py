@@ -18,6 +18,16 @@ except ImportError:
 
 SITE_ID = 1
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'translations': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'translations',
+    }
+}
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': True,